@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Benchmark and load test for the Docker MCP server
+
+Runs every tool through handle_call_tool against the fake Docker Engine
+API in fake_docker.py (started as a child process, so no Docker daemon or
+network access is needed) and reports throughput, p50/p99 latency under
+concurrent load and peak memory per scenario.
+
+The response cache is off by default, so every call reaches the fake
+daemon and the numbers reflect the tools themselves. --response-cache
+adds a "<scenario>_cached" row next to each cacheable scenario, measured
+with the cache on.
+
+    python3 mcp/benchmarks/bench.py --containers 300 --concurrency 16
+    python3 mcp/benchmarks/bench.py --only logs --json results.json
+    python3 mcp/benchmarks/bench.py --response-cache
+
+The exit status is non-zero when any call fails, so it can gate CI.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Union
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MCP_DIR = os.path.dirname(BENCH_DIR)
+ERROR_PREFIXES = ("❌", "⏱️")
+
+Arguments = Union[Dict[str, Any], Callable[[Any, int], Awaitable[Dict[str, Any]]]]
+
+async def _background_job(server: Any, tool: str, arguments: Dict[str, Any]) -> str:
+    result = await server.handle_call_tool(tool, {**arguments, "background": True, "format": "json"})
+    return json.loads(result[0].text)["job_id"]
+
+async def _finished_job(server: Any, iteration: int) -> Dict[str, Any]:
+    job_id = await _background_job(server, "docker_disk_usage", {})
+    while server.job_manager.running.get(job_id):
+        await asyncio.sleep(0.01)
+    return {"job_id": job_id}
+
+async def _running_job(server: Any, iteration: int) -> Dict[str, Any]:
+    return {"job_id": await _background_job(server, "docker_container_logs",
+                                            {"container_id": "c1", "follow": True, "follow_seconds": 30})}
+
+async def _new_image(server: Any, iteration: int) -> Dict[str, Any]:
+    # A fresh reference per call, so pulls are not coalesced
+    return {"image": f"bench/app{iteration}", "tag": "latest"}
+
+# (scenario, tool, arguments); arguments may be a coroutine function that
+# prepares per-call state, which is not counted in the timings
+SCENARIOS: List[tuple] = [
+    ("list_containers", "docker_list_containers", {"all": True}),
+    ("list_containers_fresh", "docker_list_containers", {"all": True, "fresh": True}),
+    ("list_containers_compact", "docker_list_containers", {"all": True, "limit": 200, "format": "compact"}),
+    ("container_info", "docker_container_info", {"container_id": "c1"}),
+    ("container_logs", "docker_container_logs", {"container_id": "c1", "lines": 500}),
+    # A tail longer than the fake's log, so the summary covers every line
+    ("container_logs_summary", "docker_container_logs", {"container_id": "c1", "lines": 100000, "summarize": True}),
+    ("logs_search", "docker_logs_search", {"container_id": "c1", "pattern": "ERROR", "context": 1}),
+    ("logs_search_project", "docker_logs_search", {"project": "proj0", "pattern": r"code=50[12]", "regex": True}),
+    ("container_stats", "docker_container_stats", {"container_id": "c1"}),
+    ("stats_all", "docker_stats_all", {"top": 10}),
+    ("list_images", "docker_list_images", {}),
+    ("list_images_dedup", "docker_list_images", {"dedup": True}),
+    ("pull_image", "docker_pull_image", _new_image),
+    ("system_info", "docker_system_info", {}),
+    ("disk_usage", "docker_disk_usage", {}),
+    ("disk_usage_fresh", "docker_disk_usage", {"fresh": True}),
+    ("compose_services", "docker_compose_services", {"project": "proj0"}),
+    ("compose_logs", "docker_compose_logs", {"project": "proj0", "lines": 100}),
+    ("network_list", "docker_network_list", {}),
+    ("network_topology", "docker_network_topology", {}),
+    ("network_reach", "docker_network_topology", {"query": "reach", "source": "c1", "target": "c2"}),
+    ("anomalies", "docker_anomalies", {}),
+    ("hosts", "docker_hosts", {}),
+    ("mcp_metrics", "docker_mcp_metrics", {}),
+    ("job_status", "docker_job_status", {}),
+    ("job_result", "docker_job_result", _finished_job),
+    ("job_cancel", "docker_job_cancel", _running_job),
+]
+
+def start_fake_daemon(args: argparse.Namespace) -> tuple:
+    """Run fake_docker.py in a child process and return it with its URL"""
+    command = [
+        sys.executable, os.path.join(BENCH_DIR, "fake_docker.py"), "--port", "0",
+        "--containers", str(args.containers), "--images", str(args.images),
+        "--networks", str(args.networks), "--projects", str(args.projects),
+        "--log-lines", str(args.log_lines), "--latency-ms", str(args.latency_ms),
+        "--stats-interval", str(args.stats_interval), "--pull-step", str(args.pull_step),
+        "--crash-loops", str(args.crash_loops),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    match = re.search(r"tcp://\S+", process.stdout.readline())
+    if not match:
+        process.kill()
+        raise RuntimeError("fake Docker daemon did not start")
+    return process, match.group(0)
+
+def load_server(docker_host: str, state_cache: bool) -> Any:
+    """Import the MCP server module configured for the fake daemon"""
+    os.environ["DOCKER_HOST"] = docker_host
+    os.environ["MCP_STATE_CACHE"] = "1" if state_cache else "0"
+    os.environ["MCP_RESPONSE_CACHE"] = "0"
+    os.environ["MCP_METRICS_PORT"] = "0"
+    os.environ.pop("MCP_DOCKER_HOSTS", None)
+    sys.path.insert(0, MCP_DIR)
+    return importlib.import_module("docker_mcp_tools")
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+async def _call(server: Any, tool: str, arguments: Arguments, iteration: int) -> tuple:
+    if callable(arguments):
+        arguments = await arguments(server, iteration)
+    started = time.perf_counter()
+    result = await server.handle_call_tool(tool, arguments)
+    elapsed = time.perf_counter() - started
+    text = "".join(content.text for content in result)
+    return elapsed, text.startswith(ERROR_PREFIXES), len(text.encode("utf-8")), text
+
+async def run_scenario(server: Any, name: str, tool: str, arguments: Arguments,
+                       calls: int, concurrency: int) -> Dict[str, Any]:
+    """Measure one scenario: a warm-up call, a traced call, then the load run"""
+    await _call(server, tool, arguments, 0)
+
+    tracemalloc.start()
+    _, _, _, first = await _call(server, tool, arguments, 1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies: List[float] = []
+    errors = 0
+    sizes = 0
+    iterations = iter(range(2, calls + 2))
+
+    async def worker() -> None:
+        nonlocal errors, sizes
+        for iteration in iterations:
+            elapsed, failed, size, _ = await _call(server, tool, arguments, iteration)
+            latencies.append(elapsed)
+            errors += failed
+            sizes += size
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    return {
+        "scenario": name,
+        "tool": tool,
+        "calls": calls,
+        "errors": errors,
+        "throughput": round(calls / wall, 1) if wall else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+        "avg_bytes": sizes // calls,
+        "peak_kib": round(peak / 1024, 1),
+        "sample": first[:200] if errors or first.startswith(ERROR_PREFIXES) else None,
+    }
+
+def render_table(results: List[Dict[str, Any]]) -> str:
+    columns = ["scenario", "calls", "errors", "throughput", "p50_ms", "p99_ms", "max_ms", "avg_bytes", "peak_kib"]
+    rows = [[str(result[column]) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines.append("  ".join("-" * width for width in widths))
+    lines.extend("  ".join(cell.rjust(width) if i else cell.ljust(width) for i, (cell, width) in enumerate(zip(row, widths)))
+                 for row in rows)
+    return "\n".join(lines)
+
+async def run(args: argparse.Namespace, server: Any) -> List[Dict[str, Any]]:
+    if args.state_cache:
+        server.client_manager.start()
+        server.state_cache.start()
+        deadline = time.monotonic() + 30
+        while not server.state_cache.ready and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+    listed = {tool.name for tool in await server.handle_list_tools()}
+    covered = {tool for _, tool, _ in SCENARIOS}
+    for tool in sorted(listed - covered):
+        print(f"⚠️  No benchmark scenario for {tool}", file=sys.stderr)
+
+    runs = []
+    for name, tool, arguments in SCENARIOS:
+        if args.only and not re.search(args.only, name):
+            continue
+        runs.append((name, tool, arguments, False))
+        if args.response_cache and tool in server.RESPONSE_CACHE_TTLS:
+            runs.append((f"{name}_cached", tool, arguments, True))
+
+    results = []
+    for name, tool, arguments, cached in runs:
+        # handle_call_tool reads the flag per call; start each run empty
+        server.RESPONSE_CACHE_ENABLED = cached
+        server.response_cache.entries.clear()
+        result = await run_scenario(server, name, tool, arguments, args.calls, args.concurrency)
+        results.append(result)
+        print(f"  {name}: {result['throughput']}/s, p50 {result['p50_ms']}ms, p99 {result['p99_ms']}ms",
+              file=sys.stderr)
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Docker MCP tools against a fake Docker daemon")
+    parser.add_argument("--containers", type=int, default=100)
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--networks", type=int, default=5)
+    parser.add_argument("--projects", type=int, default=3)
+    parser.add_argument("--log-lines", type=int, default=5000, help="Log lines per container")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency injected into every daemon request")
+    parser.add_argument("--stats-interval", type=float, default=0.25,
+                        help="Seconds per stats sample in the fake daemon (the real daemon takes about 1)")
+    parser.add_argument("--pull-step", type=float, default=0.01, help="Seconds between fake pull progress messages")
+    parser.add_argument("--crash-loops", type=int, default=5, help="Fake containers with recent restart-loop events")
+    parser.add_argument("--calls", type=int, default=50, help="Measured calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers per scenario")
+    parser.add_argument("--only", help="Regex selecting scenarios to run")
+    parser.add_argument("--no-state-cache", dest="state_cache", action="store_false",
+                        help="Run without the event-driven state cache")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Also measure each cacheable scenario with the response cache on")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the server's info logs")
+    args = parser.parse_args()
+
+    daemon, docker_host = start_fake_daemon(args)
+    try:
+        server = load_server(docker_host, args.state_cache)
+        if not args.verbose:
+            logging.getLogger("docker_mcp_server").setLevel(logging.WARNING)
+        started = time.perf_counter()
+        results = asyncio.run(run(args, server))
+        elapsed = time.perf_counter() - started
+    finally:
+        daemon.kill()
+        daemon.wait()
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(render_table(results))
+    print(f"\n{len(results)} scenarios in {elapsed:.1f}s, peak RSS {peak_rss / 1024:.1f} MiB "
+          f"({args.containers} containers, {args.images} images, {args.log_lines} log lines, "
+          f"{args.latency_ms}ms latency, concurrency {args.concurrency}, "
+          f"response cache {'on for _cached rows' if args.response_cache else 'off'})")
+    failed = [result for result in results if result["errors"] or result["sample"]]
+    for result in failed:
+        print(f"❌ {result['scenario']}: {result['errors']} failed calls. {result['sample'] or ''}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "peak_rss_kib": peak_rss, "results": results}, f, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
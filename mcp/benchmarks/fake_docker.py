@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Fake Docker Engine API for benchmarking the Docker MCP server offline
+
+Serves the subset of the Engine API the MCP tools use (containers, logs,
+stats, images, networks, pulls, events, system df) from synthetic state
+of configurable size, with optional injected latency per request.
+"""
+
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+API_VERSION = "1.45"
+BASE_TIME = 1700000000
+BASE_LAYER_SIZE = 20_000_000
+# The empty layer a WORKDIR step commits, shared by most real images
+EMPTY_LAYER = "sha256:5f70bf18a086007016e948b04aed3b82103a36bea41755b6cddfaf10ace3c6ef"
+TRUE_VALUES = ("1", "true", "True")
+ZERO_TIME = "0001-01-01T00:00:00Z"
+
+def _digest(seed: str) -> str:
+    return hashlib.sha256(seed.encode()).hexdigest()
+
+def _rfc3339(moment: float) -> str:
+    """Timestamp with nanoseconds, as the daemon writes them"""
+    whole = int(moment)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(whole)) + f".{int((moment - whole) * 1e9):09d}Z"
+
+class FakeDaemonState:
+    """Synthetic containers, images and networks shared by all requests"""
+
+    def __init__(self, containers: int = 50, images: int = 20, networks: int = 5, projects: int = 3,
+                 log_lines: int = 1000, latency: float = 0.0, stats_interval: float = 1.0,
+                 pull_step: float = 0.05, crash_loops: int = 0):
+        self.latency = latency
+        self.log_lines = log_lines
+        self.stats_interval = stats_interval
+        self.pull_step = pull_step
+        self.events: List[Dict[str, Any]] = []
+        self.condition = threading.Condition()
+
+        # Images stack on one to three shared base layers, the empty layer and a unique one
+        base_layers = [f"sha256:{_digest(f'base{i}')}" for i in range(3)]
+        self.images = []
+        for i in range(max(images, 1)):
+            self.images.append({
+                "Id": f"sha256:{_digest(f'image{i}')}",
+                "RepoTags": [f"repo{i}/app:latest"],
+                "RepoDigests": [],
+                "Created": BASE_TIME + i,
+                "Size": 100_000_000 + i * 1_000_000,
+                "SharedSize": -1,
+                "Containers": -1,
+                "Labels": {},
+                "ParentId": "",
+                "RootFS": {"Type": "layers", "Layers": base_layers[:1 + i % 3] + [EMPTY_LAYER, f"sha256:{_digest(f'layer{i}')}"]},
+            })
+
+        self.networks = []
+        for n in range(max(networks, 1)):
+            self.networks.append({
+                "Id": _digest(f"net{n}"),
+                "Name": f"net{n}",
+                "Driver": "bridge",
+                "Scope": "local",
+                "Internal": False,
+                "Created": "2024-01-01T00:00:00Z",
+                "IPAM": {"Config": [{"Subnet": f"172.{18 + n}.0.0/16"}]},
+                "Labels": {},
+                "Containers": {},
+            })
+
+        # Every fifth container is stopped; the rest are spread over
+        # compose projects, networks and images round-robin
+        self.containers = []
+        for c in range(containers):
+            container_id = _digest(f"c{c}")
+            image = self.images[c % len(self.images)]
+            network = self.networks[c % len(self.networks)]
+            state = "exited" if c % 5 == 0 else "running"
+            address = f"172.{18 + c % len(self.networks)}.{c // 250}.{c % 250 + 2}"
+            self.containers.append({
+                "Id": container_id,
+                "Names": [f"/c{c}"],
+                "Image": image["RepoTags"][0],
+                "ImageID": image["Id"],
+                "Command": "app --serve",
+                "Created": BASE_TIME + c,
+                "State": state,
+                "Status": "Up 1 hour" if state == "running" else "Exited (0) 1 hour ago",
+                "Ports": [{"PrivatePort": 80, "PublicPort": 8000 + c, "Type": "tcp", "IP": "0.0.0.0"}],
+                "Labels": {
+                    "com.docker.compose.project": f"proj{c % max(projects, 1)}",
+                    "com.docker.compose.service": f"svc{c % 3}",
+                },
+                "NetworkSettings": {"Networks": {network["Name"]: {"NetworkID": network["Id"], "IPAddress": address}}},
+                "Mounts": [],
+            })
+            network["Containers"][container_id] = {"Name": f"c{c}", "IPv4Address": f"{address}/16"}
+
+        # The first crash_loops running containers restarted a few times in
+        # the last minutes; every other one was OOM killed, every third one
+        # is failing its health check
+        now = time.time()
+        looping = [container for container in self.containers if container["State"] == "running"][:crash_loops]
+        for index, container in enumerate(looping):
+            for restart in range(4):
+                moment = now - 300 + restart * 60 + index
+                oom = index % 2 == 0 and restart == 3
+                if oom:
+                    self.emit(self.container_event(container, "oom", moment - 0.5))
+                self.emit(self.container_event(container, "die", moment, exitCode="137" if oom else "1"))
+                self.emit(self.container_event(container, "start", moment + 1))
+            if index % 3 == 0:
+                self.emit(self.container_event(container, "health_status: unhealthy", now - 30 + index))
+        self.events.sort(key=lambda event: event["timeNano"])
+
+    def find_container(self, ref: str) -> Optional[Dict[str, Any]]:
+        for container in self.containers:
+            if container["Id"].startswith(ref) or container["Names"][0] == f"/{ref}":
+                return container
+        return None
+
+    def find_image(self, ref: str) -> Optional[Dict[str, Any]]:
+        for image in self.images:
+            if image["Id"] == ref or image["Id"].startswith(f"sha256:{ref}") or ref in image["RepoTags"]:
+                return image
+        return None
+
+    def find_network(self, ref: str) -> Optional[Dict[str, Any]]:
+        for network in self.networks:
+            if network["Id"].startswith(ref) or network["Name"] == ref:
+                return network
+        return None
+
+    def layer_sizes(self, image: Dict[str, Any]) -> Dict[str, int]:
+        layers = [layer for layer in image["RootFS"]["Layers"] if layer != EMPTY_LAYER]
+        base = [BASE_LAYER_SIZE] * (len(layers) - 1)
+        return dict(zip(layers, base + [image["Size"] - sum(base)]))
+
+    def history(self, image: Dict[str, Any]) -> List[Dict[str, Any]]:
+        sizes = self.layer_sizes(image)
+        entries = [
+            {"Id": "<missing>", "Created": image["Created"], "CreatedBy": "WORKDIR /app" if layer == EMPTY_LAYER else f"ADD layer {layer[7:19]}",
+             "Size": sizes.get(layer, 0)}
+            for layer in image["RootFS"]["Layers"]
+        ]
+        entries.insert(1, {"Id": "<missing>", "Created": image["Created"], "CreatedBy": "ENV APP=1", "Size": 0})
+        entries.append({"Id": image["Id"], "Created": image["Created"], "CreatedBy": 'CMD ["app"]', "Size": 0})
+        return list(reversed(entries))
+
+    def inspect_container(self, container: Dict[str, Any]) -> Dict[str, Any]:
+        running = container["State"] == "running"
+        return {
+            "Id": container["Id"],
+            "Name": container["Names"][0],
+            "Created": "2024-01-01T00:00:00Z",
+            "Image": container["ImageID"],
+            "State": {"Status": container["State"], "Running": running, "StartedAt": "2024-01-01T00:00:00Z",
+                      "RestartCount": 0, "OOMKilled": False},
+            "RestartCount": 0,
+            "Config": {"Image": container["Image"], "Labels": container["Labels"], "Tty": False},
+            "NetworkSettings": {
+                "Networks": container["NetworkSettings"]["Networks"],
+                "Ports": {"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": str(container["Ports"][0]["PublicPort"])}]},
+            },
+            "Mounts": container["Mounts"],
+            "HostConfig": {},
+        }
+
+    def system_df(self) -> Dict[str, Any]:
+        owners: Dict[str, int] = {}
+        sizes: Dict[str, int] = {}
+        for image in self.images:
+            for layer, size in self.layer_sizes(image).items():
+                owners[layer] = owners.get(layer, 0) + 1
+                sizes[layer] = size
+        return {
+            "LayersSize": sum(sizes.values()),
+            "Images": [{
+                "Id": image["Id"],
+                "RepoTags": image["RepoTags"],
+                "Size": image["Size"],
+                "SharedSize": sum(size for layer, size in self.layer_sizes(image).items() if owners[layer] > 1),
+                "Containers": sum(container["ImageID"] == image["Id"] for container in self.containers),
+                "Created": image["Created"],
+            } for image in self.images],
+            "Containers": [{
+                "Id": container["Id"],
+                "Names": container["Names"],
+                "Image": container["Image"],
+                "SizeRw": 1000,
+                "SizeRootFs": 100_000_000,
+                "State": container["State"],
+            } for container in self.containers],
+            "Volumes": [{"Name": "vol0", "Driver": "local", "Mountpoint": "/var/lib/docker/volumes/vol0/_data",
+                         "UsageData": {"Size": 5_000_000, "RefCount": 0}}],
+            "BuildCache": [{"ID": "cache0", "Type": "regular", "Size": 3_000_000, "InUse": False, "Shared": False}],
+        }
+
+    def container_event(self, container: Dict[str, Any], action: str, moment: float,
+                        **attributes: str) -> Dict[str, Any]:
+        return {
+            "Type": "container", "Action": action, "status": action, "id": container["Id"],
+            "Actor": {"ID": container["Id"], "Attributes": {"name": container["Names"][0][1:],
+                                                            "image": container["Image"], **attributes}},
+            "time": int(moment), "timeNano": int(moment * 1_000_000_000),
+        }
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify_all()
+
+def _matches(container: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    for key, values in filters.items():
+        if isinstance(values, dict):
+            values = [value for value, enabled in values.items() if enabled]
+        for value in values:
+            if key == "label":
+                label, _, expected = value.partition("=")
+                if label not in container["Labels"] or (expected and container["Labels"][label] != expected):
+                    return False
+            elif key == "name" and not re.search(value, container["Names"][0]):
+                return False
+            elif key == "status" and container["State"] != value:
+                return False
+            elif key == "id" and not container["Id"].startswith(value):
+                return False
+    return True
+
+def _handler(state: FakeDaemonState) -> type:
+    class EngineAPIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def do_HEAD(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self) -> None:
+            self._route()
+
+        def do_POST(self) -> None:
+            self._route()
+
+        def _json(self, body: Any, status: int = 200) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _not_found(self, message: str) -> None:
+            self._json({"message": message}, 404)
+
+        def _start_stream(self, content_type: str = "application/json") -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        def _chunk(self, data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def _end_stream(self) -> None:
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+        def _route(self) -> None:
+            if state.latency:
+                time.sleep(state.latency)
+            url = urlparse(self.path)
+            path = re.sub(r"^/v[0-9.]+", "", url.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            try:
+                self._dispatch(path, query)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _dispatch(self, path: str, query: Dict[str, str]) -> None:
+            if path == "/_ping":
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"OK")
+                return
+            if path == "/version":
+                return self._json({"Version": "27.0.0", "ApiVersion": API_VERSION, "MinAPIVersion": "1.24",
+                                   "Os": "linux", "Arch": "amd64", "KernelVersion": "6.0.0-fake"})
+            if path == "/info":
+                running = sum(container["State"] == "running" for container in state.containers)
+                return self._json({
+                    "Name": "fakehost", "ServerVersion": "27.0.0", "OperatingSystem": "FakeOS",
+                    "Architecture": "x86_64", "NCPU": 4, "MemTotal": 8 << 30,
+                    "Containers": len(state.containers), "ContainersRunning": running,
+                    "ContainersPaused": 0, "ContainersStopped": len(state.containers) - running,
+                    "Images": len(state.images),
+                })
+            if path == "/containers/json":
+                filters = json.loads(query.get("filters") or "{}")
+                everything = query.get("all") in TRUE_VALUES
+                containers = [
+                    container for container in state.containers
+                    if (everything or container["State"] == "running") and _matches(container, filters)
+                ]
+                if int(query.get("limit") or 0) > 0:
+                    containers = containers[:int(query["limit"])]
+                return self._json(containers)
+            match = re.match(r"^/containers/([^/]+)/(json|logs|stats)$", path)
+            if match:
+                container = state.find_container(match.group(1))
+                if not container:
+                    return self._not_found(f"No such container: {match.group(1)}")
+                if match.group(2) == "json":
+                    return self._json(state.inspect_container(container))
+                if match.group(2) == "logs":
+                    return self._logs(container, query)
+                return self._stats(container, query)
+            if path == "/images/json":
+                return self._json([{key: value for key, value in image.items() if key != "RootFS"} for image in state.images])
+            if path == "/images/create":
+                return self._pull(query)
+            match = re.match(r"^/images/(.+)/(json|history)$", path)
+            if match:
+                image = state.find_image(match.group(1))
+                if not image:
+                    return self._not_found(f"No such image: {match.group(1)}")
+                return self._json(image if match.group(2) == "json" else state.history(image))
+            if path == "/networks":
+                return self._json([dict(network, Containers={}) for network in state.networks])
+            match = re.match(r"^/networks/([^/]+)$", path)
+            if match:
+                network = state.find_network(match.group(1))
+                return self._json(network) if network else self._not_found(f"network {match.group(1)} not found")
+            if path == "/events":
+                return self._events(query)
+            if path == "/system/df":
+                return self._json(state.system_df())
+            return self._not_found(f"page not found: {path}")
+
+        def _logs(self, container: Dict[str, Any], query: Dict[str, str]) -> None:
+            # Every seventh line is an error on stderr, the rest health-check
+            # noise on stdout, one line per second from BASE_TIME
+            total = state.log_lines
+            tail = query.get("tail", "all")
+            start = 0 if tail == "all" else max(0, total - int(tail))
+            since = float(query.get("since") or 0)
+            until = float(query.get("until") or 0)
+            timestamps = query.get("timestamps") in TRUE_VALUES
+            streams = {1: query.get("stdout") in TRUE_VALUES, 2: query.get("stderr") in TRUE_VALUES}
+            self._start_stream("application/vnd.docker.raw-stream")
+            frames = []
+            for i in range(start, total):
+                moment = BASE_TIME + i
+                if (since and moment < since) or (until and moment > until):
+                    continue
+                stream = 2 if i % 7 == 0 else 1
+                if not streams[stream]:
+                    continue
+                message = (f"ERROR request {i} failed code={500 + i % 3}" if stream == 2
+                           else f"GET /health 200 {i % 13}ms id={i}")
+                if timestamps:
+                    message = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(moment)) + f".{i % 1000:09d}Z {message}"
+                data = f"{message}\n".encode()
+                frames.append(struct.pack(">BxxxL", stream, len(data)) + data)
+                if len(frames) >= 256:
+                    self._chunk(b"".join(frames))
+                    frames = []
+            if frames:
+                self._chunk(b"".join(frames))
+            if query.get("follow") in TRUE_VALUES:
+                for i in range(5):
+                    time.sleep(0.2)
+                    message = f"follow line {i}"
+                    if timestamps:
+                        message = f"{_rfc3339(time.time())} {message}"
+                    data = f"{message}\n".encode()
+                    self._chunk(struct.pack(">BxxxL", 1, len(data)) + data)
+            self._end_stream()
+
+        def _stats_sample(self, container: Dict[str, Any], tick: int,
+                          preread: Optional[float] = None) -> Dict[str, Any]:
+            # Usage grows with the container's index so rankings are stable
+            weight = state.containers.index(container) + 1
+            return {
+                "read": _rfc3339(time.time()),
+                "preread": _rfc3339(preread) if preread else ZERO_TIME,
+                "name": container["Names"][0],
+                "id": container["Id"],
+                "cpu_stats": {"cpu_usage": {"total_usage": 1_000_000 * tick * weight},
+                              "system_cpu_usage": 100_000_000 * tick, "online_cpus": 4},
+                "precpu_stats": {"cpu_usage": {"total_usage": 1_000_000 * (tick - 1) * weight},
+                                 "system_cpu_usage": 100_000_000 * (tick - 1), "online_cpus": 4},
+                "memory_stats": {"usage": 10_000_000 * weight, "limit": 8 << 30, "stats": {"inactive_file": 1000}},
+                "networks": {"eth0": {"rx_bytes": 1000 * tick * weight, "tx_bytes": 500 * tick * weight}},
+                "blkio_stats": {"io_service_bytes_recursive": [
+                    {"op": "read", "value": 4096 * tick},
+                    {"op": "write", "value": 8192 * tick},
+                ]},
+            }
+
+        def _stats(self, container: Dict[str, Any], query: Dict[str, str]) -> None:
+            if query.get("stream") in ("0", "false", "False"):
+                # Like the daemon, a non one-shot sample waits for a second reading
+                if query.get("one-shot") in TRUE_VALUES:
+                    return self._json(self._stats_sample(container, int(time.monotonic() * 10)))
+                started = time.time()
+                time.sleep(state.stats_interval)
+                return self._json(self._stats_sample(container, 2, started))
+            self._start_stream()
+            tick = 2
+            preread = None
+            try:
+                while True:
+                    sample = self._stats_sample(container, tick, preread)
+                    self._chunk(json.dumps(sample).encode() + b"\n")
+                    tick += 1
+                    preread = time.time()
+                    time.sleep(state.stats_interval)
+            except OSError:
+                return
+
+        def _pull(self, query: Dict[str, str]) -> None:
+            reference = f"{query.get('fromImage')}:{query.get('tag') or 'latest'}"
+            self._start_stream()
+            for layer in range(3):
+                for percent in range(0, 101, 25):
+                    self._chunk(json.dumps({
+                        "status": "Downloading", "id": f"layer{layer}",
+                        "progressDetail": {"current": percent * 1000, "total": 100000},
+                    }).encode() + b"\r\n")
+                    time.sleep(state.pull_step)
+                self._chunk(json.dumps({"status": "Pull complete", "id": f"layer{layer}"}).encode() + b"\r\n")
+            if not state.find_image(reference):
+                state.images.append({
+                    "Id": f"sha256:{_digest(reference)}", "RepoTags": [reference], "RepoDigests": [],
+                    "Created": int(time.time()), "Size": 5_000_000, "SharedSize": -1, "Containers": -1,
+                    "Labels": {}, "ParentId": "",
+                    "RootFS": {"Type": "layers", "Layers": [f"sha256:{_digest(reference + 'layer')}"]},
+                })
+                state.emit({"Type": "image", "Action": "pull", "Actor": {"ID": reference, "Attributes": {"name": reference}},
+                            "time": int(time.time()), "timeNano": time.time_ns()})
+            self._chunk(json.dumps({"status": f"Digest: sha256:{_digest(reference)}"}).encode() + b"\r\n")
+            self._chunk(json.dumps({"status": f"Status: Downloaded newer image for {reference}"}).encode() + b"\r\n")
+            self._end_stream()
+
+        def _events(self, query: Dict[str, str]) -> None:
+            # Like the daemon: replay from since, stop at until if given,
+            # otherwise keep following new events
+            since = float(query.get("since") or 0)
+            until = float(query.get("until") or 0)
+            self._start_stream()
+            seen = 0
+            try:
+                while True:
+                    with state.condition:
+                        if not until:
+                            state.condition.wait_for(lambda: len(state.events) > seen, timeout=1.0)
+                        events = state.events[seen:]
+                        seen = len(state.events)
+                    for event in events:
+                        if event["time"] >= since and (not until or event["time"] <= until):
+                            self._chunk(json.dumps(event).encode() + b"\n")
+                    if until:
+                        self._end_stream()
+                        return
+            except OSError:
+                return
+
+    return EngineAPIHandler
+
+def serve(port: int = 0, **options: Any) -> Tuple[ThreadingHTTPServer, FakeDaemonState]:
+    """Start a fake daemon on localhost in a background thread"""
+    state = FakeDaemonState(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-docker", daemon=True).start()
+    return server, state
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake Docker Engine API on localhost")
+    parser.add_argument("--port", type=int, default=23750)
+    parser.add_argument("--containers", type=int, default=50)
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--networks", type=int, default=5)
+    parser.add_argument("--projects", type=int, default=3)
+    parser.add_argument("--log-lines", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every request")
+    parser.add_argument("--stats-interval", type=float, default=1.0, help="Seconds between stats samples")
+    parser.add_argument("--pull-step", type=float, default=0.05, help="Seconds between pull progress messages")
+    parser.add_argument("--crash-loops", type=int, default=0, help="Containers with recent restart-loop events")
+    args = parser.parse_args()
+
+    server, _ = serve(args.port, containers=args.containers, images=args.images, networks=args.networks,
+                      projects=args.projects, log_lines=args.log_lines, latency=args.latency_ms / 1000,
+                      stats_interval=args.stats_interval, pull_step=args.pull_step, crash_loops=args.crash_loops)
+    print(f"🐳 Fake Docker daemon listening on tcp://127.0.0.1:{server.server_address[1]}", flush=True)
+    threading.Event().wait()
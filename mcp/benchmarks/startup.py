@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Docker MCP server
+
+Starts the server the way mcpo does (a child process speaking MCP over
+stdio), then times how long it takes from spawn until it answers
+initialize and the first tools/list. Startup must not depend on a Docker
+daemon, so by default DOCKER_HOST points at a closed port.
+
+    python3 mcp/benchmarks/startup.py --runs 20
+    python3 mcp/benchmarks/startup.py --script   # python3 docker_mcp_tools.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, IO, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MCP_DIR = os.path.dirname(BENCH_DIR)
+PROTOCOL_VERSION = "2025-06-18"
+
+def _send(stream: IO[str], message: Dict[str, Any]) -> None:
+    stream.write(json.dumps({"jsonrpc": "2.0", **message}) + "\n")
+    stream.flush()
+
+def _response(stream: IO[str], request_id: int) -> Dict[str, Any]:
+    for line in stream:
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+    raise RuntimeError("server exited before answering")
+
+def measure(command: List[str], env: Dict[str, str]) -> Dict[str, float]:
+    """Spawn the server once and time its first two responses"""
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=MCP_DIR, env=env, text=True,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        _send(process.stdin, {"id": 1, "method": "initialize", "params": {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "startup-benchmark", "version": "1.0"},
+        }})
+        _response(process.stdout, 1)
+        initialized = time.perf_counter()
+        _send(process.stdin, {"method": "notifications/initialized"})
+        _send(process.stdin, {"id": 2, "method": "tools/list"})
+        tools = _response(process.stdout, 2)["result"]["tools"]
+        listed = time.perf_counter()
+    finally:
+        process.kill()
+        process.wait()
+    return {
+        "initialize_ms": (initialized - started) * 1000,
+        "tools_list_ms": (listed - started) * 1000,
+        "tools": len(tools),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the Docker MCP server's cold start over stdio")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--script", action="store_true",
+                        help="Run the file as a script (recompiled on every start) instead of with -m")
+    parser.add_argument("--docker-host", default="tcp://127.0.0.1:9", help="DOCKER_HOST for the server")
+    args = parser.parse_args()
+
+    target = [os.path.join(MCP_DIR, "docker_mcp_tools.py")] if args.script else ["-m", "docker_mcp_tools"]
+    command = [sys.executable, *target]
+    env = dict(os.environ, DOCKER_HOST=args.docker_host, MCP_METRICS_PORT="0")
+
+    # One unmeasured start writes the bytecode cache and warms the OS caches
+    measure(command, env)
+    runs = [measure(command, env) for _ in range(args.runs)]
+
+    print(f"{' '.join(command[1:])}: {runs[0]['tools']} tools, {args.runs} runs")
+    for key in ("initialize_ms", "tools_list_ms"):
+        samples = [run[key] for run in runs]
+        print(f"  {key:<14} min {min(samples):7.1f}  median {statistics.median(samples):7.1f}  max {max(samples):7.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,29 @@ Provides Docker management capabilities via MCP protocol
 """
 
 import asyncio
+import base64
+import codecs
+import contextvars
+import functools
+import heapq
+import importlib.util
 import json
 import logging
-from typing import Any, Dict, List, Optional
-import docker
-import subprocess
+import re
+import sys
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Union
 import os
 from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions, Server
+from mcp.server.stdio import stdio_server
 from mcp.types import (
     Resource,
     Tool,
@@ -22,6 +37,24 @@ from mcp.types import (
 )
 import mcp.types as types
 
+def _lazy_import(name: str) -> Any:
+    """Import a module on first attribute access instead of now"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+# The docker SDK (and requests under it) takes about as long to import as
+# the rest of the server and is only needed once a tool talks to a daemon,
+# so it loads on first use and the server can answer initialize first.
+docker = _lazy_import("docker")
+requests = _lazy_import("requests")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,21 +62,870 @@ logging.basicConfig(
 )
 logger = logging.getLogger("docker_mcp_server")
 
-# Initialize Docker client
-try:
-    docker_client = docker.from_env()
-    logger.info("✅ Docker client initialized successfully")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize Docker client: {e}")
-    docker_client = None
+# Metrics
+# Tool dispatch and every Docker Engine API request record call counts,
+# errors, in-flight gauges, latency histograms and response sizes. They are
+# served in Prometheus text format on MCP_METRICS_PORT (next to the mcpo
+# proxy; 0 disables it) and summarised by the docker_mcp_metrics tool.
+METRICS_PORT = int(os.environ.get("MCP_METRICS_PORT", "8002"))
+METRICS_HOST = os.environ.get("MCP_METRICS_HOST", "0.0.0.0")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = {
+    "docker_mcp_tool_calls_total": ("counter", "Tool calls by outcome", ("tool", "status")),
+    "docker_mcp_tool_in_flight": ("gauge", "Tool calls currently executing", ("tool",)),
+    "docker_mcp_tool_duration_seconds": ("histogram", "Tool execution time", ("tool",)),
+    "docker_mcp_tool_response_bytes": ("histogram", "Size of rendered tool responses", ("tool",)),
+    "docker_mcp_cache_requests_total": ("counter", "Response cache lookups by result (hit, coalesced, miss)", ("tool", "result")),
+    "docker_mcp_api_requests_total": ("counter", "Docker Engine API requests by status class", ("host", "method", "endpoint", "status")),
+    "docker_mcp_api_in_flight": ("gauge", "Docker Engine API requests awaiting response headers", ("host",)),
+    "docker_mcp_api_duration_seconds": ("histogram", "Time to Docker Engine API response headers", ("host", "method", "endpoint")),
+    "docker_mcp_api_response_bytes": ("histogram", "Docker Engine API response sizes, when known up front", ("host", "method", "endpoint")),
+}
+
+class Histogram:
+    """Cumulative-bucket histogram with Prometheus semantics"""
+    
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating within its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters, gauges and histograms"""
+    
+    def __init__(self):
+        self._values: Dict[str, Dict[tuple, Any]] = {name: {} for name in METRICS}
+        self._lock = threading.Lock()
+    
+    def inc(self, name: str, labels: tuple, amount: float = 1) -> None:
+        with self._lock:
+            series = self._values[name]
+            series[labels] = series.get(labels, 0) + amount
+    
+    def observe(self, name: str, labels: tuple, value: float, buckets: tuple = LATENCY_BUCKETS) -> None:
+        with self._lock:
+            series = self._values[name]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(buckets)
+            histogram.observe(value)
+    
+    def series(self, name: str) -> Dict[tuple, Any]:
+        with self._lock:
+            return dict(self._values[name])
+    
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, label_names) in METRICS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(self._values[name].items()):
+                    label_text = ",".join(f'{key}="{_escape_label(item)}"' for key, item in zip(label_names, labels))
+                    if kind != "histogram":
+                        lines.append(f"{name}{{{label_text}}} {value}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*value.buckets, "+Inf"), value.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{label_text}}} {value.sum}")
+                    lines.append(f"{name}_count{{{label_text}}} {value.count}")
+        return "\n".join(lines) + "\n"
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+metrics = MetricsRegistry()
+
+# Engine API paths are reduced to endpoint templates so IDs and image
+# names do not explode the label space
+API_VERSION_PREFIX = re.compile(r"^/v[0-9.]+")
+API_OBJECT_PATH = re.compile(r"^/(containers|networks|volumes|exec|plugins|services|tasks|secrets|configs|nodes)/(?!json$|create$|prune$)[^/]+")
+API_IMAGE_PATH = re.compile(r"^/images/(?!json$|create$|prune$|search$|load$|get$)(.+?)(?=/(json|history|push|tag|get)$|$)")
+
+def _api_endpoint(path_url: str) -> str:
+    path = API_VERSION_PREFIX.sub("", path_url.split("?", 1)[0])
+    path = API_OBJECT_PATH.sub(lambda match: f"/{match.group(1)}/{{id}}", path)
+    return API_IMAGE_PATH.sub("/images/{name}", path)
+
+def _instrument_client(client: "docker.DockerClient", host: str) -> None:
+    """Record every Engine API request made through a client"""
+    send = client.api.send
+    
+    def instrumented_send(request: Any, **kwargs: Any) -> Any:
+        labels = (host, request.method, _api_endpoint(request.path_url))
+        metrics.inc("docker_mcp_api_in_flight", (host,))
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = send(request, **kwargs)
+            status = f"{response.status_code // 100}xx"
+            length = response.headers.get("Content-Length")
+            if length is not None:
+                metrics.observe("docker_mcp_api_response_bytes", labels, int(length), SIZE_BUCKETS)
+            return response
+        finally:
+            metrics.inc("docker_mcp_api_in_flight", (host,), -1)
+            metrics.observe("docker_mcp_api_duration_seconds", labels, time.perf_counter() - started)
+            metrics.inc("docker_mcp_api_requests_total", (*labels, status))
+    
+    client.api.send = instrumented_send
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"metrics: {format % args}")
+
+def start_metrics_server(port: int = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics from a background thread; a busy port only disables it"""
+    if port <= 0:
+        return None
+    try:
+        metrics_server = ThreadingHTTPServer((METRICS_HOST, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Metrics endpoint disabled, cannot bind port {port}: {e}")
+        return None
+    metrics_server.daemon_threads = True
+    threading.Thread(target=metrics_server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"📊 Metrics available at http://{METRICS_HOST}:{metrics_server.server_address[1]}/metrics")
+    return metrics_server
+
+# Docker hosts
+# Every configured daemon gets one client, created on first use and kept
+# with a connection pool large enough for concurrent calls and streams.
+# A host that cannot be reached is retried with exponential backoff, and a
+# health-check thread pings all connected hosts so a daemon that went away
+# is reconnected lazily on the next call. MCP_DOCKER_HOSTS adds hosts as
+# comma-separated name=url pairs (unix://, tcp:// or ssh://); "local" is
+# always the environment's daemon (DOCKER_HOST and friends).
+DEFAULT_HOST = "local"
+ALL_HOSTS = "all"
+DOCKER_POOL_SIZE = int(os.environ.get("MCP_DOCKER_POOL_SIZE", "32"))
+HOST_BACKOFF_BASE = 1.0
+HOST_BACKOFF_MAX = float(os.environ.get("MCP_DOCKER_BACKOFF_MAX", "60"))
+HOST_HEALTH_INTERVAL = float(os.environ.get("MCP_DOCKER_HEALTH_INTERVAL", "30"))
+
+class DockerHostError(Exception):
+    """A Docker host is unknown or currently unreachable"""
+
+def _parse_hosts(spec: str) -> Dict[str, Optional[str]]:
+    hosts: Dict[str, Optional[str]] = {DEFAULT_HOST: None}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, separator, url = entry.partition("=")
+        if not separator or not name.strip() or not url.strip():
+            raise ValueError(f"Invalid MCP_DOCKER_HOSTS entry '{entry}', expected name=url")
+        if name.strip() == ALL_HOSTS:
+            raise ValueError(f"'{ALL_HOSTS}' is reserved and cannot name a Docker host")
+        hosts[name.strip()] = url.strip()
+    return hosts
+
+class ClientManager:
+    """Pooled Docker clients per host with lazy reconnects and health checks"""
+    
+    def __init__(self, hosts: Dict[str, Optional[str]]):
+        self.hosts = hosts
+        self._clients: Dict[str, "docker.DockerClient"] = {}
+        self._failures: Dict[str, Dict[str, Any]] = {}
+        self._health: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.started = False
+    
+    def client(self, host: Optional[str] = None) -> "docker.DockerClient":
+        host = host or DEFAULT_HOST
+        client = self._clients.get(host)
+        if client is not None:
+            return client
+        if host not in self.hosts:
+            raise DockerHostError(f"Unknown Docker host '{host}'. Configured: {', '.join(self.hosts)}")
+        with self._lock:
+            client = self._clients.get(host)
+            if client is not None:
+                return client
+            failure = self._failures.get(host)
+            if failure and time.monotonic() < failure["retry_at"]:
+                raise DockerHostError(
+                    f"Docker host '{host}' unavailable, retrying in "
+                    f"{failure['retry_at'] - time.monotonic():.0f}s: {failure['error']}"
+                )
+            try:
+                client = self._connect(host)
+            except Exception as e:
+                attempts = failure["attempts"] + 1 if failure else 1
+                delay = min(HOST_BACKOFF_MAX, HOST_BACKOFF_BASE * 2 ** (attempts - 1))
+                self._failures[host] = {"attempts": attempts, "retry_at": time.monotonic() + delay, "error": str(e)}
+                logger.error(f"❌ Failed to connect to Docker host '{host}': {e}")
+                raise DockerHostError(f"Docker host '{host}' unavailable: {e}") from e
+            self._failures.pop(host, None)
+            self._clients[host] = client
+            logger.info(f"✅ Docker client for '{host}' initialized successfully")
+            return client
+    
+    def connected(self, host: Optional[str] = None) -> bool:
+        """Whether a host has a client, so using it needs no blocking connect"""
+        return (host or DEFAULT_HOST) in self._clients
+    
+    def _connect(self, host: str) -> "docker.DockerClient":
+        url = self.hosts[host]
+        if url is None:
+            client = docker.from_env(max_pool_size=DOCKER_POOL_SIZE)
+        else:
+            # ssh:// goes through the system ssh client, like the docker CLI
+            client = docker.DockerClient(base_url=url, max_pool_size=DOCKER_POOL_SIZE,
+                                         use_ssh_client=url.startswith("ssh://"))
+        if client.api.base_url.startswith(("http://", "https://")):
+            # The SDK only sizes its own socket adapters; tcp:// hosts get
+            # requests' default pool of 10 connections
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=DOCKER_POOL_SIZE)
+            client.api.mount("http://", adapter)
+            client.api.mount("https://", adapter)
+        _instrument_client(client, host)
+        client.ping()
+        return client
+    
+    def reset(self, host: Optional[str] = None) -> None:
+        """Drop a host's client so the next call reconnects"""
+        with self._lock:
+            client = self._clients.pop(host or DEFAULT_HOST, None)
+        if client is not None:
+            logger.warning(f"Dropped connection to Docker host '{host or DEFAULT_HOST}'")
+            client.close()
+    
+    def check(self, host: str) -> Dict[str, Any]:
+        """Ping a host, connecting first if needed, and record its health"""
+        started = time.monotonic()
+        try:
+            client = self.client(host)
+            client.ping()
+            health = {"healthy": True, "latency_ms": round((time.monotonic() - started) * 1000, 1), "error": None}
+        except Exception as e:
+            if not isinstance(e, DockerHostError):
+                self.reset(host)
+            health = {"healthy": False, "latency_ms": None, "error": str(e)}
+        health["checked"] = datetime.now(timezone.utc).isoformat()
+        self._health[host] = health
+        return health
+    
+    def status(self) -> List[Dict[str, Any]]:
+        rows = []
+        for host, url in self.hosts.items():
+            health = self._health.get(host) or {}
+            failure = self._failures.get(host)
+            rows.append({
+                "host": host,
+                "url": url or os.environ.get("DOCKER_HOST", "default"),
+                "connected": host in self._clients,
+                "healthy": health.get("healthy"),
+                "latency_ms": health.get("latency_ms"),
+                "checked": health.get("checked"),
+                "error": health.get("error") or (failure["error"] if failure else None),
+                "retry_in": round(max(0.0, failure["retry_at"] - time.monotonic()), 1) if failure else None,
+            })
+        return rows
+    
+    def start(self) -> None:
+        if self.started:
+            return
+        self.started = True
+        threading.Thread(target=self._health_loop, name="docker-health", daemon=True).start()
+    
+    def _health_loop(self) -> None:
+        while not self._stop.wait(HOST_HEALTH_INTERVAL):
+            # Only connected hosts are pinged; the others reconnect on demand
+            for host in list(self._clients):
+                health = self.check(host)
+                if not health["healthy"]:
+                    logger.warning(f"Docker host '{host}' failed its health check: {health['error']}")
+
+client_manager = ClientManager(_parse_hosts(os.environ.get("MCP_DOCKER_HOSTS", "")))
+
+# Host selected for the current tool call; threads started outside a call
+# (state cache, stats collector) see the default host
+_current_host: contextvars.ContextVar = contextvars.ContextVar("docker_host", default=None)
+
+def _host_name() -> str:
+    return _current_host.get() or DEFAULT_HOST
+
+def _docker() -> "docker.DockerClient":
+    """Docker client of the host selected for the current call"""
+    return client_manager.client(_current_host.get())
 
 # Create MCP server instance
 server = Server("docker-mcp-server")
 
-@server.list_tools()
-async def handle_list_tools() -> List[Tool]:
-    """List all available Docker tools"""
-    return [
+# Execution engine
+# The docker SDK calls are blocking, so every handler pushes
+# them through a bounded worker pool instead of running them on the event
+# loop. Concurrency and timeouts are enforced per tool at dispatch time.
+WORKER_THREADS = int(os.environ.get("MCP_WORKER_THREADS", "8"))
+DEFAULT_TOOL_TIMEOUT = float(os.environ.get("MCP_TOOL_TIMEOUT", "60"))
+DEFAULT_TOOL_CONCURRENCY = int(os.environ.get("MCP_TOOL_CONCURRENCY", "4"))
+
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "docker_container_logs": 90.0,
+    "docker_logs_search": 300.0,
+    "docker_container_stats": 15.0,
+    "docker_stats_all": 60.0,
+    "docker_pull_image": 900.0,
+    "docker_compose_logs": 120.0,
+    "docker_disk_usage": 180.0,
+}
+
+TOOL_CONCURRENCY: Dict[str, int] = {
+    "docker_container_stats": 8,
+    "docker_stats_all": 2,
+    "docker_pull_image": 2,
+}
+
+_executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="docker-mcp")
+_tool_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+def _tool_semaphore(name: str) -> asyncio.Semaphore:
+    """Get the semaphore bounding concurrent calls of a tool"""
+    semaphore = _tool_semaphores.get(name)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(TOOL_CONCURRENCY.get(name, DEFAULT_TOOL_CONCURRENCY))
+        _tool_semaphores[name] = semaphore
+    return semaphore
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking Docker SDK call on the worker pool"""
+    return await run_in_executor(_executor, func, *args, **kwargs)
+
+async def run_in_executor(executor: ThreadPoolExecutor, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call on a given pool, for work that must not occupy the shared one"""
+    loop = asyncio.get_running_loop()
+    # Carry the call's context (the selected host) into the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, func, *args, **kwargs))
+
+# Docker state cache
+# Container, image and network listings are loaded once and then kept
+# current by following the daemon's event stream, so read-only tools answer
+# from memory. Any stream failure drops the cache back to the daemon until a
+# full resync succeeds. Disable with MCP_STATE_CACHE=0.
+STATE_CACHE_ENABLED = os.environ.get("MCP_STATE_CACHE", "1").lower() not in ("0", "false", "no")
+STATE_CACHE_RETRY = float(os.environ.get("MCP_STATE_CACHE_RETRY", "5"))
+
+# Container actions that do not change anything the cache holds
+IGNORED_CONTAINER_ACTIONS = {"attach", "resize", "top", "export", "commit", "copy", "archive-path", "extract-to-dir"}
+IGNORED_IMAGE_ACTIONS = {"push", "save"}
+
+def _resolve_reference(ref: str, candidates: Iterable[tuple]) -> Optional[str]:
+    """Resolve a reference against (id, names) pairs the way the daemon does.
+    
+    A full ID wins, then an exact name, then an ID prefix matching exactly
+    one candidate. An ambiguous prefix resolves to None.
+    """
+    prefixed = []
+    for candidate_id, names in candidates:
+        if ref == candidate_id or ref in names:
+            return candidate_id
+        if candidate_id.startswith(ref):
+            prefixed.append(candidate_id)
+    return prefixed[0] if len(prefixed) == 1 else None
+
+class StateCache:
+    """Event-driven in-memory copy of container, image and network state"""
+    
+    def __init__(self, retry_interval: float = STATE_CACHE_RETRY):
+        self.retry_interval = retry_interval
+        self.ready = False
+        self.started = False
+        # Bumped whenever container, image or network state changes, so
+        # derived views such as the network topology know when to rebuild
+        self.generation = 0
+        self._containers: Dict[str, Dict[str, Any]] = {}
+        self._details: Dict[str, Dict[str, Any]] = {}
+        self._images: Dict[str, Dict[str, Any]] = {}
+        self._networks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._events = None
+    
+    def start(self) -> None:
+        if self.started:
+            return
+        self.started = True
+        self._stop.clear()
+        threading.Thread(target=self._run, name="state-cache", daemon=True).start()
+    
+    def available(self) -> bool:
+        """Whether the cache can answer for the host of the current call"""
+        return self.ready and _host_name() == DEFAULT_HOST
+    
+    def stop(self) -> None:
+        self.started = False
+        self.ready = False
+        self._stop.set()
+        if self._events is not None:
+            self._events.close()
+    
+    def containers(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._containers.values())
+    
+    def images(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._images.values())
+    
+    def networks(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._networks.values())
+    
+    def resolve_container(self, container_ref: str) -> Optional[str]:
+        """Map a container name, ID or ID prefix to its full ID"""
+        with self._lock:
+            if container_ref in self._containers:
+                return container_ref
+            # An unknown or ambiguous reference falls back to the daemon
+            return _resolve_reference(container_ref, (
+                (container_id, [name.lstrip("/") for name in container.get("Names") or []])
+                for container_id, container in self._containers.items()
+            ))
+    
+    def container_details(self, container_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._details.get(container_id)
+    
+    def store_container_details(self, details: Dict[str, Any]) -> None:
+        with self._lock:
+            # Only keep details for containers the cache knows, so a destroy
+            # event can never race an inspect into a stale entry
+            if details["Id"] in self._containers:
+                self._details[details["Id"]] = details
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                since = int(time.time())
+                self._resync()
+                # Replaying from before the resync closes the gap between
+                # loading state and subscribing
+                self._events = _docker().api.events(since=since, decode=True)
+                self.ready = True
+                logger.info("🗄️ State cache synchronised, following Docker events")
+                for event in self._events:
+                    self._apply(event)
+                    if self._stop.is_set():
+                        break
+            except Exception as e:
+                logger.warning(f"State cache lost the event stream: {e}")
+            self.ready = False
+            self._stop.wait(self.retry_interval)
+    
+    def _resync(self) -> None:
+        containers = _docker().api.containers(all=True)
+        images = _docker().api.images()
+        networks = _docker().api.networks()
+        with self._lock:
+            self._containers = {container["Id"]: container for container in containers}
+            self._details = {}
+            self._images = {image["Id"]: image for image in images}
+            self._networks = {network["Id"]: network for network in networks}
+            self.generation += 1
+    
+    def _apply(self, event: Dict[str, Any]) -> None:
+        kind = event.get("Type")
+        action = (event.get("Action") or event.get("status") or "").split(":")[0]
+        actor = event.get("Actor") or {}
+        if kind == "container":
+            if action in IGNORED_CONTAINER_ACTIONS or action.startswith("exec_"):
+                return
+            self._refresh_container(actor.get("ID") or event.get("id"), removed=action == "destroy")
+        elif kind == "image":
+            if action not in IGNORED_IMAGE_ACTIONS:
+                images = _docker().api.images()
+                with self._lock:
+                    self._images = {image["Id"]: image for image in images}
+                    self.generation += 1
+        elif kind == "network":
+            networks = _docker().api.networks()
+            with self._lock:
+                self._networks = {network["Id"]: network for network in networks}
+            container_id = (actor.get("Attributes") or {}).get("container")
+            if container_id and action in ("connect", "disconnect"):
+                self._refresh_container(container_id)
+            self.generation += 1
+    
+    def _refresh_container(self, container_id: Optional[str], removed: bool = False) -> None:
+        if not container_id:
+            return
+        payload = [] if removed else _docker().api.containers(all=True, filters={"id": container_id})
+        with self._lock:
+            self._details.pop(container_id, None)
+            if payload:
+                self._containers[container_id] = payload[0]
+            else:
+                self._containers.pop(container_id, None)
+            self.generation += 1
+
+state_cache = StateCache()
+
+def _match_container_filters(container: Dict[str, Any], filters: Dict[str, Any]) -> Optional[bool]:
+    """Apply daemon-style container filters to a cached payload.
+    
+    Returns None when a filter is not supported in memory, so the caller can
+    ask the daemon instead.
+    """
+    for key, values in filters.items():
+        if isinstance(values, (str, int, bool)):
+            values = [values]
+        elif isinstance(values, dict):
+            values = [value for value, enabled in values.items() if enabled]
+        for value in values:
+            value = str(value)
+            if key == "status":
+                if container.get("State") != value:
+                    return False
+            elif key == "name":
+                names = [name.lstrip("/") for name in container.get("Names") or []]
+                if not any(re.search(value, name) for name in names):
+                    return False
+            elif key == "id":
+                if not container["Id"].startswith(value):
+                    return False
+            elif key == "label":
+                label, _, expected = value.partition("=")
+                labels = container.get("Labels") or {}
+                if label not in labels or (expected and labels[label] != expected):
+                    return False
+            else:
+                return None
+    return True
+
+def _cached_containers(all_containers: bool, filters: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Serve a container listing from the state cache, or None on a miss"""
+    if not state_cache.available():
+        return None
+    matched = []
+    for container in state_cache.containers():
+        if not all_containers and container.get("State") != "running":
+            continue
+        match = _match_container_filters(container, filters)
+        if match is None:
+            return None
+        if match:
+            matched.append(container)
+    matched.sort(key=lambda container: container.get("Created", 0), reverse=True)
+    return matched
+
+# Output rendering
+# Handlers return a ToolOutput holding structured records, and the dispatcher
+# renders it once in the format the caller asked for: the emoji markdown view,
+# the raw records as JSON, or a compact header-plus-rows table that costs the
+# fewest tokens for large listings.
+OUTPUT_FORMATS = ("markdown", "json", "compact")
+
+FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": list(OUTPUT_FORMATS),
+    "description": "Output format: markdown (default), json or compact",
+    "default": "markdown"
+}
+
+# Extra formats offered by individual tools
+TOOL_FORMATS: Dict[str, tuple] = {
+    "docker_network_topology": ("mermaid",),
+}
+
+class ToolOutput:
+    """Structured result of a tool call plus its markdown view"""
+    
+    def __init__(self, data: Dict[str, Any], markdown: Callable[[Dict[str, Any]], str],
+                 rows: Optional[List[Dict[str, Any]]] = None, columns: Optional[List[str]] = None,
+                 compact: Optional[Callable[[Dict[str, Any]], str]] = None,
+                 truncate: Optional[Callable[[int], "ToolOutput"]] = None,
+                 views: Optional[Dict[str, Callable[[Dict[str, Any]], str]]] = None):
+        self.data = data
+        self.markdown = markdown
+        self.rows = rows
+        self.columns = columns
+        self.compact = compact
+        # Renderers for tool-specific formats (see TOOL_FORMATS)
+        self.views = views or {}
+        # Rebuilds the output with only the first n rows, for outputs that can
+        # be cut short and continued with a cursor
+        self.truncate = truncate
+    
+    def render(self, fmt: str) -> str:
+        text = self._format(fmt)
+        if self.truncate is None or not self.rows or len(text.encode("utf-8")) <= OUTPUT_MAX_BYTES:
+            return text
+        # Binary search the longest prefix of rows that fits the budget
+        fitting = None
+        low, high = 1, len(self.rows) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            candidate = self.truncate(middle)._format(fmt)
+            if len(candidate.encode("utf-8")) <= OUTPUT_MAX_BYTES:
+                fitting, low = candidate, middle + 1
+            else:
+                high = middle - 1
+        return fitting if fitting is not None else self.truncate(1)._format(fmt)
+    
+    def _format(self, fmt: str) -> str:
+        if fmt in self.views:
+            return self.views[fmt](self.data)
+        if fmt == "json":
+            return json.dumps(self.data, default=str, separators=(",", ":"))
+        if fmt == "compact":
+            if self.compact is not None:
+                return self.compact(self.data)
+            if self.rows is not None:
+                return _compact_table(self.rows, self.columns)
+            return "\n".join(f"{key}={_compact_value(value)}" for key, value in _flatten(self.data))
+        return self.markdown(self.data)
+
+ToolResult = Union[ToolOutput, List[types.TextContent]]
+
+def _compact_value(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    if isinstance(value, (list, tuple)):
+        return ",".join(_compact_value(item) for item in value)
+    return str(value).replace("\t", " ").replace("\n", " ")
+
+def _compact_table(rows: List[Dict[str, Any]], columns: Optional[List[str]] = None) -> str:
+    """Tab-separated table with a single header row"""
+    if not rows:
+        return "(none)"
+    columns = columns or list(rows[0])
+    lines = ["\t".join(columns)]
+    lines.extend("\t".join(_compact_value(row.get(column)) for column in columns) for row in rows)
+    return "\n".join(lines)
+
+def _flatten(data: Any, prefix: str = "") -> Iterator[tuple]:
+    """Yield (dotted.key, scalar) pairs of a nested structure"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _flatten(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(data, list) and any(isinstance(item, (dict, list)) for item in data):
+        for index, value in enumerate(data):
+            yield from _flatten(value, f"{prefix}[{index}]")
+    else:
+        yield prefix, data
+
+# Listing pages
+# Listing tools return one page at a time: rows are sorted, cut at an offset,
+# projected to the requested fields and then trimmed further if the rendered
+# page exceeds the output budget. The cursor records where the next page
+# starts, so a large listing costs a bounded payload per call.
+LIST_PAGE_SIZE = int(os.environ.get("MCP_LIST_PAGE_SIZE", "50"))
+LIST_MAX_PAGE_SIZE = 500
+OUTPUT_MAX_BYTES = int(os.environ.get("MCP_MAX_OUTPUT_BYTES", "32768"))
+
+def _listing_properties(fields: List[str], default_fields: List[str]) -> Dict[str, Any]:
+    """Schema entries shared by the paginated listing tools"""
+    return {
+        "limit": {
+            "type": "integer",
+            "description": f"Maximum rows per page (default: {LIST_PAGE_SIZE}, max: {LIST_MAX_PAGE_SIZE})",
+            "default": LIST_PAGE_SIZE
+        },
+        "cursor": {
+            "type": "string",
+            "description": "next_cursor of the previous page; repeat the other arguments unchanged"
+        },
+        "fields": {
+            "type": "array",
+            "items": {"type": "string", "enum": fields},
+            "description": f"Fields to return (default: {', '.join(default_fields)})"
+        },
+        "sort_by": {
+            "type": "string",
+            "description": f"Field to sort by, prefixed with '-' for descending ({', '.join(fields)})"
+        }
+    }
+
+def _encode_cursor(offset: int, sort_by: str) -> str:
+    payload = json.dumps({"offset": offset, "sort_by": sort_by}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"offset": int(payload["offset"]), "sort_by": str(payload["sort_by"])}
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+
+def _sort_rows(rows: List[Dict[str, Any]], sort_by: str, identity: str) -> None:
+    field, descending = sort_by.lstrip("-"), sort_by.startswith("-")
+    # Sort on the identity first so equal keys keep a stable order across pages
+    rows.sort(key=lambda row: str(row.get(identity)))
+    
+    def sort_key(row: Dict[str, Any]) -> tuple:
+        value = row.get(field)
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, sort_keys=True)
+        return (value is not None, value if value is not None else 0)
+    
+    rows.sort(key=sort_key, reverse=descending)
+
+def _listing_page(key: str, rows: List[Dict[str, Any]], args: Dict[str, Any],
+                  markdown: Callable[[Dict[str, Any]], str], fields: List[str],
+                  default_fields: List[str], default_sort: str,
+                  extra: Optional[Dict[str, Any]] = None) -> ToolResult:
+    """Sort, page and project a listing into a ToolOutput.
+    
+    ``extra`` is merged into every page's data, for listing-wide summaries.
+    """
+    identity = fields[0]
+    try:
+        if args.get("cursor"):
+            position = _decode_cursor(args["cursor"])
+            offset, sort_by = position["offset"], position["sort_by"]
+        else:
+            offset, sort_by = 0, args.get("sort_by") or default_sort
+        if sort_by.lstrip("-") not in fields:
+            raise ValueError(f"Cannot sort by '{sort_by}'. Use one of: {', '.join(fields)}")
+        selected = args.get("fields") or default_fields
+        unknown = [field for field in selected if field not in fields]
+        if unknown:
+            raise ValueError(f"Unknown field(s) {', '.join(unknown)}. Use any of: {', '.join(fields)}")
+        limit = max(1, min(int(args.get("limit") or LIST_PAGE_SIZE), LIST_MAX_PAGE_SIZE))
+    except ValueError as e:
+        return [types.TextContent(type="text", text=f"❌ {e}")]
+    
+    # The identity column always leads so every row stays addressable
+    columns = [identity] + [field for field in selected if field != identity]
+    _sort_rows(rows, sort_by, identity)
+    page = [{column: row.get(column) for column in columns} for row in rows[offset:offset + limit]]
+    
+    def build(count: int) -> ToolOutput:
+        end = offset + count
+        data = {
+            key: page[:count],
+            "total": len(rows),
+            "offset": offset,
+            "sort_by": sort_by,
+            "next_cursor": _encode_cursor(end, sort_by) if end < len(rows) else None,
+            **(extra or {}),
+        }
+        return ToolOutput(
+            data,
+            lambda data: markdown(data) + _render_page_footer(data, key),
+            rows=data[key],
+            compact=lambda data: _compact_page(data, key, columns, extra),
+            truncate=build,
+        )
+    
+    return build(len(page))
+
+def _render_page_footer(data: Dict[str, Any], key: str) -> str:
+    shown = len(data[key])
+    if not data["next_cursor"] and not data["offset"]:
+        return ""
+    first = data["offset"] + 1 if shown else data["offset"]
+    footer = f"📄 Showing {first}-{data['offset'] + shown} of {data['total']}"
+    if data["next_cursor"]:
+        footer += f". Next page: `cursor={data['next_cursor']}`"
+    return footer + "\n"
+
+def _compact_page(data: Dict[str, Any], key: str, columns: List[str],
+                  extra: Optional[Dict[str, Any]] = None) -> str:
+    lines = [_compact_table(data[key], columns)]
+    if data["next_cursor"]:
+        lines.append(f"# {data['offset'] + len(data[key])}/{data['total']} next_cursor={data['next_cursor']}")
+    lines.extend(f"# {name}={_compact_value(value)}" for name, value in _flatten(extra or {}))
+    return "\n".join(lines)
+
+def _render_field_lines(row: Dict[str, Any], labels: Dict[str, tuple]) -> List[str]:
+    """Markdown detail lines for whichever labelled fields a projected row carries"""
+    lines = []
+    for field, (label, fmt) in labels.items():
+        if field in row:
+            lines.append(f"   - {label}: {fmt(row[field])}\n")
+    return lines
+
+def _code(value: Any) -> str:
+    if isinstance(value, dict):
+        value = ", ".join(f"{key}={item}" for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        value = ", ".join(str(item) for item in value)
+    return f"`{value}`" if value not in (None, "") else "none"
+
+def _merge_host_results(results: Dict[str, ToolResult]) -> ToolOutput:
+    """Combine per-host results of a fan-out call into one output"""
+    outputs = {
+        host: result if isinstance(result, ToolOutput) else ToolOutput(
+            {"error": "\n".join(content.text for content in result)},
+            lambda data: data["error"] + "\n",
+        )
+        for host, result in results.items()
+    }
+    data = {"hosts": {host: output.data for host, output in outputs.items()}}
+    
+    def markdown(data: Dict[str, Any]) -> str:
+        return "\n".join(f"## 🖥️ {host}\n\n{output.render('markdown')}" for host, output in outputs.items())
+    
+    def compact(data: Dict[str, Any]) -> str:
+        # Listings merge into one table with a leading host column; hosts
+        # that failed are reported as comment lines after it
+        failed = {host: output for host, output in outputs.items() if "error" in output.data}
+        listed = {host: output for host, output in outputs.items() if host not in failed}
+        if not listed or any(output.rows is None for output in listed.values()):
+            return "\n".join(f"# {host}\n{output.render('compact')}" for host, output in outputs.items())
+        rows = [{"host": host, **row} for host, output in listed.items() for row in output.rows]
+        first = next(iter(listed.values()))
+        columns = ["host"] + (first.columns or (list(rows[0])[1:] if rows else []))
+        lines = [_compact_table(rows, columns)]
+        lines.extend(f"# {host}: {output.data['error']}" for host, output in failed.items())
+        return "\n".join(lines)
+    
+    return ToolOutput(data, markdown, compact=compact)
+
+def _render_output(result: ToolResult, fmt: str) -> List[types.TextContent]:
+    """Serialise a handler result in the requested format"""
+    if isinstance(result, ToolOutput):
+        return [types.TextContent(type="text", text=result.render(fmt))]
+    if fmt == "json":
+        # Plain text results are errors and notices
+        return [types.TextContent(type="text", text=json.dumps({"error": content.text})) for content in result]
+    return result
+
+def _tool_definitions() -> List[Tool]:
+    """Build every tool with its input schema"""
+    tools = [
         Tool(
             name="docker_list_containers",
             description="List Docker containers with optional filters",
@@ -62,7 +944,13 @@ async def handle_list_tools() -> List[Tool]:
                             "status": {"type": "string"},
                             "name": {"type": "string"}
                         }
-                    }
+                    },
+                    "fresh": {
+                        "type": "boolean",
+                        "description": "Bypass the state cache and query the daemon",
+                        "default": False
+                    },
+                    **_listing_properties(CONTAINER_FIELDS, CONTAINER_DEFAULT_FIELDS)
                 }
             }
         ),
@@ -75,6 +963,11 @@ async def handle_list_tools() -> List[Tool]:
                     "container_id": {
                         "type": "string",
                         "description": "Container ID or name"
+                    },
+                    "fresh": {
+                        "type": "boolean",
+                        "description": "Bypass the state cache and query the daemon",
+                        "default": False
                     }
                 },
                 "required": ["container_id"]
@@ -97,13 +990,102 @@ async def handle_list_tools() -> List[Tool]:
                     },
                     "follow": {
                         "type": "boolean",
-                        "description": "Follow log output",
+                        "description": "Follow log output for follow_seconds, streaming new lines as log notifications",
+                        "default": False
+                    },
+                    "follow_seconds": {
+                        "type": "integer",
+                        "description": "How long to follow (default: 10, max: 60)",
+                        "default": 10
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Only logs after this time: ISO 8601, unix epoch or relative (e.g. 10m, 2h)"
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "Only logs before this time: ISO 8601, unix epoch or relative (e.g. 10m, 2h)"
+                    },
+                    "stream": {
+                        "type": "string",
+                        "enum": ["all", "stdout", "stderr"],
+                        "description": "Which output stream to read",
+                        "default": "all"
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": f"Maximum bytes of log text to return (default: {LOG_MAX_BYTES}, max: {LOG_MAX_BYTES_LIMIT})",
+                        "default": LOG_MAX_BYTES
+                    },
+                    "summarize": {
+                        "type": "boolean",
+                        "description": "Return lines grouped into counted templates, with error lines called out, instead of raw lines",
                         "default": False
                     }
                 },
                 "required": ["container_id"]
             }
         ),
+        Tool(
+            name="docker_logs_search",
+            description="Search a container's or compose project's logs on the server and return only matching lines with context",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "pattern": {
+                        "type": "string",
+                        "description": "Text or regular expression to look for"
+                    },
+                    "container_id": {
+                        "type": "string",
+                        "description": "Container ID or name"
+                    },
+                    "project": {
+                        "type": "string",
+                        "description": "Docker Compose project to search instead of a single container"
+                    },
+                    "regex": {
+                        "type": "boolean",
+                        "description": "Treat pattern as a regular expression",
+                        "default": False
+                    },
+                    "ignore_case": {
+                        "type": "boolean",
+                        "description": "Case-insensitive matching",
+                        "default": False
+                    },
+                    "context": {
+                        "type": "integer",
+                        "description": "Lines of context around each match (default: 2, max: 10)",
+                        "default": 2
+                    },
+                    "max_matches": {
+                        "type": "integer",
+                        "description": "Maximum matches to return per container (default: 50)",
+                        "default": 50
+                    },
+                    "lines": {
+                        "type": "integer",
+                        "description": "Only search the last N lines (default: whole log)"
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Only logs after this time: ISO 8601, unix epoch or relative (e.g. 10m, 2h)"
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "Only logs before this time: ISO 8601, unix epoch or relative (e.g. 10m, 2h)"
+                    },
+                    "stream": {
+                        "type": "string",
+                        "enum": ["all", "stdout", "stderr"],
+                        "description": "Which output stream to search",
+                        "default": "all"
+                    }
+                },
+                "required": ["pattern"]
+            }
+        ),
         Tool(
             name="docker_container_stats",
             description="Get resource usage statistics for a container",
@@ -113,11 +1095,47 @@ async def handle_list_tools() -> List[Tool]:
                     "container_id": {
                         "type": "string",
                         "description": "Container ID or name"
+                    },
+                    "window": {
+                        "type": "integer",
+                        "description": "Summarise the last N seconds of collected history (needs MCP_STATS_COLLECTOR=1)"
                     }
                 },
                 "required": ["container_id"]
             }
         ),
+        Tool(
+            name="docker_stats_all",
+            description="Sample resource usage of all running containers concurrently and rank the top consumers",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "sort_by": {
+                        "type": "string",
+                        "enum": ["cpu", "memory", "network", "blkio"],
+                        "description": "Metric to rank containers by",
+                        "default": "cpu"
+                    },
+                    "top": {
+                        "type": "integer",
+                        "description": "Number of containers to return (default: 10)",
+                        "default": 10
+                    },
+                    "label": {
+                        "type": "string",
+                        "description": "Only sample containers with this label (key or key=value)"
+                    },
+                    "name": {
+                        "type": "string",
+                        "description": "Only sample containers whose name matches"
+                    },
+                    "project": {
+                        "type": "string",
+                        "description": "Only sample containers of this Docker Compose project"
+                    }
+                }
+            }
+        ),
         Tool(
             name="docker_list_images",
             description="List Docker images",
@@ -132,7 +1150,18 @@ async def handle_list_tools() -> List[Tool]:
                     "filters": {
                         "type": "object",
                         "description": "Filter images by various criteria"
-                    }
+                    },
+                    "fresh": {
+                        "type": "boolean",
+                        "description": "Bypass the state cache and query the daemon",
+                        "default": False
+                    },
+                    "dedup": {
+                        "type": "boolean",
+                        "description": "Add unique and shared layer sizes and a deduplication report",
+                        "default": False
+                    },
+                    **_listing_properties(IMAGE_FIELDS, IMAGE_DEFAULT_FIELDS)
                 }
             }
         ),
@@ -146,13 +1175,22 @@ async def handle_list_tools() -> List[Tool]:
                         "type": "string",
                         "description": "Image name with optional tag (e.g., nginx:latest)"
                     },
+                    "images": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Several images to pull concurrently"
+                    },
                     "tag": {
                         "type": "string",
-                        "description": "Specific tag to pull",
+                        "description": "Tag for images given without one",
                         "default": "latest"
+                    },
+                    "parallelism": {
+                        "type": "integer",
+                        "description": f"How many images to pull at once (default: {PULL_PARALLELISM}, max: {PULL_WORKERS})",
+                        "default": PULL_PARALLELISM
                     }
-                },
-                "required": ["image"]
+                }
             }
         ),
         Tool(
@@ -163,15 +1201,38 @@ async def handle_list_tools() -> List[Tool]:
                 "properties": {}
             }
         ),
+        Tool(
+            name="docker_disk_usage",
+            description="Disk used by images, containers, volumes and build cache, with reclaimable space and the biggest consumers",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "top": {
+                        "type": "integer",
+                        "description": f"How many of the biggest consumers to list (default: {DF_TOP})",
+                        "default": DF_TOP
+                    },
+                    "fresh": {
+                        "type": "boolean",
+                        "description": "Recompute instead of using a result up to MCP_DF_TTL seconds old",
+                        "default": False
+                    }
+                }
+            }
+        ),
         Tool(
             name="docker_compose_services",
-            description="List Docker Compose services in current directory",
+            description="List Docker Compose projects and their services",
             inputSchema={
                 "type": "object",
                 "properties": {
+                    "project": {
+                        "type": "string",
+                        "description": "Compose project name (optional - all projects if not found)"
+                    },
                     "project_path": {
                         "type": "string",
-                        "description": "Path to docker-compose.yml directory",
+                        "description": "Project directory, matched against the compose working directory",
                         "default": "."
                     }
                 }
@@ -192,9 +1253,18 @@ async def handle_list_tools() -> List[Tool]:
                         "description": "Number of lines to retrieve",
                         "default": 100
                     },
+                    "summarize": {
+                        "type": "boolean",
+                        "description": "Return lines grouped into counted templates, with error lines called out, instead of raw lines",
+                        "default": False
+                    },
+                    "project": {
+                        "type": "string",
+                        "description": "Compose project name"
+                    },
                     "project_path": {
                         "type": "string",
-                        "description": "Path to docker-compose.yml directory",
+                        "description": "Project directory, matched against the compose working directory",
                         "default": "."
                     }
                 }
@@ -209,104 +1279,508 @@ async def handle_list_tools() -> List[Tool]:
                     "filters": {
                         "type": "object",
                         "description": "Filter networks by various criteria"
+                    },
+                    "fresh": {
+                        "type": "boolean",
+                        "description": "Bypass the state cache and query the daemon",
+                        "default": False
+                    },
+                    **_listing_properties(NETWORK_FIELDS, NETWORK_DEFAULT_FIELDS)
+                }
+            }
+        ),
+        Tool(
+            name="docker_network_topology",
+            description="Container-network graph: reachability, shared networks and published ports",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "enum": list(TOPOLOGY_QUERIES),
+                        "description": "graph (default), reach or shared (source to target), or ports",
+                        "default": "graph"
+                    },
+                    "source": {
+                        "type": "string",
+                        "description": "Source container name or ID for reach and shared"
+                    },
+                    "target": {
+                        "type": "string",
+                        "description": "Target container name or ID for reach and shared"
+                    },
+                    "container": {
+                        "type": "string",
+                        "description": "Limit the graph to this container's networks and neighbours"
+                    },
+                    "network": {
+                        "type": "string",
+                        "description": "Limit the graph to one network"
+                    },
+                    "port": {
+                        "type": "integer",
+                        "description": "Host port to look up with the ports query"
+                    },
+                    "fresh": {
+                        "type": "boolean",
+                        "description": "Rebuild the graph instead of using the cached one",
+                        "default": False
                     }
                 }
             }
-        )
-    ]
-
-@server.call_tool()
-async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
-    """Handle tool calls"""
-    
-    if not docker_client:
-        return [types.TextContent(
-            type="text", 
-            text="❌ Docker client not available. Please ensure Docker is running and accessible."
-        )]
-    
-    try:
-        if name == "docker_list_containers":
-            return await _list_containers(arguments)
-        elif name == "docker_container_info":
-            return await _container_info(arguments)
-        elif name == "docker_container_logs":
-            return await _container_logs(arguments)
-        elif name == "docker_container_stats":
-            return await _container_stats(arguments)
-        elif name == "docker_list_images":
-            return await _list_images(arguments)
-        elif name == "docker_pull_image":
-            return await _pull_image(arguments)
-        elif name == "docker_system_info":
-            return await _system_info(arguments)
-        elif name == "docker_compose_services":
-            return await _compose_services(arguments)
-        elif name == "docker_compose_logs":
-            return await _compose_logs(arguments)
-        elif name == "docker_network_list":
-            return await _network_list(arguments)
-        else:
+        ),
+        Tool(
+            name="docker_anomalies",
+            description="Report containers in restart loops, OOM killed, failing health checks or crashing, from the Docker event stream",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "window": {
+                        "type": "number",
+                        "description": f"How many seconds back to look (default: {ANOMALY_WINDOW:.0f})",
+                        "default": ANOMALY_WINDOW
+                    },
+                    "container": {
+                        "type": "string",
+                        "description": "Only report this container (name or ID)"
+                    },
+                    "events": {
+                        "type": "integer",
+                        "description": "Recent events to show per container (default: 5)",
+                        "default": 5
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="docker_hosts",
+            description="Health-check the configured Docker hosts",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="docker_mcp_metrics",
+            description="Latency, error and response-size metrics of this server's tools and Docker API calls",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "top": {
+                        "type": "integer",
+                        "description": "How many Docker API endpoints to list (default: 10)",
+                        "default": 10
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="docker_job_status",
+            description="Show the state and progress of a background job, or list all jobs",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job ID (omit to list all jobs)"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="docker_job_result",
+            description="Get the result of a finished background job",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job ID returned when the job was started"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        ),
+        Tool(
+            name="docker_job_cancel",
+            description="Cancel a running background job",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job ID to cancel"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        )
+    ]
+    for tool in tools:
+        properties = tool.inputSchema.setdefault("properties", {})
+        properties["format"] = FORMAT_PROPERTY
+        if tool.name in TOOL_FORMATS:
+            formats = OUTPUT_FORMATS + TOOL_FORMATS[tool.name]
+            properties["format"] = dict(FORMAT_PROPERTY, enum=list(formats),
+                                        description=f"Output format: {', '.join(formats)}")
+        if tool.name in JOB_TOOLS:
+            properties["background"] = BACKGROUND_PROPERTY
+        if tool.name not in HOSTLESS_TOOLS:
+            properties["host"] = HOST_PROPERTY
+    return tools
+
+# Response cache
+# Read-only tools are often called with the same arguments several times
+# within seconds. Their results are kept in an LRU keyed on host, tool and
+# normalised arguments (schema defaults filled in, output-only arguments
+# dropped) and rendered per call, so one entry serves every format. Entries
+# expire after a per-tool TTL, or as soon as the state cache sees a change
+# on the default host. Concurrent identical calls share one execution, and
+# mutating tools drop the entries they affect. Disable with
+# MCP_RESPONSE_CACHE=0; override TTLs with MCP_RESPONSE_CACHE_TTLS as
+# comma-separated tool=seconds pairs.
+RESPONSE_CACHE_ENABLED = os.environ.get("MCP_RESPONSE_CACHE", "1").lower() not in ("0", "false", "no")
+RESPONSE_CACHE_SIZE = int(os.environ.get("MCP_RESPONSE_CACHE_SIZE", "256"))
+
+RESPONSE_CACHE_TTLS: Dict[str, float] = {
+    "docker_list_containers": 2.0,
+    "docker_container_info": 2.0,
+    "docker_container_stats": 2.0,
+    "docker_stats_all": 2.0,
+    "docker_list_images": 10.0,
+    "docker_system_info": 10.0,
+    "docker_compose_services": 3.0,
+    "docker_network_list": 10.0,
+    "docker_network_topology": 5.0,
+}
+RESPONSE_CACHE_TTLS.update(
+    (tool.strip(), float(ttl))
+    for tool, _, ttl in (pair.partition("=") for pair in os.environ.get("MCP_RESPONSE_CACHE_TTLS", "").split(","))
+    if tool.strip() and ttl
+)
+
+# Cached tools whose results a mutating tool changes
+CACHE_INVALIDATIONS: Dict[str, tuple] = {
+    "docker_pull_image": ("docker_list_images", "docker_system_info"),
+}
+
+# Arguments that only shape rendering or dispatch, not the result
+UNCACHED_ARGUMENTS = ("format", "host", "fresh", "background")
+
+def _cache_key(name: str, host: str, arguments: Dict[str, Any]) -> tuple:
+    normalised = dict(TOOL_DEFAULTS.get(name, {}))
+    normalised.update((key, value) for key, value in arguments.items() if value is not None)
+    for key in UNCACHED_ARGUMENTS:
+        normalised.pop(key, None)
+    return host, name, json.dumps(normalised, sort_keys=True, default=str)
+
+class ResponseCache:
+    """LRU of recent tool results with per-tool TTLs and single-flight misses"""
+    
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE):
+        self.size = size
+        self.entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.inflight: Dict[tuple, asyncio.Future] = {}
+    
+    def _generation(self, host: str) -> Optional[int]:
+        # Only the default host's state is followed by the cache
+        if host in (DEFAULT_HOST, ALL_HOSTS) and state_cache.ready:
+            return state_cache.generation
+        return None
+    
+    async def fetch(self, name: str, host: str, arguments: Dict[str, Any],
+                    run: Callable[[], Awaitable[ToolResult]]) -> ToolResult:
+        """Answer from the cache, join an identical running call, or run it"""
+        key = _cache_key(name, host, arguments)
+        generation = self._generation(host)
+        if not arguments.get("fresh"):
+            entry = self.entries.get(key)
+            if entry is not None:
+                stored, stored_generation, result = entry
+                if time.monotonic() - stored < RESPONSE_CACHE_TTLS[name] and stored_generation == generation:
+                    self.entries.move_to_end(key)
+                    metrics.inc("docker_mcp_cache_requests_total", (name, "hit"))
+                    return result
+                del self.entries[key]
+            task = self.inflight.get(key)
+            if task is not None:
+                metrics.inc("docker_mcp_cache_requests_total", (name, "coalesced"))
+                return await asyncio.shield(task)
+        
+        metrics.inc("docker_mcp_cache_requests_total", (name, "miss"))
+        task = asyncio.ensure_future(run())
+        self.inflight[key] = task
+        try:
+            # Shielded, so a caller giving up does not cancel the call for
+            # the others sharing it
+            result = await asyncio.shield(task)
+        finally:
+            if self.inflight.get(key) is task:
+                del self.inflight[key]
+        # Failures are plain text and are not cached
+        if isinstance(result, ToolOutput):
+            self.entries[key] = (time.monotonic(), generation, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return result
+    
+    def invalidate(self, host: str, tools: tuple) -> None:
+        """Drop a host's entries for the given tools, and fan-out entries"""
+        for key in [key for key in self.entries if key[1] in tools and key[0] in (host, ALL_HOSTS)]:
+            del self.entries[key]
+
+response_cache = ResponseCache()
+
+async def _invalidating(name: str, host: str, work: Awaitable[ToolResult]) -> ToolResult:
+    """Run a mutating tool, then drop the cached results it affects"""
+    try:
+        return await work
+    finally:
+        hosts = list(client_manager.hosts) if host == ALL_HOSTS else [host]
+        for affected in hosts:
+            response_cache.invalidate(affected, CACHE_INVALIDATIONS[name])
+            _df_cache.pop(affected, None)
+
+@server.call_tool()
+async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
+    """Handle tool calls"""
+    
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return [types.TextContent(
+            type="text", 
+            text=f"❌ Unknown tool: {name}"
+        )]
+    
+    fmt = arguments.get("format", "markdown")
+    formats = OUTPUT_FORMATS + TOOL_FORMATS.get(name, ())
+    if fmt not in formats:
+        return [types.TextContent(
+            type="text", 
+            text=f"❌ Unknown format '{fmt}'. Use one of: {', '.join(formats)}"
+        )]
+    
+    host = arguments.get("host") or DEFAULT_HOST
+    # Connecting happens inside run, so a cache hit never waits for a worker
+    if name in HOSTLESS_TOOLS:
+        run = functools.partial(_dispatch, name, handler, arguments)
+    elif host == ALL_HOSTS:
+        run = functools.partial(_dispatch_all_hosts, name, handler, arguments)
+    else:
+        run = functools.partial(_dispatch_on_host, name, handler, arguments, host)
+    
+    token = _current_host.set(None if host == ALL_HOSTS else host)
+    try:
+        background = arguments.get("background") and name in JOB_TOOLS
+        if name in CACHE_INVALIDATIONS:
+            work = _invalidating(name, host, run())
+        elif RESPONSE_CACHE_ENABLED and name in RESPONSE_CACHE_TTLS and not background:
+            work = response_cache.fetch(name, host, arguments, run)
+        else:
+            work = run()
+        if background:
+            response = _render_output(job_manager.submit(name, arguments, work), fmt)
+        else:
+            response = _render_output(await work, fmt)
+    finally:
+        _current_host.reset(token)
+    metrics.observe("docker_mcp_tool_response_bytes", (name,),
+                    sum(len(content.text.encode("utf-8")) for content in response), SIZE_BUCKETS)
+    return response
+
+async def _dispatch_on_host(name: str, handler: Callable[[Dict[str, Any]], Awaitable[ToolResult]],
+                            arguments: Dict[str, Any], host: str) -> ToolResult:
+    """Dispatch a tool on one host, connecting to it first if needed"""
+    # Only a new connection goes through the pool; an existing client is a
+    # dictionary lookup and must not queue behind busy workers
+    if not client_manager.connected(host):
+        try:
+            if host in client_manager.hosts:
+                await run_blocking(client_manager.client, host)
+            else:
+                # Raises straight away, without connecting anywhere
+                client_manager.client(host)
+        except DockerHostError as e:
             return [types.TextContent(
                 type="text", 
-                text=f"❌ Unknown tool: {name}"
+                text=f"❌ Docker client not available. Please ensure Docker is running and accessible. ({e})"
             )]
+    return await _dispatch(name, handler, arguments)
+
+async def _dispatch_all_hosts(name: str, handler: Callable[[Dict[str, Any]], Awaitable[ToolResult]],
+                              arguments: Dict[str, Any]) -> ToolResult:
+    """Run a tool against every configured host concurrently and merge the results"""
+    async def on_host(host: str) -> ToolResult:
+        # Each gathered coroutine runs in its own task, so this only
+        # selects the host for that task
+        _current_host.set(host)
+        return await _dispatch_on_host(name, handler, arguments, host)
+    
+    hosts = list(client_manager.hosts)
+    results = await asyncio.gather(*(on_host(host) for host in hosts))
+    return _merge_host_results(dict(zip(hosts, results)))
+
+async def _dispatch(name: str, handler: Callable[[Dict[str, Any]], Awaitable[ToolResult]],
+                    arguments: Dict[str, Any]) -> ToolResult:
+    """Run a handler within its tool's concurrency limit and timeout"""
+    timeout = TOOL_TIMEOUTS.get(name, DEFAULT_TOOL_TIMEOUT)
+    status = "error"
+    started = None
+    try:
+        async with _tool_semaphore(name):
+            # Time the execution only, not the wait for a free slot
+            started = time.perf_counter()
+            metrics.inc("docker_mcp_tool_in_flight", (name,))
+            try:
+                result = await asyncio.wait_for(handler(arguments), timeout=timeout)
+            finally:
+                metrics.inc("docker_mcp_tool_in_flight", (name,), -1)
+        # Handlers report failures as plain text
+        status = "ok" if isinstance(result, ToolOutput) else "error"
+        return result
+    except asyncio.TimeoutError:
+        status = "timeout"
+        logger.warning(f"Tool {name} timed out after {timeout:.0f}s")
+        return [types.TextContent(
+            type="text", 
+            text=f"⏱️ {name} timed out after {timeout:.0f}s"
+        )]
+    except asyncio.CancelledError:
+        # The MCP request was abandoned; release the slot and let it unwind
+        status = "cancelled"
+        logger.info(f"Tool {name} cancelled")
+        raise
+    except requests.exceptions.ConnectionError as e:
+        # Reconnect on the next call instead of reusing a dead pool
+        client_manager.reset(_host_name())
+        return [types.TextContent(
+            type="text", 
+            text=f"❌ Lost connection to Docker host '{_host_name()}' during {name}: {str(e)}"
+        )]
     except Exception as e:
         logger.error(f"Error executing tool {name}: {e}")
         return [types.TextContent(
             type="text", 
             text=f"❌ Error executing {name}: {str(e)}"
         )]
+    finally:
+        metrics.inc("docker_mcp_tool_calls_total", (name, status))
+        if started is not None:
+            metrics.observe("docker_mcp_tool_duration_seconds", (name,), time.perf_counter() - started)
 
-async def _list_containers(args: Dict[str, Any]) -> List[types.TextContent]:
+async def _list_containers(args: Dict[str, Any]) -> ToolResult:
     """List Docker containers"""
     all_containers = args.get("all", False)
     filters = args.get("filters", {})
     
-    containers = docker_client.containers.list(all=all_containers, filters=filters)
+    # The high-level containers.list() and container.image both inspect every
+    # item individually. The low-level payload already carries the image and
+    # ports, and one images call maps image IDs to tags, so a listing costs two
+    # daemon round-trips whatever the container count.
+    cached = None if args.get("fresh") else _cached_containers(all_containers, filters)
+    if cached is not None:
+        containers, images = cached, state_cache.images()
+    else:
+        containers, images = await asyncio.gather(
+            run_blocking(_docker().api.containers, all=all_containers, filters=filters),
+            run_blocking(_docker().api.images),
+        )
     
-    if not containers:
-        return [types.TextContent(
-            type="text",
-            text="📦 No containers found matching the criteria."
-        )]
+    image_tags = {image["Id"]: image.get("RepoTags") or [] for image in images}
     
-    result = "🐳 **Docker Containers**\n\n"
+    rows = []
     for container in containers:
-        status_emoji = "🟢" if container.status == "running" else "🔴"
-        result += f"{status_emoji} **{container.name}**\n"
-        result += f"   - ID: `{container.short_id}`\n"
-        result += f"   - Image: `{container.image.tags[0] if container.image.tags else 'N/A'}`\n"
-        result += f"   - Status: `{container.status}`\n"
-        result += f"   - Ports: {container.ports}\n\n"
+        tags = image_tags.get(container.get("ImageID"))
+        labels = container.get("Labels") or {}
+        rows.append({
+            "name": container["Names"][0].lstrip("/") if container.get("Names") else container["Id"][:12],
+            "id": container["Id"][:12],
+            "image": tags[0] if tags else container.get("Image") or "N/A",
+            "status": container.get("State", "unknown"),
+            "ports": _format_ports(container.get("Ports") or []),
+            "status_text": container.get("Status"),
+            "created": datetime.fromtimestamp(container.get("Created", 0), timezone.utc).isoformat(),
+            "command": container.get("Command"),
+            "networks": sorted(((container.get("NetworkSettings") or {}).get("Networks") or {}).keys()),
+            "project": labels.get(COMPOSE_PROJECT_LABEL),
+            "labels": labels,
+        })
     
-    return [types.TextContent(type="text", text=result)]
+    return _listing_page("containers", rows, args, _render_containers,
+                         CONTAINER_FIELDS, CONTAINER_DEFAULT_FIELDS, "-created")
+
+CONTAINER_FIELDS = ["name", "id", "image", "status", "ports", "status_text", "created", "command", "networks", "project", "labels"]
+CONTAINER_DEFAULT_FIELDS = ["name", "id", "image", "status", "ports"]
+
+CONTAINER_LABELS = {
+    "id": ("ID", _code),
+    "image": ("Image", _code),
+    "status": ("Status", _code),
+    "ports": ("Ports", str),
+    "status_text": ("Details", _code),
+    "created": ("Created", _code),
+    "command": ("Command", _code),
+    "networks": ("Networks", _code),
+    "project": ("Compose project", _code),
+    "labels": ("Labels", _code),
+}
 
-async def _container_info(args: Dict[str, Any]) -> List[types.TextContent]:
+def _render_containers(data: Dict[str, Any]) -> str:
+    if not data["containers"]:
+        return "📦 No containers found matching the criteria.\n"
+    parts = ["🐳 **Docker Containers**\n\n"]
+    for container in data["containers"]:
+        status_emoji = {"running": "🟢", None: "🐳"}.get(container.get("status"), "🔴")
+        parts.append(f"{status_emoji} **{container['name']}**\n")
+        parts.extend(_render_field_lines(container, CONTAINER_LABELS))
+        parts.append("\n")
+    return "".join(parts)
+
+def _format_ports(ports: List[Dict[str, Any]]) -> str:
+    """Render the port list of a low-level container payload"""
+    if not ports:
+        return "none"
+    rendered = []
+    for port in ports:
+        private = f"{port.get('PrivatePort')}/{port.get('Type', 'tcp')}"
+        if port.get("PublicPort"):
+            rendered.append(f"{port.get('IP', '0.0.0.0')}:{port['PublicPort']}->{private}")
+        else:
+            rendered.append(private)
+    return ", ".join(rendered)
+
+async def _container_info(args: Dict[str, Any]) -> ToolResult:
     """Get detailed container information"""
     container_id = args["container_id"]
     
     try:
-        container = docker_client.containers.get(container_id)
-        info = container.attrs
-        
-        result = f"🔍 **Container Details: {container.name}**\n\n"
-        result += f"**Basic Info:**\n"
-        result += f"- ID: `{container.id}`\n"
-        result += f"- Image: `{info['Config']['Image']}`\n"
-        result += f"- Status: `{container.status}`\n"
-        result += f"- Created: `{info['Created']}`\n"
-        result += f"- Started: `{info['State']['StartedAt']}`\n\n"
+        info = None
+        cached_id = state_cache.resolve_container(container_id) if state_cache.available() else None
+        if cached_id and not args.get("fresh"):
+            info = state_cache.container_details(cached_id)
+        if info is None:
+            info = await run_blocking(_docker().api.inspect_container, container_id)
+            if state_cache.available():
+                state_cache.store_container_details(info)
         
-        result += f"**Network:**\n"
-        for network_name, network_info in info['NetworkSettings']['Networks'].items():
-            result += f"- {network_name}: `{network_info.get('IPAddress', 'N/A')}`\n"
-        
-        result += f"\n**Mounts:**\n"
-        for mount in info.get('Mounts', []):
-            result += f"- `{mount['Source']}` → `{mount['Destination']}`\n"
-        
-        return [types.TextContent(type="text", text=result)]
+        data = {
+            "name": info["Name"].lstrip("/"),
+            "id": info["Id"],
+            "image": info["Config"]["Image"],
+            "status": info["State"]["Status"],
+            "created": info["Created"],
+            "started": info["State"]["StartedAt"],
+            "networks": {
+                network_name: network_info.get("IPAddress", "N/A")
+                for network_name, network_info in info["NetworkSettings"]["Networks"].items()
+            },
+            "mounts": [
+                {"source": mount["Source"], "destination": mount["Destination"]}
+                for mount in info.get("Mounts") or []
+            ],
+        }
+        return ToolOutput(data, _render_container_info)
         
     except docker.errors.NotFound:
         return [types.TextContent(
@@ -314,19 +1788,421 @@ async def _container_info(args: Dict[str, Any]) -> List[types.TextContent]:
             text=f"❌ Container '{container_id}' not found."
         )]
 
-async def _container_logs(args: Dict[str, Any]) -> List[types.TextContent]:
+def _render_container_info(data: Dict[str, Any]) -> str:
+    parts = [
+        f"🔍 **Container Details: {data['name']}**\n\n",
+        f"**Basic Info:**\n",
+        f"- ID: `{data['id']}`\n",
+        f"- Image: `{data['image']}`\n",
+        f"- Status: `{data['status']}`\n",
+        f"- Created: `{data['created']}`\n",
+        f"- Started: `{data['started']}`\n\n",
+        f"**Network:**\n",
+    ]
+    parts.extend(f"- {network_name}: `{address}`\n" for network_name, address in data["networks"].items())
+    parts.append(f"\n**Mounts:**\n")
+    parts.extend(f"- `{mount['source']}` → `{mount['destination']}`\n" for mount in data["mounts"])
+    return "".join(parts)
+
+# Log streaming
+# Logs are read as a stream and decoded incrementally, keeping only the most
+# recent lines that fit the byte budget, so memory stays flat no matter how
+# much a container has written.
+LOG_MAX_BYTES = int(os.environ.get("MCP_LOG_MAX_BYTES", "65536"))
+# Ceiling on a caller's max_bytes, since kept lines are held in memory
+LOG_MAX_BYTES_LIMIT = max(int(os.environ.get("MCP_LOG_MAX_BYTES_LIMIT", "1048576")), LOG_MAX_BYTES)
+LOG_MAX_LINE = 16384
+LOG_FOLLOW_MAX_SECONDS = 60
+# Lines re-read where a follow stream overlaps the tail before it
+LOG_FOLLOW_OVERLAP = 1000
+LOG_FLUSH_INTERVAL = 1.0
+
+RELATIVE_TIME = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+RELATIVE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def _parse_time(value: Any) -> Optional[float]:
+    """Parse an ISO 8601, unix epoch or relative ("15m") time into an epoch"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    relative = RELATIVE_TIME.match(value)
+    if relative:
+        return time.time() - float(relative.group(1)) * RELATIVE_UNITS[relative.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Unrecognised time '{value}', use ISO 8601, unix epoch or e.g. 10m")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+RFC3339_TIME = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:\d{2})$")
+
+def _rfc3339_time(value: str) -> Optional[float]:
+    """Parse a daemon timestamp such as 2024-01-01T00:00:00.123456789Z"""
+    # The daemon reports nanoseconds, which fromisoformat rejects before 3.11
+    match = RFC3339_TIME.match(value)
+    if not match:
+        return None
+    moment = datetime.fromisoformat(match.group(1) + match.group(3).replace("Z", "+00:00")).timestamp()
+    return moment + float(f"0.{match.group(2) or 0}")
+
+def _iter_log_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode a byte stream into lines, tolerating invalid and split UTF-8"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        yield from lines
+        if len(pending) > LOG_MAX_LINE:
+            # A runaway line without newlines must not grow without bound
+            yield pending[:LOG_MAX_LINE] + " …"
+            pending = ""
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def _open_log_stream(container_id: str, tail: Any = "all", since: Optional[float] = None,
+                     until: Optional[float] = None, stream: str = "all", follow: bool = False,
+                     timestamps: bool = True):
+    """Open a cancellable raw log stream for a container"""
+    return _docker().api.logs(
+        container_id,
+        stream=True,
+        follow=follow,
+        stdout=stream in ("all", "stdout"),
+        stderr=stream in ("all", "stderr"),
+        timestamps=timestamps,
+        tail=tail,
+        since=since,
+        until=until,
+    )
+
+async def _read_logs(reader: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking log reader on the pool, closing its stream if the call is abandoned.
+    
+    A timeout or cancellation only stops the awaiting coroutine; closing the
+    stream is what makes the worker thread stop reading and free its slot.
+    """
+    opened: List[Any] = []
+    try:
+        return await run_blocking(reader, *args, opened=opened, **kwargs)
+    except asyncio.CancelledError:
+        for log_stream in opened:
+            log_stream.close()
+        raise
+
+def _collect_logs(container_id: str, max_bytes: int, follow_seconds: float = 0,
+                  on_lines: Optional[Callable[[List[str]], None]] = None,
+                  opened: Optional[List[Any]] = None, **stream_args: Any) -> Dict[str, Any]:
+    """Read a log stream keeping the newest lines within ``max_bytes``.
+    
+    When following, the initial tail is read first and a second stream picks
+    up from its last timestamp for ``follow_seconds``; only lines from that
+    stream are new, and they are handed to ``on_lines`` in batches. Streams
+    are appended to ``opened`` so a cancelled caller can close them.
+    """
+    kept: deque = deque()
+    kept_bytes = 0
+    total = 0
+    dropped = 0
+    
+    def keep(line: str) -> None:
+        nonlocal kept_bytes, total, dropped
+        total += 1
+        kept.append(line)
+        kept_bytes += len(line.encode("utf-8", errors="replace")) + 1
+        while kept_bytes > max_bytes and len(kept) > 1:
+            kept_bytes -= len(kept.popleft().encode("utf-8", errors="replace")) + 1
+            dropped += 1
+    
+    log_stream = _open_log_stream(container_id, **stream_args)
+    if opened is not None:
+        opened.append(log_stream)
+    last = None
+    try:
+        for last in _iter_log_lines(log_stream):
+            keep(last)
+    finally:
+        log_stream.close()
+    if follow_seconds <= 0:
+        return {"lines": list(kept), "total": total, "dropped": dropped}
+    
+    # Resume from the tail's last timestamp, on the daemon's clock; the
+    # overlap is re-sent and skipped. Without one, only new lines are asked for
+    boundary = last.split(" ", 1)[0] if last else None
+    resume = _rfc3339_time(boundary) if boundary else None
+    if resume is None:
+        boundary = None
+        stream_args = dict(stream_args, tail=0)
+    else:
+        stream_args = dict(stream_args, tail=LOG_FOLLOW_OVERLAP, since=int(resume * 1e6) / 1e6)
+    log_stream = _open_log_stream(container_id, follow=True, **stream_args)
+    if opened is not None:
+        opened.append(log_stream)
+    timer = threading.Timer(follow_seconds, log_stream.close)
+    timer.daemon = True
+    timer.start()
+    batch: List[str] = []
+    last_flush = time.monotonic()
+    try:
+        for line in _iter_log_lines(log_stream):
+            if boundary is not None:
+                # Docker's fixed-width RFC 3339 timestamps sort lexically
+                if line.split(" ", 1)[0] <= boundary:
+                    continue
+                boundary = None
+            keep(line)
+            if on_lines is not None:
+                batch.append(line)
+                if time.monotonic() - last_flush >= LOG_FLUSH_INTERVAL:
+                    on_lines(batch)
+                    batch = []
+                    last_flush = time.monotonic()
+    except Exception as e:
+        # Closing a followed stream at the deadline surfaces as a read error
+        if timer.is_alive():
+            raise
+        logger.debug(f"Log follow for {container_id[:12]} ended: {e}")
+    finally:
+        timer.cancel()
+        log_stream.close()
+    if on_lines is not None and batch:
+        on_lines(batch)
+    return {"lines": list(kept), "total": total, "dropped": dropped}
+
+def _client_log_sender(logger_name: str) -> Optional[Callable[[List[str]], None]]:
+    """Thread-safe callback forwarding lines to the client as MCP log messages"""
+    if _current_job.get() is not None:
+        # The request that started a background job has already been answered
+        return None
+    try:
+        context = server.request_context
+    except LookupError:
+        return None
+    loop = asyncio.get_running_loop()
+    
+    def send(lines: List[str]) -> None:
+        asyncio.run_coroutine_threadsafe(
+            context.session.send_log_message(
+                level="info",
+                data="\n".join(lines),
+                logger=logger_name,
+                related_request_id=context.request_id,
+            ),
+            loop,
+        )
+    
+    return send
+
+# Log summarisation
+# Lines are reduced to templates by masking the parts that vary between
+# repetitions (timestamps, IDs, addresses, numbers). Each template keeps a
+# count and one sample. Error templates are always reported, with a few of
+# their distinct lines verbatim. All tables are capped so a summary never
+# grows with log volume.
+LOG_SUMMARY_MAX_TEMPLATES = 1000
+LOG_SUMMARY_MAX_ERRORS = 200
+LOG_SUMMARY_ERROR_SAMPLES = 3
+LOG_SUMMARY_TOP = 25
+
+LOG_MASKS = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<uuid>"),
+    (re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b"), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+]
+ERROR_LINE = re.compile(r"\b(error|err|fatal|panic|exception|traceback|critical|fail(?:ed|ure)?)\b", re.IGNORECASE)
+
+def _log_template(message: str) -> str:
+    """Mask the variable parts of a log message"""
+    for pattern, replacement in LOG_MASKS:
+        message = pattern.sub(replacement, message)
+    return message
+
+class LogSummarizer:
+    """Incrementally groups log lines into counted templates"""
+    
+    def __init__(self, max_templates: int = LOG_SUMMARY_MAX_TEMPLATES, max_errors: int = LOG_SUMMARY_MAX_ERRORS):
+        self.max_templates = max_templates
+        self.max_errors = max_errors
+        self.lines = 0
+        self.templates: Dict[str, List[Any]] = {}
+        self.other = 0
+        self.errors: Dict[str, List[Any]] = {}
+        self.other_errors = 0
+    
+    def add(self, line: str) -> None:
+        self.lines += 1
+        _, message = _split_timestamp(line)
+        template = _log_template(message)
+        entry = self.templates.get(template)
+        if entry is not None:
+            entry[0] += 1
+        elif len(self.templates) < self.max_templates:
+            self.templates[template] = [1, line]
+        else:
+            self.other += 1
+        if ERROR_LINE.search(message):
+            errors = self.errors.get(template)
+            if errors is None:
+                if len(self.errors) >= self.max_errors:
+                    self.other_errors += 1
+                    return
+                errors = self.errors[template] = [0, []]
+            errors[0] += 1
+            if len(errors[1]) < LOG_SUMMARY_ERROR_SAMPLES and message not in errors[1]:
+                errors[1].append(message)
+    
+    def merge(self, other: "LogSummarizer") -> None:
+        """Fold another summariser's counts in, e.g. one per container"""
+        self.lines += other.lines
+        self.other += other.other
+        self.other_errors += other.other_errors
+        for template, (count, sample) in other.templates.items():
+            entry = self.templates.get(template)
+            if entry is not None:
+                entry[0] += count
+            elif len(self.templates) < self.max_templates:
+                self.templates[template] = [count, sample]
+            else:
+                self.other += count
+        for template, (count, samples) in other.errors.items():
+            errors = self.errors.get(template)
+            if errors is None:
+                if len(self.errors) >= self.max_errors:
+                    self.other_errors += count
+                    continue
+                errors = self.errors[template] = [0, []]
+            errors[0] += count
+            for sample in samples:
+                if len(errors[1]) < LOG_SUMMARY_ERROR_SAMPLES and sample not in errors[1]:
+                    errors[1].append(sample)
+    
+    def to_dict(self, top: int = LOG_SUMMARY_TOP) -> Dict[str, Any]:
+        ranked = sorted(self.templates.items(), key=lambda item: item[1][0], reverse=True)
+        errors = sorted(self.errors.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "lines": self.lines,
+            "template_count": len(self.templates),
+            "templates": [
+                {"template": template, "count": count, "sample": sample}
+                for template, (count, sample) in ranked[:top]
+            ],
+            "omitted_templates": max(len(ranked) - top, 0),
+            "omitted_lines": sum(entry[0] for _, entry in ranked[top:]),
+            "untemplated_lines": self.other,
+            "errors": [
+                {"template": template, "count": count, "samples": samples}
+                for template, (count, samples) in errors
+            ],
+            "untemplated_errors": self.other_errors,
+        }
+
+def _render_log_summary(summary: Dict[str, Any]) -> str:
+    parts = [
+        f"{summary['lines']} lines → {summary['template_count']} templates, {len(summary['errors'])} error templates\n\n",
+        f"**Top templates:**\n",
+    ]
+    for entry in summary["templates"]:
+        parts.append(f"- {entry['count']}× `{entry['template']}`\n")
+        parts.append(f"  e.g. `{entry['sample']}`\n")
+    if summary["omitted_templates"]:
+        parts.append(f"- … {summary['omitted_templates']} more templates ({summary['omitted_lines']} lines)\n")
+    if summary["untemplated_lines"]:
+        parts.append(f"- {summary['untemplated_lines']} lines beyond the template limit\n")
+    if summary["errors"]:
+        parts.append(f"\n**Errors:**\n")
+        for entry in summary["errors"]:
+            parts.append(f"- {entry['count']}× `{entry['template']}`\n")
+            parts.extend(f"  - `{sample}`\n" for sample in entry["samples"])
+    if summary["untemplated_errors"]:
+        parts.append(f"⚠️ {summary['untemplated_errors']} error lines beyond the error template limit\n")
+    return "".join(parts)
+
+def _compact_log_summary(data: Dict[str, Any]) -> str:
+    summary = data["summary"]
+    rows = [{"kind": "line", "count": entry["count"], "template": entry["template"]} for entry in summary["templates"]]
+    rows.extend({"kind": "error", "count": entry["count"], "template": entry["template"]} for entry in summary["errors"])
+    return _compact_table(rows, ["kind", "count", "template"])
+
+def _render_container_log_summary(data: Dict[str, Any]) -> str:
+    return f"🧮 **Log summary for {data['container']}** (last {data['tail']} lines)\n\n" + _render_log_summary(data["summary"])
+
+def _summarize_log_lines(lines: Iterable[str]) -> LogSummarizer:
+    summarizer = LogSummarizer()
+    for line in lines:
+        summarizer.add(line)
+    return summarizer
+
+def _summarize_logs(container_id: str, opened: Optional[List[Any]] = None, **stream_args: Any) -> LogSummarizer:
+    """Stream a container's logs straight into a summariser"""
+    log_stream = _open_log_stream(container_id, timestamps=True, **stream_args)
+    if opened is not None:
+        opened.append(log_stream)
+    try:
+        return _summarize_log_lines(_iter_log_lines(log_stream))
+    finally:
+        log_stream.close()
+
+async def _container_logs(args: Dict[str, Any]) -> ToolResult:
     """Get container logs"""
     container_id = args["container_id"]
     lines = args.get("lines", 100)
+    max_bytes = min(args.get("max_bytes", LOG_MAX_BYTES), LOG_MAX_BYTES_LIMIT)
+    follow_seconds = min(args.get("follow_seconds", 10), LOG_FOLLOW_MAX_SECONDS) if args.get("follow") else 0
     
     try:
-        container = docker_client.containers.get(container_id)
-        logs = container.logs(tail=lines, timestamps=True).decode('utf-8')
+        since = _parse_time(args.get("since"))
+        until = _parse_time(args.get("until"))
+    except ValueError as e:
+        return [types.TextContent(type="text", text=f"❌ {e}")]
+    
+    try:
+        info = await run_blocking(_docker().api.inspect_container, container_id)
+        name = info["Name"].lstrip("/")
         
-        result = f"📋 **Logs for {container.name}** (last {lines} lines)\n\n"
-        result += f"```\n{logs}\n```"
+        if args.get("summarize"):
+            summary = await _read_logs(
+                _summarize_logs,
+                info["Id"],
+                tail=lines,
+                since=since,
+                until=until,
+                stream=args.get("stream", "all"),
+            )
+            data = {"container": name, "tail": lines, "summary": summary.to_dict()}
+            return ToolOutput(data, _render_container_log_summary, compact=_compact_log_summary)
+        
+        collected = await _read_logs(
+            _collect_logs,
+            info["Id"],
+            max_bytes,
+            follow_seconds=follow_seconds,
+            on_lines=_client_log_sender("docker_container_logs") if follow_seconds else None,
+            tail=lines,
+            since=since,
+            until=until,
+            stream=args.get("stream", "all"),
+        )
         
-        return [types.TextContent(type="text", text=result)]
+        data = {
+            "container": name,
+            "tail": lines,
+            "followed_seconds": follow_seconds,
+            "max_bytes": max_bytes,
+            "dropped": collected["dropped"],
+            "lines": collected["lines"],
+        }
+        return ToolOutput(data, _render_container_logs, compact=lambda data: "\n".join(data["lines"]))
         
     except docker.errors.NotFound:
         return [types.TextContent(
@@ -334,41 +2210,227 @@ async def _container_logs(args: Dict[str, Any]) -> List[types.TextContent]:
             text=f"❌ Container '{container_id}' not found."
         )]
 
-async def _container_stats(args: Dict[str, Any]) -> List[types.TextContent]:
+def _render_container_logs(data: Dict[str, Any]) -> str:
+    followed = f", followed for {data['followed_seconds']}s" if data["followed_seconds"] else ""
+    parts = [f"📋 **Logs for {data['container']}** (last {data['tail']} lines{followed})\n\n"]
+    if data["dropped"]:
+        parts.append(f"⚠️ Output limited to {data['max_bytes']} bytes, {data['dropped']} earlier lines omitted\n\n")
+    logs = "\n".join(data["lines"])
+    parts.append(f"```\n{logs}\n```")
+    return "".join(parts)
+
+LOG_SEARCH_MAX_CONTEXT = 10
+
+def _split_timestamp(line: str) -> tuple:
+    """Split a timestamped log line into (timestamp, message)"""
+    timestamp, sep, message = line.partition(" ")
+    if sep and timestamp[:4].isdigit() and "T" in timestamp:
+        return timestamp, message
+    return None, line
+
+def _compile_matcher(pattern: str, regex: bool, ignore_case: bool) -> Callable[[str], bool]:
+    """Build a line predicate; plain substrings skip the regex engine"""
+    if regex:
+        compiled = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        return lambda text: compiled.search(text) is not None
+    if ignore_case:
+        needle = pattern.lower()
+        return lambda text: needle in text.lower()
+    return lambda text: pattern in text
+
+def _search_logs(container_id: str, matcher: Callable[[str], bool], context: int,
+                 max_matches: int, opened: Optional[List[Any]] = None, **stream_args: Any) -> Dict[str, Any]:
+    """Scan a log stream once, keeping matches and their context lines"""
+    before: deque = deque(maxlen=context)
+    output: List[str] = []
+    after = 0
+    last_emitted = -1
+    matches = 0
+    scanned = 0
+    first_seen = last_seen = None
+    log_stream = _open_log_stream(container_id, timestamps=True, **stream_args)
+    if opened is not None:
+        opened.append(log_stream)
+    try:
+        for number, line in enumerate(_iter_log_lines(log_stream)):
+            scanned += 1
+            timestamp, message = _split_timestamp(line)
+            if matcher(message):
+                matches += 1
+                first_seen = first_seen or timestamp
+                last_seen = timestamp or last_seen
+                if matches <= max_matches:
+                    if output and number - len(before) > last_emitted + 1:
+                        output.append("--")
+                    output.extend(before)
+                    output.append(f"> {line}")
+                    before.clear()
+                    last_emitted = number
+                    after = context
+                    continue
+            if after:
+                output.append(f"  {line}")
+                last_emitted = number
+                after -= 1
+            else:
+                before.append(f"  {line}")
+    finally:
+        log_stream.close()
+    return {"matches": matches, "scanned": scanned, "first": first_seen, "last": last_seen, "output": output}
+
+async def _logs_search(args: Dict[str, Any]) -> ToolResult:
+    """Search container or compose project logs server-side"""
+    pattern = args["pattern"]
+    context = max(0, min(args.get("context", 2), LOG_SEARCH_MAX_CONTEXT))
+    max_matches = args.get("max_matches", 50)
+    
+    if not args.get("container_id") and not args.get("project"):
+        return [types.TextContent(type="text", text="❌ Provide either container_id or project.")]
+    try:
+        matcher = _compile_matcher(pattern, args.get("regex", False), args.get("ignore_case", False))
+        since = _parse_time(args.get("since"))
+        until = _parse_time(args.get("until"))
+    except (re.error, ValueError) as e:
+        return [types.TextContent(type="text", text=f"❌ Invalid search: {e}")]
+    
+    if args.get("project"):
+        containers = await run_blocking(
+            _docker().api.containers,
+            all=True,
+            filters={"label": f"com.docker.compose.project={args['project']}"},
+        )
+        targets = [(container["Names"][0].lstrip("/"), container["Id"]) for container in containers]
+        if not targets:
+            return [types.TextContent(type="text", text=f"❌ No containers found for project '{args['project']}'.")]
+    else:
+        try:
+            info = await run_blocking(_docker().api.inspect_container, args["container_id"])
+        except docker.errors.NotFound:
+            return [types.TextContent(type="text", text=f"❌ Container '{args['container_id']}' not found.")]
+        targets = [(info["Name"].lstrip("/"), info["Id"])]
+    
+    stream_args = {
+        "tail": args.get("lines", "all"),
+        "since": since,
+        "until": until,
+        "stream": args.get("stream", "all"),
+    }
+    results = await asyncio.gather(
+        *(_read_logs(_search_logs, container_id, matcher, context, max_matches, **stream_args)
+          for _, container_id in targets),
+        return_exceptions=True,
+    )
+    
+    containers = []
+    for (name, _), found in zip(targets, results):
+        if isinstance(found, BaseException):
+            containers.append({"name": name, "error": str(found)})
+        else:
+            containers.append({"name": name, "truncated": found["matches"] > max_matches, "omitted": 0, **found})
+    
+    # max_matches bounds each container; the combined output is also held to
+    # the response budget, so a project-wide search stays a bounded payload.
+    # Containers beyond the budget are only counted.
+    budget = OUTPUT_MAX_BYTES
+    shown = []
+    hidden = []
+    for found in containers:
+        output = found.pop("output", None)
+        budget -= len(json.dumps(found, default=str))
+        if budget < 0:
+            hidden.append(found)
+            continue
+        shown.append(found)
+        if output is None:
+            continue
+        kept = 0
+        for line in output:
+            size = len(line.encode("utf-8", errors="replace")) + 1
+            if size > budget:
+                break
+            budget -= size
+            kept += 1
+        found["output"] = output[:kept]
+        found["omitted"] = len(output) - kept
+    data = {
+        "pattern": pattern,
+        "matches": sum(found.get("matches", 0) for found in containers),
+        "scanned": sum(found.get("scanned", 0) for found in containers),
+        "max_matches": max_matches,
+        "max_bytes": OUTPUT_MAX_BYTES,
+        "omitted": sum(found.get("omitted", 0) for found in shown),
+        "hidden_containers": len(hidden),
+        "hidden_matches": sum(found.get("matches", 0) for found in hidden),
+        "containers": shown,
+    }
+    return ToolOutput(data, _render_logs_search, compact=_compact_logs_search)
+
+def _render_logs_search(data: Dict[str, Any]) -> str:
+    parts = [f"🔎 **Log search for `{data['pattern']}`**: {data['matches']} matches in {data['scanned']} lines\n\n"]
+    for found in data["containers"]:
+        if "error" in found:
+            parts.append(f"**{found['name']}**: ❌ {found['error']}\n\n")
+            continue
+        if not found["matches"] and len(data["containers"]) > 1:
+            continue
+        parts.append(f"**{found['name']}**: {found['matches']} matches in {found['scanned']} lines\n")
+        if found["matches"]:
+            parts.append(f"- First: `{found['first'] or 'N/A'}`\n")
+            parts.append(f"- Last: `{found['last'] or 'N/A'}`\n")
+            if found["truncated"]:
+                parts.append(f"- Showing the first {data['max_matches']} matches\n")
+            if found["omitted"]:
+                parts.append(f"- {found['omitted']} output lines omitted\n")
+            if found["output"]:
+                body = "\n".join(found["output"])
+                parts.append(f"```\n{body}\n```\n")
+        parts.append("\n")
+    if data["hidden_containers"]:
+        parts.append(f"… {data['hidden_containers']} more containers with {data['hidden_matches']} matches not shown\n\n")
+    if data["omitted"] or data["hidden_containers"]:
+        parts.append(
+            f"⚠️ Output limited to {data['max_bytes']} bytes, {data['omitted']} lines omitted. "
+            f"Narrow the pattern or time range, lower max_matches or search a single container.\n"
+        )
+    return "".join(parts)
+
+def _compact_logs_search(data: Dict[str, Any]) -> str:
+    lines = []
+    for found in data["containers"]:
+        if "error" in found:
+            lines.append(f"# {found['name']} error={found['error']}")
+        elif found["matches"]:
+            lines.append(f"# {found['name']} matches={found['matches']} first={found['first']} last={found['last']}")
+            lines.extend(found["output"])
+    if data["omitted"] or data["hidden_containers"]:
+        lines.append(f"# omitted={data['omitted']} hidden_containers={data['hidden_containers']} "
+                     f"hidden_matches={data['hidden_matches']} max_bytes={data['max_bytes']}")
+    return "\n".join(lines) or "(no matches)"
+
+async def _container_stats(args: Dict[str, Any]) -> ToolResult:
     """Get container resource usage statistics"""
     container_id = args["container_id"]
+    window = args.get("window")
+    
+    history = stats_collector.find(container_id) if stats_collector.available() else None
+    if history is not None and history.count:
+        return ToolOutput(_history_data(history, window), _render_history)
     
     try:
-        container = docker_client.containers.get(container_id)
-        stats = container.stats(stream=False)
-        
-        # Calculate CPU percentage
-        cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - \
-                   stats['precpu_stats']['cpu_usage']['total_usage']
-        system_delta = stats['cpu_stats']['system_cpu_usage'] - \
-                      stats['precpu_stats']['system_cpu_usage']
-        cpu_percent = 0.0
-        if system_delta > 0:
-            cpu_percent = (cpu_delta / system_delta) * 100.0
-        
-        # Memory usage
-        memory_usage = stats['memory_stats']['usage']
-        memory_limit = stats['memory_stats']['limit']
-        memory_percent = (memory_usage / memory_limit) * 100.0
-        
-        result = f"📊 **Resource Usage: {container.name}**\n\n"
-        result += f"**CPU Usage:** {cpu_percent:.2f}%\n"
-        result += f"**Memory Usage:** {memory_usage / (1024**2):.1f}MB / {memory_limit / (1024**2):.1f}MB ({memory_percent:.1f}%)\n"
+        container = await run_blocking(_docker().containers.get, container_id)
+        stats = await run_blocking(container.stats, stream=False)
         
-        # Network I/O
-        if 'networks' in stats:
-            result += f"\n**Network I/O:**\n"
-            for interface, net_stats in stats['networks'].items():
-                rx_bytes = net_stats['rx_bytes'] / (1024**2)
-                tx_bytes = net_stats['tx_bytes'] / (1024**2)
-                result += f"- {interface}: RX {rx_bytes:.1f}MB, TX {tx_bytes:.1f}MB\n"
+        data = {"container": container.name, "source": "sample", **_compute_stats(stats)}
+        data["networks"] = {
+            interface: {"rx_bytes": net_stats["rx_bytes"], "tx_bytes": net_stats["tx_bytes"]}
+            for interface, net_stats in (stats.get("networks") or {}).items()
+        }
+        if window and stats_collector.available():
+            data["note"] = "No history collected for this container yet."
+        elif window:
+            data["note"] = "No history collected. Set MCP_STATS_COLLECTOR=1 to record time series."
         
-        return [types.TextContent(type="text", text=result)]
+        return ToolOutput(data, _render_container_stats)
         
     except docker.errors.NotFound:
         return [types.TextContent(
@@ -376,73 +2438,938 @@ async def _container_stats(args: Dict[str, Any]) -> List[types.TextContent]:
             text=f"❌ Container '{container_id}' not found."
         )]
 
-async def _list_images(args: Dict[str, Any]) -> List[types.TextContent]:
-    """List Docker images"""
-    all_images = args.get("all", False)
-    filters = args.get("filters", {})
+def _render_container_stats(data: Dict[str, Any]) -> str:
+    parts = [
+        f"📊 **Resource Usage: {data['container']}**\n\n",
+        f"**CPU Usage:** {data['cpu_percent']:.2f}%\n",
+        f"**Memory Usage:** {data['memory_usage'] / (1024**2):.1f}MB / {data['memory_limit'] / (1024**2):.1f}MB ({data['memory_percent']:.1f}%)\n",
+    ]
+    if data["networks"]:
+        parts.append(f"\n**Network I/O:**\n")
+        for interface, net_stats in data["networks"].items():
+            parts.append(f"- {interface}: RX {net_stats['rx_bytes'] / (1024**2):.1f}MB, TX {net_stats['tx_bytes'] / (1024**2):.1f}MB\n")
+    if data.get("note"):
+        parts.append(f"\n⚠️ {data['note']}\n")
+    return "".join(parts)
+
+def _stats_time(stats: Dict[str, Any], key: str = "read") -> Optional[float]:
+    """Epoch of a stats payload's read (or preread) timestamp"""
+    moment = _rfc3339_time(stats.get(key) or "")
+    # An unset preread is Go's zero time, 0001-01-01
+    return moment if moment is not None and moment > 0 else None
+
+def _stats_elapsed(current: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """Seconds between two payloads' reads, or across one payload's own read window"""
+    read = _stats_time(current)
+    before = _stats_time(previous) if previous is not None else _stats_time(current, "preread")
+    if read is None or before is None or read <= before:
+        return None
+    return read - before
+
+def _compute_stats(current: Dict[str, Any], previous: Optional[Dict[str, Any]] = None,
+                   interval: Optional[float] = None) -> Dict[str, float]:
+    """Derive usage figures from a stats payload.
+    
+    CPU usage is measured against ``previous`` when given, otherwise against the
+    payload's own ``precpu_stats``. I/O rates are only filled in when there is
+    a previous sample; the interval between the two defaults to the time
+    between their ``read`` timestamps.
+    """
+    if previous is not None and interval is None:
+        interval = _stats_elapsed(current, previous)
+    before = previous["cpu_stats"] if previous else current.get("precpu_stats", {})
+    after = current.get("cpu_stats", {})
+    cpu_delta = after.get("cpu_usage", {}).get("total_usage", 0) - \
+        before.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = after.get("system_cpu_usage", 0) - before.get("system_cpu_usage", 0)
+    cpu_percent = 0.0
+    if system_delta > 0:
+        cpu_percent = (cpu_delta / system_delta) * 100.0
+    
+    memory_usage = current.get("memory_stats", {}).get("usage", 0)
+    memory_limit = current.get("memory_stats", {}).get("limit", 0)
+    memory_percent = (memory_usage / memory_limit) * 100.0 if memory_limit else 0.0
+    
+    def io_totals(stats: Dict[str, Any]) -> Dict[str, int]:
+        networks = (stats.get("networks") or {}).values()
+        blkio = (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+        return {
+            "net_rx": sum(net.get("rx_bytes", 0) for net in networks),
+            "net_tx": sum(net.get("tx_bytes", 0) for net in networks),
+            "blk_read": sum(entry.get("value", 0) for entry in blkio if entry.get("op", "").lower() == "read"),
+            "blk_write": sum(entry.get("value", 0) for entry in blkio if entry.get("op", "").lower() == "write"),
+        }
+    
+    result = {
+        "cpu_percent": cpu_percent,
+        "memory_usage": memory_usage,
+        "memory_limit": memory_limit,
+        "memory_percent": memory_percent,
+    }
+    totals = io_totals(current)
+    result.update(totals)
+    if previous is not None and interval:
+        earlier = io_totals(previous)
+        for key, value in totals.items():
+            result[f"{key}_rate"] = max(value - earlier[key], 0) / interval
+    return result
+
+STATS_SAMPLE_INTERVAL = float(os.environ.get("MCP_STATS_INTERVAL", "1.0"))
+# Scans sample on their own pool, so a large host neither queues behind
+# other tools nor starves them. Scans needing more live samples than
+# MCP_STATS_ALL_MAX are refused up front instead of running into the
+# tool timeout.
+STATS_WORKERS = int(os.environ.get("MCP_STATS_WORKERS", "16"))
+STATS_ALL_MAX_CONTAINERS = int(os.environ.get("MCP_STATS_ALL_MAX", "200"))
+
+_stats_executor = ThreadPoolExecutor(max_workers=STATS_WORKERS, thread_name_prefix="docker-stats")
+
+STATS_SORT_KEYS: Dict[str, Callable[[Dict[str, float]], float]] = {
+    "cpu": lambda usage: usage["cpu_percent"],
+    "memory": lambda usage: usage["memory_usage"],
+    "network": lambda usage: usage.get("net_rx_rate", 0) + usage.get("net_tx_rate", 0),
+    "blkio": lambda usage: usage.get("blk_read_rate", 0) + usage.get("blk_write_rate", 0),
+}
+
+def _one_shot_supported() -> bool:
+    """Whether the daemon can sample stats without waiting for a second cycle"""
+    return not docker.utils.version_lt(_docker().api.api_version, "1.41")
+
+def _stats_snapshot(container_id: str) -> Dict[str, Any]:
+    """Take a single stats sample without waiting for the daemon's second cycle"""
+    try:
+        return _docker().api.stats(container_id, stream=False, one_shot=True)
+    except docker.errors.InvalidVersion:
+        # Daemons older than API 1.41 always sample two cycles
+        return _docker().api.stats(container_id, stream=False)
+
+async def _stats_all(args: Dict[str, Any]) -> ToolResult:
+    """Sample all matching containers concurrently and rank them"""
+    sort_by = args.get("sort_by", "cpu")
+    top = args.get("top", 10)
+    if sort_by not in STATS_SORT_KEYS:
+        return [types.TextContent(
+            type="text",
+            text=f"❌ Unknown sort key '{sort_by}'. Use one of: {', '.join(STATS_SORT_KEYS)}"
+        )]
     
-    images = docker_client.images.list(all=all_images, filters=filters)
+    filters: Dict[str, Any] = {"status": "running"}
+    labels = []
+    if args.get("label"):
+        labels.append(args["label"])
+    if args.get("project"):
+        labels.append(f"com.docker.compose.project={args['project']}")
+    if labels:
+        filters["label"] = labels
+    if args.get("name"):
+        filters["name"] = args["name"]
     
-    if not images:
+    containers = await run_blocking(_docker().api.containers, filters=filters)
+    
+    ranked = []
+    pending = []
+    for container in containers:
+        name = container["Names"][0].lstrip("/") if container.get("Names") else container["Id"][:12]
+        history = stats_collector.find(container["Id"]) if stats_collector.available() else None
+        latest = history.latest() if history is not None else None
+        if latest is not None:
+            ranked.append((name, latest))
+        else:
+            pending.append((name, container["Id"]))
+    
+    if len(pending) > STATS_ALL_MAX_CONTAINERS:
         return [types.TextContent(
             type="text",
-            text="📦 No images found matching the criteria."
+            text=f"❌ {len(pending)} running containers match, more than the {STATS_ALL_MAX_CONTAINERS} one scan "
+                 f"samples. Narrow with label, name or project, or set MCP_STATS_COLLECTOR=1 to rank from history."
         )]
     
-    result = "🖼️ **Docker Images**\n\n"
-    for image in images:
-        tags = image.tags if image.tags else ["<none>"]
-        size_mb = image.attrs['Size'] / (1024**2)
-        result += f"**{tags[0]}**\n"
-        result += f"   - ID: `{image.short_id}`\n"
-        result += f"   - Size: `{size_mb:.1f}MB`\n"
-        result += f"   - Created: `{image.attrs['Created']}`\n\n"
+    # Two one-shot samples per remaining container, one interval apart. Rates
+    # use each container's own read timestamps, so a sample that queued for
+    # a free thread is still measured over the time it actually covered.
+    # Older daemons spend two cycles on every sample anyway, so they get a
+    # single round: CPU from the payload's precpu_stats, no I/O rates.
+    failed = 0
+    intervals = []
+    one_shot = True
+    if pending:
+        sample = functools.partial(run_in_executor, _stats_executor, _stats_snapshot)
+        one_shot = _one_shot_supported()
+        first = await asyncio.gather(*(sample(cid) for _, cid in pending), return_exceptions=True)
+        if one_shot:
+            await asyncio.sleep(STATS_SAMPLE_INTERVAL)
+            second = await asyncio.gather(*(sample(cid) for _, cid in pending), return_exceptions=True)
+        else:
+            first, second = [None] * len(pending), first
+        
+        for (name, _), before, after in zip(pending, first, second):
+            if isinstance(before, BaseException) or isinstance(after, BaseException):
+                failed += 1
+                continue
+            elapsed = _stats_elapsed(after, before)
+            if elapsed is not None:
+                intervals.append(elapsed)
+            ranked.append((name, _compute_stats(after, before)))
+    ranked.sort(key=lambda item: STATS_SORT_KEYS[sort_by](item[1]), reverse=True)
+    
+    rows = [
+        {"name": name, **{column: usage.get(column, 0.0) for column in STATS_COLUMNS}}
+        for name, usage in ranked[:top]
+    ]
+    data = {
+        "sort_by": sort_by,
+        "sampled": len(ranked),
+        "live": len(pending) - failed,
+        "interval": round(sum(intervals) / len(intervals), 2) if intervals else None,
+        "io_rates": one_shot,
+        "failed": failed,
+        "containers": rows,
+    }
+    return ToolOutput(data, _render_stats_all, rows=rows)
+
+STATS_COLUMNS = ["cpu_percent", "memory_usage", "memory_percent", "net_rx_rate", "net_tx_rate", "blk_read_rate", "blk_write_rate"]
+
+def _render_stats_all(data: Dict[str, Any]) -> str:
+    if not data["sampled"] and not data["failed"]:
+        return "📦 No running containers found matching the criteria."
+    if data["interval"] is not None:
+        source = f"sampled over {data['interval']:.1f}s"
+    else:
+        source = "sampled" if data["live"] else "from collected history"
+    parts = [f"📊 **Top containers by {data['sort_by']}** ({data['sampled']} containers, {source})\n\n"]
+    for position, usage in enumerate(data["containers"], start=1):
+        parts.append(
+            f"{position}. **{usage['name']}**\n"
+            f"   - CPU: {usage['cpu_percent']:.2f}%\n"
+            f"   - Memory: {usage['memory_usage'] / (1024**2):.1f}MB ({usage['memory_percent']:.1f}%)\n"
+            f"   - Network: RX {usage['net_rx_rate'] / 1024:.1f}KB/s, TX {usage['net_tx_rate'] / 1024:.1f}KB/s\n"
+            f"   - Block I/O: R {usage['blk_read_rate'] / 1024:.1f}KB/s, W {usage['blk_write_rate'] / 1024:.1f}KB/s\n\n"
+        )
+    if data["failed"]:
+        parts.append(f"⚠️ {data['failed']} container(s) could not be sampled (stopped during the scan?)\n")
+    if not data["io_rates"]:
+        parts.append("⚠️ This daemon does not support one-shot stats (API < 1.41), so I/O rates are not measured\n")
+    return "".join(parts)
+
+# Background stats collection
+# Opt-in with MCP_STATS_COLLECTOR=1. One streaming stats reader per running
+# container feeds a fixed-size ring buffer, so stats tools can answer from
+# memory and summarise recent history. Memory per container is bounded by
+# MCP_STATS_HISTORY samples.
+STATS_COLLECTOR_ENABLED = os.environ.get("MCP_STATS_COLLECTOR", "").lower() in ("1", "true", "yes")
+STATS_HISTORY = int(os.environ.get("MCP_STATS_HISTORY", "600"))
+STATS_DISCOVERY_INTERVAL = float(os.environ.get("MCP_STATS_DISCOVERY_INTERVAL", "10"))
+
+class StatsRingBuffer:
+    """Fixed-size, array-backed time series of one container's usage"""
+    
+    FIELDS = ("cpu_percent", "memory_usage", "net_rx_rate", "net_tx_rate", "blk_read_rate", "blk_write_rate")
+    
+    def __init__(self, container_id: str, name: str, capacity: int):
+        self.container_id = container_id
+        self.name = name
+        self.capacity = capacity
+        self.memory_limit = 0.0
+        self.head = 0
+        self.count = 0
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.series = {field: array("d", bytes(8 * capacity)) for field in self.FIELDS}
+        self._lock = threading.Lock()
+    
+    def append(self, timestamp: float, usage: Dict[str, float]) -> None:
+        with self._lock:
+            self.timestamps[self.head] = timestamp
+            for field in self.FIELDS:
+                self.series[field][self.head] = usage.get(field, 0.0)
+            self.memory_limit = usage.get("memory_limit", self.memory_limit)
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+    
+    def _indices(self) -> List[int]:
+        """Slot indices from oldest to newest"""
+        start = (self.head - self.count) % self.capacity
+        return [(start + offset) % self.capacity for offset in range(self.count)]
+    
+    def latest(self) -> Optional[Dict[str, float]]:
+        with self._lock:
+            if not self.count:
+                return None
+            index = (self.head - 1) % self.capacity
+            usage = {field: self.series[field][index] for field in self.FIELDS}
+            usage["memory_limit"] = self.memory_limit
+            usage["memory_percent"] = (usage["memory_usage"] / self.memory_limit) * 100.0 if self.memory_limit else 0.0
+            usage["timestamp"] = self.timestamps[index]
+            return usage
+    
+    def window(self, seconds: Optional[float] = None) -> Dict[str, List[float]]:
+        """Values per field for samples newer than ``seconds`` ago (all if None)"""
+        with self._lock:
+            indices = self._indices()
+            if seconds:
+                cutoff = time.time() - seconds
+                indices = [index for index in indices if self.timestamps[index] >= cutoff]
+            return {field: [self.series[field][index] for index in indices] for field in self.FIELDS}
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    """min/max/avg/p95 of a sample window"""
+    ordered = sorted(values)
+    p95_index = max(int(round(0.95 * len(ordered))) - 1, 0)
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "avg": sum(ordered) / len(ordered),
+        "p95": ordered[p95_index],
+    }
+
+class StatsCollector:
+    """Streams stats for running containers into per-container ring buffers"""
+    
+    def __init__(self, capacity: int = STATS_HISTORY, discovery_interval: float = STATS_DISCOVERY_INTERVAL):
+        self.capacity = capacity
+        self.discovery_interval = discovery_interval
+        self.running = False
+        self._buffers: Dict[str, StatsRingBuffer] = {}
+        self._streams: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self._stop.clear()
+        threading.Thread(target=self._discover_loop, name="stats-discovery", daemon=True).start()
+        logger.info(f"📈 Stats collector started ({self.capacity} samples per container)")
     
-    return [types.TextContent(type="text", text=result)]
+    def stop(self) -> None:
+        self.running = False
+        self._stop.set()
+    
+    def available(self) -> bool:
+        """Whether history is collected for the host of the current call"""
+        return self.running and _host_name() == DEFAULT_HOST
+    
+    def find(self, container_ref: str) -> Optional[StatsRingBuffer]:
+        """Look a buffer up by full ID, ID prefix or name"""
+        with self._lock:
+            buffer = self._buffers.get(container_ref)
+            if buffer is not None:
+                return buffer
+            container_id = _resolve_reference(
+                container_ref, ((container_id, [buffer.name]) for container_id, buffer in self._buffers.items())
+            )
+            return self._buffers.get(container_id) if container_id else None
+    
+    def _discover_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._discover()
+            except Exception as e:
+                logger.warning(f"Stats discovery failed: {e}")
+            self._stop.wait(self.discovery_interval)
+    
+    def _discover(self) -> None:
+        containers = _docker().api.containers(all=True)
+        known = {container["Id"] for container in containers}
+        with self._lock:
+            # Keep history of stopped containers until they are removed
+            for container_id in list(self._buffers):
+                if container_id not in known:
+                    del self._buffers[container_id]
+                    self._streams.pop(container_id, None)
+            for container in containers:
+                container_id = container["Id"]
+                if container.get("State") != "running":
+                    continue
+                stream = self._streams.get(container_id)
+                if stream is not None and stream.is_alive():
+                    continue
+                if container_id not in self._buffers:
+                    name = container["Names"][0].lstrip("/") if container.get("Names") else container_id[:12]
+                    self._buffers[container_id] = StatsRingBuffer(container_id, name, self.capacity)
+                stream = threading.Thread(target=self._stream, args=(container_id,),
+                                          name=f"stats-{container_id[:12]}", daemon=True)
+                self._streams[container_id] = stream
+                stream.start()
+    
+    def _stream(self, container_id: str) -> None:
+        buffer = self._buffers.get(container_id)
+        previous = None
+        previous_at = 0.0
+        try:
+            for stats in _docker().api.stats(container_id, decode=True, stream=True):
+                if self._stop.is_set():
+                    return
+                now = time.monotonic()
+                usage = _compute_stats(stats, previous, now - previous_at if previous else None)
+                buffer.append(time.time(), usage)
+                previous, previous_at = stats, now
+        except Exception as e:
+            logger.debug(f"Stats stream for {container_id[:12]} ended: {e}")
+        finally:
+            # The daemon ends the stream when the container stops; forget
+            # the thread so stopped and removed containers leave no entry
+            with self._lock:
+                if self._streams.get(container_id) is threading.current_thread():
+                    del self._streams[container_id]
+
+stats_collector = StatsCollector()
+
+HISTORY_FORMATS = {
+    "cpu_percent": ("CPU", lambda v: f"{v:.2f}%"),
+    "memory_usage": ("Memory", lambda v: f"{v / (1024**2):.1f}MB"),
+    "net_rx_rate": ("Network RX", lambda v: f"{v / 1024:.1f}KB/s"),
+    "net_tx_rate": ("Network TX", lambda v: f"{v / 1024:.1f}KB/s"),
+    "blk_read_rate": ("Block read", lambda v: f"{v / 1024:.1f}KB/s"),
+    "blk_write_rate": ("Block write", lambda v: f"{v / 1024:.1f}KB/s"),
+}
+
+def _history_data(history: StatsRingBuffer, window: Optional[int]) -> Dict[str, Any]:
+    """Latest sample and an optional window summary, straight from memory"""
+    latest = history.latest()
+    data = {
+        "container": history.name,
+        "source": "history",
+        "age_seconds": round(time.time() - latest.pop("timestamp"), 1),
+        **latest,
+    }
+    if window:
+        values = history.window(window)
+        samples = len(values["cpu_percent"])
+        data["window"] = {"seconds": window, "samples": samples}
+        if samples:
+            data["window"].update({field: _summarize(values[field]) for field in StatsRingBuffer.FIELDS})
+    return data
 
-async def _pull_image(args: Dict[str, Any]) -> List[types.TextContent]:
-    """Pull a Docker image"""
-    image_name = args["image"]
-    tag = args.get("tag", "latest")
+def _render_history(data: Dict[str, Any]) -> str:
+    parts = [
+        f"📊 **Resource Usage: {data['container']}** (collected {data['age_seconds']:.0f}s ago)\n\n",
+        f"**CPU Usage:** {data['cpu_percent']:.2f}%\n",
+        f"**Memory Usage:** {data['memory_usage'] / (1024**2):.1f}MB / {data['memory_limit'] / (1024**2):.1f}MB ({data['memory_percent']:.1f}%)\n",
+        f"**Network:** RX {data['net_rx_rate'] / 1024:.1f}KB/s, TX {data['net_tx_rate'] / 1024:.1f}KB/s\n",
+        f"**Block I/O:** R {data['blk_read_rate'] / 1024:.1f}KB/s, W {data['blk_write_rate'] / 1024:.1f}KB/s\n",
+    ]
+    window = data.get("window")
+    if window:
+        parts.append(f"\n**Last {window['seconds']}s** ({window['samples']} samples, min / avg / p95 / max):\n")
+        if not window["samples"]:
+            parts.append("- No samples in this window\n")
+        else:
+            for field, (label, fmt) in HISTORY_FORMATS.items():
+                summary = window[field]
+                parts.append(f"- {label}: {fmt(summary['min'])} / {fmt(summary['avg'])} / {fmt(summary['p95'])} / {fmt(summary['max'])}\n")
+    return "".join(parts)
+
+# Image layer index
+# An image's Size counts every layer it contains, so summing sizes counts
+# shared base layers once per image. The index maps each layer digest (from
+# RootFS.Layers) to the images containing it, with per-layer sizes taken
+# from the image history. Images are immutable, so each image ID is loaded
+# once; a sync against the current listing loads new IDs and forgets
+# removed ones. One index is kept per Docker host. Where /system/df reports
+# them, its per-image shared sizes and layer total replace the estimates.
+LAYER_INDEX_TOP = 5
+
+# Diff ID of the empty tar that steps such as WORKDIR commit as a layer
+EMPTY_LAYER = "sha256:5f70bf18a086007016e948b04aed3b82103a36bea41755b6cddfaf10ace3c6ef"
+
+def _layer_sizes(layers: List[str], history: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Map RootFS layers to history entry sizes"""
+    # History also lists metadata-only steps (ENV, CMD...) with size 0 and
+    # does not say which entries produced layers. Zero-byte entries and the
+    # empty layer are dropped on both sides, the rest is paired bottom-up
+    # and any leftover layers are zero-byte ones
+    layers = [layer for layer in layers if layer != EMPTY_LAYER]
+    sizes = [entry.get("Size", 0) for entry in reversed(history) if entry.get("Size", 0) > 0]
+    if len(sizes) > len(layers):
+        # Squashed or imported images: fold the oldest extra steps together
+        excess = len(sizes) - len(layers) + 1
+        sizes = [sum(sizes[:excess])] + sizes[excess:]
+    return dict(zip(layers, sizes + [0] * (len(layers) - len(sizes))))
+
+class LayerIndex:
+    """Layer digest to image index for one Docker host"""
+    
+    def __init__(self):
+        self.images: Dict[str, List[str]] = {}
+        self.layer_sizes: Dict[str, Dict[str, int]] = {}
+        self.owners: Dict[str, set] = {}
+        self._lock = asyncio.Lock()
     
-    full_image = f"{image_name}:{tag}" if ":" not in image_name else image_name
+    async def sync(self, image_ids: Iterable[str]) -> None:
+        async with self._lock:
+            current = set(image_ids)
+            for image_id in set(self.images) - current:
+                self._remove(image_id)
+            added = [image_id for image_id in current if image_id not in self.images]
+            loaded = await asyncio.gather(*(run_blocking(self._load, image_id) for image_id in added),
+                                          return_exceptions=True)
+            for image_id, result in zip(added, loaded):
+                if isinstance(result, BaseException):
+                    # Removed between listing and inspect; picked up next sync if not
+                    logger.debug(f"Could not index image {image_id[:19]}: {result}")
+                    continue
+                self._add(image_id, *result)
     
+    @staticmethod
+    def _load(image_id: str) -> tuple:
+        layers = _docker().api.inspect_image(image_id)["RootFS"].get("Layers") or []
+        history = _docker().api.history(image_id)
+        return layers, _layer_sizes(layers, history)
+    
+    def _add(self, image_id: str, layers: List[str], sizes: Dict[str, int]) -> None:
+        self.images[image_id] = layers
+        self.layer_sizes[image_id] = sizes
+        for layer in sizes:
+            self.owners.setdefault(layer, set()).add(image_id)
+    
+    def _remove(self, image_id: str) -> None:
+        del self.images[image_id]
+        for layer in self.layer_sizes.pop(image_id):
+            owners = self.owners.get(layer)
+            if owners is None:
+                continue
+            owners.discard(image_id)
+            if not owners:
+                del self.owners[layer]
+    
+    def size(self, layer: str) -> int:
+        # Images can disagree when their history pairs up differently; the
+        # largest estimate among current owners does not depend on load order
+        return max(self.layer_sizes[image_id][layer] for image_id in self.owners[layer])
+    
+    def usage(self, image_id: str) -> Optional[Dict[str, Any]]:
+        """Unique and shared bytes of one indexed image"""
+        layers = self.layer_sizes.get(image_id)
+        if layers is None:
+            return None
+        shared = [layer for layer in layers if len(self.owners[layer]) > 1]
+        shared_size = sum(self.size(layer) for layer in shared)
+        return {
+            "unique_size": self._stack_size(image_id) - shared_size,
+            "shared_size": shared_size,
+            "layers": len(layers),
+            "shared_layers": len(shared),
+        }
+    
+    def report(self, names: Dict[str, str], top: int = LAYER_INDEX_TOP) -> Dict[str, Any]:
+        """Deduplication totals, most shared layers and most used base images"""
+        shared = [layer for layer, owners in self.owners.items() if len(owners) > 1]
+        # A base image is one whose whole layer stack prefixes other images
+        stacks = {tuple(layers): image_id for image_id, layers in self.images.items() if layers}
+        dependents: Dict[str, int] = {}
+        for image_id, layers in self.images.items():
+            for depth in range(1, len(layers)):
+                base = stacks.get(tuple(layers[:depth]))
+                if base is not None and base != image_id:
+                    dependents[base] = dependents.get(base, 0) + 1
+        bases = heapq.nlargest(top, dependents.items(), key=lambda item: item[1] * self._stack_size(item[0]))
+        savings = {layer: self.size(layer) * (len(self.owners[layer]) - 1) for layer in shared}
+        return {
+            "apparent_size": sum(self._stack_size(image_id) for image_id in self.images),
+            "actual_size": sum(self.size(layer) for layer in self.owners),
+            "shared_size": sum(self.size(layer) for layer in shared),
+            "top_shared_layers": [
+                {
+                    "layer": layer[:19],
+                    "size": self.size(layer),
+                    "images": len(self.owners[layer]),
+                    "saved": savings[layer],
+                }
+                for layer in heapq.nlargest(top, shared, key=savings.__getitem__)
+            ],
+            "base_images": [
+                {
+                    "image": names.get(image_id, image_id[:19]),
+                    "size": self._stack_size(image_id),
+                    "dependents": count,
+                    "saved": self._stack_size(image_id) * count,
+                }
+                for image_id, count in bases
+            ],
+        }
+    
+    def _stack_size(self, image_id: str) -> int:
+        return sum(self.size(layer) for layer in self.layer_sizes[image_id])
+
+_layer_indexes: Dict[str, LayerIndex] = {}
+
+def _layer_index() -> LayerIndex:
+    """Layer index of the host selected for the current call"""
+    index = _layer_indexes.get(_host_name())
+    if index is None:
+        index = _layer_indexes[_host_name()] = LayerIndex()
+    return index
+
+async def _df_image_sizes(fresh: bool) -> Optional[Dict[str, Any]]:
+    """Per-image and total layer sizes from /system/df, when it has them"""
     try:
-        result = f"⬇️ **Pulling image: {full_image}**\n\n"
-        image = docker_client.images.pull(full_image)
-        result += f"✅ Successfully pulled `{full_image}`\n"
-        result += f"Image ID: `{image.short_id}`\n"
-        
-        return [types.TextContent(type="text", text=result)]
-        
+        _, df = await _fetch_df(fresh)
     except Exception as e:
+        logger.debug(f"Falling back to history-based layer sizes: {e}")
+        return None
+    images = df.get("Images") or []
+    # SharedSize is -1 when the daemon did not compute it
+    if any(image.get("SharedSize", -1) < 0 for image in images):
+        return None
+    layers_size = df.get("LayersSize") or 0
+    return {
+        "images": {image["Id"]: image for image in images},
+        "totals": {
+            "apparent_size": sum(image["Size"] for image in images),
+            "actual_size": layers_size,
+            "shared_size": max(layers_size - sum(image["Size"] - image["SharedSize"] for image in images), 0),
+        },
+    }
+
+async def _list_images(args: Dict[str, Any]) -> ToolResult:
+    """List Docker images"""
+    all_images = args.get("all", False)
+    filters = args.get("filters", {})
+    
+    # images.list() inspects every image; the low-level payload has all we show
+    if state_cache.available() and not all_images and not filters and not args.get("fresh"):
+        images = sorted(state_cache.images(), key=lambda image: image.get("Created", 0), reverse=True)
+    else:
+        images = await run_blocking(_docker().api.images, all=all_images, filters=filters)
+    
+    rows = [
+        {
+            "tag": (image.get("RepoTags") or ["<none>"])[0],
+            "id": image["Id"][:19],
+            "size": image["Size"],
+            "created": datetime.fromtimestamp(image["Created"], timezone.utc).isoformat(),
+            "tags": image.get("RepoTags") or [],
+            "digests": image.get("RepoDigests") or [],
+            "labels": image.get("Labels") or {},
+        }
+        for image in images
+    ]
+    
+    # The layer index is only consulted when its numbers are asked for
+    requested = set(args.get("fields") or []) | {(args.get("sort_by") or "").lstrip("-")}
+    extra = None
+    if args.get("dedup") or requested & set(LAYER_FIELDS):
+        index = _layer_index()
+        measured = await _df_image_sizes(bool(args.get("fresh")))
+        # Sharing is only meaningful against every top-level image
+        if measured is not None:
+            top_level = set(measured["images"])
+            if not filters and not all_images:
+                # Images newer than a cached df
+                top_level.update(image["Id"] for image in images)
+            await index.sync(top_level)
+        elif filters or all_images:
+            await index.sync(image["Id"] for image in await run_blocking(_docker().api.images))
+        else:
+            await index.sync(image["Id"] for image in images)
+        for image, row in zip(images, rows):
+            row.update(index.usage(image["Id"]) or dict.fromkeys(LAYER_FIELDS))
+            summary = measured["images"].get(image["Id"]) if measured else None
+            if summary is not None:
+                row.update(unique_size=summary["Size"] - summary["SharedSize"], shared_size=summary["SharedSize"])
+        if args.get("dedup"):
+            names = {image["Id"]: row["tag"] for image, row in zip(images, rows)}
+            report = index.report(names)
+            if measured is not None:
+                report.update(measured["totals"])
+            extra = {"dedup": report}
+            if not args.get("fields"):
+                args = dict(args, fields=IMAGE_DEFAULT_FIELDS + ["unique_size", "shared_size"])
+    
+    return _listing_page("images", rows, args, _render_images,
+                         IMAGE_FIELDS, IMAGE_DEFAULT_FIELDS, "-created", extra=extra)
+
+LAYER_FIELDS = ["unique_size", "shared_size", "layers", "shared_layers"]
+IMAGE_FIELDS = ["tag", "id", "size", "created", "tags", "digests", "labels"] + LAYER_FIELDS
+IMAGE_DEFAULT_FIELDS = ["tag", "id", "size", "created"]
+
+IMAGE_LABELS = {
+    "id": ("ID", _code),
+    "size": ("Size", lambda size: f"`{size / (1024**2):.1f}MB`"),
+    "created": ("Created", _code),
+    "tags": ("Tags", _code),
+    "digests": ("Digests", _code),
+    "labels": ("Labels", _code),
+    "unique_size": ("Unique size", lambda size: f"`{_format_size(size)}`" if size is not None else "unknown"),
+    "shared_size": ("Shared size", lambda size: f"`{_format_size(size)}`" if size is not None else "unknown"),
+    "layers": ("Layers", str),
+    "shared_layers": ("Shared layers", str),
+}
+
+def _render_images(data: Dict[str, Any]) -> str:
+    if not data["images"]:
+        return "📦 No images found matching the criteria.\n"
+    parts = ["🖼️ **Docker Images**\n\n"]
+    for image in data["images"]:
+        parts.append(f"**{image['tag']}**\n")
+        parts.extend(_render_field_lines(image, IMAGE_LABELS))
+        parts.append("\n")
+    if "dedup" in data:
+        parts.append(_render_dedup(data["dedup"]))
+    return "".join(parts)
+
+def _render_dedup(report: Dict[str, Any]) -> str:
+    parts = [
+        "🧬 **Layer Deduplication**\n\n",
+        f"- Sum of image sizes: {_format_size(report['apparent_size'])}\n",
+        f"- Actual bytes on disk: {_format_size(report['actual_size'])}"
+        f" ({_format_size(report['shared_size'])} in shared layers)\n",
+    ]
+    if report["base_images"]:
+        parts.append("\n**Most used base images:**\n")
+        for base in report["base_images"]:
+            parts.append(
+                f"- `{base['image']}` ({_format_size(base['size'])}) under {base['dependents']} images, "
+                f"saving {_format_size(base['saved'])}\n"
+            )
+    if report["top_shared_layers"]:
+        parts.append("\n**Most shared layers:**\n")
+        for layer in report["top_shared_layers"]:
+            parts.append(
+                f"- `{layer['layer']}` {_format_size(layer['size'])} in {layer['images']} images, "
+                f"saving {_format_size(layer['saved'])}\n"
+            )
+    return "".join(parts)
+
+# Image pulls
+# A pull reads the daemon's progress stream on a worker thread and keeps
+# per-layer byte counts, publishing a snapshot to its listeners at most every
+# PULL_PROGRESS_INTERVAL. Concurrent pulls of the same reference share one
+# operation; each caller is shielded so a timed-out call does not abort the
+# pull for the others. Multi-image calls pull up to MCP_PULL_PARALLELISM
+# references at once. A pull can take minutes, so pulls run on their own
+# MCP_PULL_WORKERS threads and never hold the shared worker pool.
+PULL_WORKERS = int(os.environ.get("MCP_PULL_WORKERS", "3"))
+PULL_PARALLELISM = min(int(os.environ.get("MCP_PULL_PARALLELISM", "3")), PULL_WORKERS)
+PULL_PROGRESS_INTERVAL = 0.5
+PULL_DONE_STATUSES = ("Download complete", "Pull complete", "Already exists")
+
+_pull_executor = ThreadPoolExecutor(max_workers=PULL_WORKERS, thread_name_prefix="docker-pull")
+
+def _image_reference(image: str, default_tag: Optional[str]) -> tuple:
+    """Split an image name into (repository, tag, reference)"""
+    # parse_repository_tag only treats a colon after the last slash as a tag
+    # separator, so registry ports such as localhost:5000/app survive
+    repository, tag = docker.utils.parse_repository_tag(image)
+    if not tag:
+        tag = default_tag or "latest"
+    separator = "@" if tag.startswith("sha256:") else ":"
+    return repository, tag, f"{repository}{separator}{tag}"
+
+class ImagePull:
+    """One in-flight pull, shared by every caller of the same reference"""
+    
+    def __init__(self, repository: str, tag: str, reference: str):
+        self.repository = repository
+        self.tag = tag
+        self.reference = reference
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.snapshot: Dict[str, Any] = {"current": 0, "total": 0, "layers": 0, "done": 0}
+        self.task: Optional[asyncio.Future] = None
+    
+    async def run(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await run_in_executor(_pull_executor, self._pull, loop)
+    
+    def _pull(self, loop: asyncio.AbstractEventLoop) -> Dict[str, Any]:
+        started = time.monotonic()
+        layers: Dict[str, List[int]] = {}
+        done = set()
+        status = None
+        published = 0.0
+        for message in _docker().api.pull(self.repository, tag=self.tag, stream=True, decode=True):
+            if "error" in message:
+                raise docker.errors.APIError(message["error"])
+            layer = message.get("id")
+            detail = message.get("progressDetail") or {}
+            if message.get("status") == "Downloading" and layer and detail.get("total"):
+                layers[layer] = [detail.get("current", 0), detail["total"]]
+            elif message.get("status") in PULL_DONE_STATUSES and layer:
+                done.add(layer)
+                if layer in layers:
+                    layers[layer][0] = layers[layer][1]
+            elif message.get("status", "").startswith("Status:"):
+                status = message["status"]
+            now = time.monotonic()
+            if now - published >= PULL_PROGRESS_INTERVAL:
+                published = now
+                loop.call_soon_threadsafe(self._publish, self._snapshot(layers, done))
+        loop.call_soon_threadsafe(self._publish, self._snapshot(layers, done))
+        
+        image = _docker().api.inspect_image(self.reference)
+        return {
+            "image": self.reference,
+            "id": image["Id"][:19],
+            "status": "up to date" if status and "up to date" in status else "pulled",
+            "layers": len(done),
+            "downloaded": sum(current for current, _ in layers.values()),
+            "seconds": round(time.monotonic() - started, 2),
+        }
+    
+    @staticmethod
+    def _snapshot(layers: Dict[str, List[int]], done: set) -> Dict[str, Any]:
+        return {
+            "current": sum(current for current, _ in layers.values()),
+            "total": sum(total for _, total in layers.values()),
+            "layers": len(layers.keys() | done),
+            "done": len(done),
+        }
+    
+    def _publish(self, snapshot: Dict[str, Any]) -> None:
+        self.snapshot = snapshot
+        for listener in list(self.listeners):
+            listener(snapshot)
+
+_active_pulls: Dict[tuple, ImagePull] = {}
+
+async def _pull_shared(repository: str, tag: str, reference: str,
+                       listener: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Pull a reference, joining the pull already running for it if any"""
+    key = (_host_name(), reference)
+    pull = _active_pulls.get(key)
+    joined = pull is not None
+    if pull is None:
+        pull = ImagePull(repository, tag, reference)
+        pull.task = asyncio.ensure_future(pull.run())
+        _active_pulls[key] = pull
+        pull.task.add_done_callback(lambda _: _active_pulls.pop(key, None))
+    pull.listeners.append(listener)
+    listener(pull.snapshot)
+    try:
+        result = await asyncio.shield(pull.task)
+    finally:
+        pull.listeners.remove(listener)
+    return dict(result, shared=joined)
+
+def _progress_sender() -> Optional[Callable[[float, Optional[float], str], None]]:
+    """Callback sending MCP progress notifications, if the client asked for them"""
+    job = _current_job.get()
+    if job is not None:
+        return job.set_progress
+    try:
+        context = server.request_context
+    except LookupError:
+        return None
+    token = context.meta.progressToken if context.meta else None
+    if token is None:
+        return None
+    
+    def send(progress: float, total: Optional[float], message: str) -> None:
+        asyncio.ensure_future(context.session.send_progress_notification(
+            progress_token=token,
+            progress=progress,
+            total=total,
+            message=message,
+            related_request_id=context.request_id,
+        ))
+    
+    return send
+
+async def _pull_image(args: Dict[str, Any]) -> ToolResult:
+    """Pull one or more Docker images"""
+    names = list(args.get("images") or [])
+    if args.get("image"):
+        names.insert(0, args["image"])
+    if not names:
+        return [types.TextContent(type="text", text="❌ Provide 'image' or 'images' to pull")]
+    
+    references = {}
+    for name in names:
+        repository, tag, reference = _image_reference(name, args.get("tag"))
+        references.setdefault(reference, (repository, tag))
+    parallelism = max(1, min(int(args.get("parallelism") or PULL_PARALLELISM), PULL_WORKERS))
+    
+    # Progress is reported in downloaded bytes summed over every image of the
+    # call; notifications are only sent when the total moved forward
+    send = _progress_sender()
+    snapshots: Dict[str, Dict[str, Any]] = {}
+    sent = {"progress": -1.0}
+    finished = []
+    
+    def report(reference: str, snapshot: Dict[str, Any]) -> None:
+        snapshots[reference] = snapshot
+        if send is None:
+            return
+        current = float(sum(item["current"] for item in snapshots.values()))
+        total = float(sum(item["total"] for item in snapshots.values())) or None
+        if current <= sent["progress"]:
+            return
+        sent["progress"] = current
+        layers = sum(item["layers"] for item in snapshots.values())
+        done = sum(item["done"] for item in snapshots.values())
+        send(current, total, f"{len(finished)}/{len(references)} images, {done}/{layers} layers")
+    
+    semaphore = asyncio.Semaphore(parallelism)
+    
+    async def pull_one(reference: str) -> Dict[str, Any]:
+        repository, tag = references[reference]
+        async with semaphore:
+            try:
+                result = await _pull_shared(repository, tag, reference,
+                                            lambda snapshot: report(reference, snapshot))
+            except Exception as e:
+                logger.warning(f"Pull of {reference} failed: {e}")
+                result = {"image": reference, "id": None, "status": "failed", "error": str(e)}
+        finished.append(reference)
+        return result
+    
+    results = await asyncio.gather(*(pull_one(reference) for reference in references))
+    if len(results) == 1 and results[0]["status"] == "failed":
         return [types.TextContent(
             type="text",
-            text=f"❌ Failed to pull image '{full_image}': {str(e)}"
+            text=f"❌ Failed to pull image '{results[0]['image']}': {results[0]['error']}"
         )]
+    data = {"parallelism": parallelism, "images": results}
+    return ToolOutput(data, _render_pull, rows=results,
+                      columns=["image", "status", "id", "layers", "downloaded", "seconds", "error"])
 
-async def _system_info(args: Dict[str, Any]) -> List[types.TextContent]:
+def _render_pull(data: Dict[str, Any]) -> str:
+    if len(data["images"]) == 1:
+        image = data["images"][0]
+        shared = " (joined a pull already in progress)" if image["shared"] else ""
+        return (
+            f"⬇️ **Pulling image: {image['image']}**\n\n"
+            f"✅ Successfully pulled `{image['image']}`{shared}\n"
+            f"Image ID: `{image['id']}`\n"
+            f"Layers: {image['layers']}, downloaded {image['downloaded'] / (1024**2):.1f}MB in {image['seconds']}s\n"
+        )
+    pulled = sum(image["status"] != "failed" for image in data["images"])
+    parts = [f"⬇️ **Pulled {pulled}/{len(data['images'])} images** ({data['parallelism']} at a time)\n\n"]
+    for image in data["images"]:
+        if image["status"] == "failed":
+            parts.append(f"❌ `{image['image']}`: {image['error']}\n")
+        else:
+            parts.append(
+                f"✅ `{image['image']}` {image['status']}: `{image['id']}`, "
+                f"{image['layers']} layers, {image['downloaded'] / (1024**2):.1f}MB in {image['seconds']}s\n"
+            )
+    return "".join(parts)
+
+async def _system_info(args: Dict[str, Any]) -> ToolResult:
     """Get Docker system information"""
     try:
-        info = docker_client.info()
-        version = docker_client.version()
-        
-        result = "🐳 **Docker System Information**\n\n"
-        result += f"**Version:** {version['Version']}\n"
-        result += f"**API Version:** {version['ApiVersion']}\n"
-        result += f"**OS/Arch:** {info['OperatingSystem']} / {info['Architecture']}\n"
-        result += f"**Total Memory:** {info['MemTotal'] / (1024**3):.1f}GB\n"
-        result += f"**CPUs:** {info['NCPU']}\n\n"
-        
-        result += f"**Containers:**\n"
-        result += f"- Running: {info['ContainersRunning']}\n"
-        result += f"- Stopped: {info['ContainersStopped']}\n"
-        result += f"- Paused: {info['ContainersPaused']}\n\n"
-        
-        result += f"**Images:** {info['Images']}\n"
-        result += f"**Server Version:** {info['ServerVersion']}\n"
+        info, version = await asyncio.gather(
+            run_blocking(_docker().info),
+            run_blocking(_docker().version),
+        )
         
-        return [types.TextContent(type="text", text=result)]
+        data = {
+            "version": version["Version"],
+            "api_version": version["ApiVersion"],
+            "os": info["OperatingSystem"],
+            "architecture": info["Architecture"],
+            "mem_total": info["MemTotal"],
+            "cpus": info["NCPU"],
+            "containers": {
+                "running": info["ContainersRunning"],
+                "stopped": info["ContainersStopped"],
+                "paused": info["ContainersPaused"],
+            },
+            "images": info["Images"],
+            "server_version": info["ServerVersion"],
+        }
+        return ToolOutput(data, _render_system_info)
         
     except Exception as e:
         return [types.TextContent(
@@ -450,89 +3377,389 @@ async def _system_info(args: Dict[str, Any]) -> List[types.TextContent]:
             text=f"❌ Failed to get system info: {str(e)}"
         )]
 
-async def _compose_services(args: Dict[str, Any]) -> List[types.TextContent]:
-    """List Docker Compose services"""
-    project_path = args.get("project_path", ".")
+def _render_system_info(data: Dict[str, Any]) -> str:
+    return (
+        "🐳 **Docker System Information**\n\n"
+        f"**Version:** {data['version']}\n"
+        f"**API Version:** {data['api_version']}\n"
+        f"**OS/Arch:** {data['os']} / {data['architecture']}\n"
+        f"**Total Memory:** {data['mem_total'] / (1024**3):.1f}GB\n"
+        f"**CPUs:** {data['cpus']}\n\n"
+        f"**Containers:**\n"
+        f"- Running: {data['containers']['running']}\n"
+        f"- Stopped: {data['containers']['stopped']}\n"
+        f"- Paused: {data['containers']['paused']}\n\n"
+        f"**Images:** {data['images']}\n"
+        f"**Server Version:** {data['server_version']}\n"
+    )
+
+# Disk usage
+# /system/df walks every layer, container filesystem, volume and cache
+# record, which takes seconds on busy build hosts, so its result is cached
+# per host for MCP_DF_TTL seconds. Accounting follows `docker system df`:
+# image bytes are the deduplicated layer total, split into bytes unique to
+# one image and bytes shared between images, and each category reports
+# what pruning unused objects would reclaim.
+DF_TTL = float(os.environ.get("MCP_DF_TTL", "60"))
+DF_TOP = 10
+
+_df_cache: Dict[str, tuple] = {}
+
+DISK_CATEGORIES = {
+    "images": "🖼️ Images",
+    "containers": "📦 Containers",
+    "volumes": "💽 Volumes",
+    "build_cache": "🧱 Build cache",
+}
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}" if unit != "B" else f"{size:.0f}B"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+async def _fetch_df(fresh: bool) -> tuple:
+    """Return (age in seconds, /system/df payload) for the current host"""
+    host = _host_name()
+    cached = _df_cache.get(host)
+    if cached is not None and not fresh and time.monotonic() - cached[0] < DF_TTL:
+        return time.monotonic() - cached[0], cached[1]
+    df = await run_blocking(_docker().api.df)
+    _df_cache[host] = (time.monotonic(), df)
+    return 0.0, df
+
+def _analyze_df(df: Dict[str, Any]) -> tuple:
+    """Reduce a /system/df payload to category totals and per-object sizes"""
+    items = []
     
+    images = df.get("Images") or []
+    layers_size = df.get("LayersSize") or 0
+    unique = 0
+    active_bytes = 0
+    active_shares = False
+    for image in images:
+        # SharedSize is -1 when the daemon did not compute it
+        own = image["Size"] - image["SharedSize"] if image.get("SharedSize", -1) >= 0 else image["Size"]
+        unique += own
+        in_use = image.get("Containers", 0) > 0
+        if in_use:
+            active_bytes += own
+            active_shares = active_shares or image.get("SharedSize", -1) > 0
+        items.append({
+            "category": "images",
+            "name": (image.get("RepoTags") or ["<none>"])[0],
+            "id": image["Id"][:19],
+            "size": image["Size"],
+            "unique": own,
+            "in_use": in_use,
+        })
+    
+    containers = df.get("Containers") or []
+    for container in containers:
+        items.append({
+            "category": "containers",
+            "name": (container.get("Names") or [container["Id"][:12]])[0].lstrip("/"),
+            "id": container["Id"][:12],
+            "size": container.get("SizeRw") or 0,
+            "unique": container.get("SizeRw") or 0,
+            "in_use": container.get("State") == "running",
+        })
+    
+    volumes = df.get("Volumes") or []
+    for volume in volumes:
+        usage = volume.get("UsageData") or {}
+        size = max(usage.get("Size", 0), 0)
+        items.append({
+            "category": "volumes",
+            "name": volume["Name"],
+            "id": volume["Name"][:12],
+            "size": size,
+            "unique": size,
+            "in_use": usage.get("RefCount", 0) > 0,
+        })
+    
+    build_cache = [record for record in df.get("BuildCache") or [] if not record.get("Shared")]
+    for record in build_cache:
+        items.append({
+            "category": "build_cache",
+            "name": record.get("Description") or record.get("Type", "cache"),
+            "id": record["ID"][:12],
+            "size": record.get("Size", 0),
+            "unique": record.get("Size", 0),
+            "in_use": bool(record.get("InUse")),
+        })
+    
+    def category(name: str, count: int, total: int, reclaimable: int) -> Dict[str, Any]:
+        active = sum(item["in_use"] for item in items if item["category"] == name)
+        return {"count": count, "active": active, "size": total, "reclaimable": max(reclaimable, 0)}
+    
+    # df does not say which shared layers belong to images in use; unlike
+    # `docker system df`, count them as used whenever an image in use has any
+    shared = max(layers_size - unique, 0)
+    categories = {
+        "images": category("images", len(images), layers_size,
+                           layers_size - active_bytes - (shared if active_shares else 0)),
+        "containers": category(
+            "containers", len(containers),
+            sum(item["size"] for item in items if item["category"] == "containers"),
+            sum(item["size"] for item in items if item["category"] == "containers" and not item["in_use"]),
+        ),
+        "volumes": category(
+            "volumes", len(volumes),
+            sum(item["size"] for item in items if item["category"] == "volumes"),
+            sum(item["size"] for item in items if item["category"] == "volumes" and not item["in_use"]),
+        ),
+        "build_cache": category(
+            "build_cache", len(build_cache),
+            sum(item["size"] for item in items if item["category"] == "build_cache"),
+            sum(item["size"] for item in items if item["category"] == "build_cache" and not item["in_use"]),
+        ),
+    }
+    layers = {"total": layers_size, "unique": unique, "shared": shared}
+    return categories, layers, items
+
+async def _disk_usage(args: Dict[str, Any]) -> ToolResult:
+    """Summarise Docker disk usage and rank the biggest consumers"""
+    top = int(args.get("top", DF_TOP))
     try:
-        cmd = ["docker-compose", "-f", f"{project_path}/docker-compose.yaml", "ps"]
-        result_cmd = subprocess.run(cmd, capture_output=True, text=True, cwd=project_path)
-        
-        if result_cmd.returncode != 0:
-            return [types.TextContent(
-                type="text",
-                text=f"❌ Failed to list compose services: {result_cmd.stderr}"
-            )]
-        
-        result = f"🐙 **Docker Compose Services**\n\n"
-        result += f"```\n{result_cmd.stdout}\n```"
-        
-        return [types.TextContent(type="text", text=result)]
-        
+        age, df = await _fetch_df(bool(args.get("fresh")))
     except Exception as e:
         return [types.TextContent(
             type="text",
-            text=f"❌ Error running docker-compose: {str(e)}"
+            text=f"❌ Failed to get disk usage: {str(e)}"
+        )]
+    
+    categories, layers, items = _analyze_df(df)
+    # Rank by the bytes removing the object would free; for images that is
+    # only what no other image shares
+    offenders = heapq.nlargest(top, items, key=lambda item: item["unique"])
+    data = {
+        "age": round(age, 1),
+        "total": sum(category["size"] for category in categories.values()),
+        "reclaimable": sum(category["reclaimable"] for category in categories.values()),
+        "categories": categories,
+        "layers": layers,
+        "offenders": offenders,
+    }
+    return ToolOutput(data, _render_disk_usage, rows=offenders,
+                      columns=["category", "name", "id", "size", "unique", "in_use"])
+
+def _render_disk_usage(data: Dict[str, Any]) -> str:
+    cached = f" (cached {data['age']:.0f}s ago)" if data["age"] else ""
+    parts = [
+        f"💾 **Docker Disk Usage**{cached}\n\n",
+        f"**Total:** {_format_size(data['total'])}, reclaimable {_format_size(data['reclaimable'])}\n\n",
+    ]
+    for name, label in DISK_CATEGORIES.items():
+        category = data["categories"][name]
+        share = category["reclaimable"] / category["size"] * 100 if category["size"] else 0
+        parts.append(
+            f"{label}: {category['count']} ({category['active']} in use), "
+            f"{_format_size(category['size'])}, reclaimable {_format_size(category['reclaimable'])} ({share:.0f}%)\n"
+        )
+    layers = data["layers"]
+    parts.append(
+        f"\n**Image layers:** {_format_size(layers['unique'])} unique to one image, "
+        f"{_format_size(layers['shared'])} shared\n"
+    )
+    if data["offenders"]:
+        parts.append("\n**Biggest consumers:**\n")
+        for rank, item in enumerate(data["offenders"], 1):
+            unused = "" if item["in_use"] else " (unused)"
+            detail = f", {_format_size(item['size'])} with shared layers" if item["size"] != item["unique"] else ""
+            parts.append(
+                f"{rank}. {DISK_CATEGORIES[item['category']].split()[0]} `{item['name']}`: "
+                f"{_format_size(item['unique'])}{detail}{unused}\n"
+            )
+    return "".join(parts)
+
+# Compose projects are discovered from the labels Compose puts on every
+# container, so no compose binary or compose file is needed to read them.
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+COMPOSE_SERVICE_LABEL = "com.docker.compose.service"
+COMPOSE_WORKING_DIR_LABEL = "com.docker.compose.project.working_dir"
+
+async def _compose_containers(args: Dict[str, Any]) -> tuple:
+    """Find the compose containers a call refers to.
+    
+    Returns ``(project, containers)``. An explicit project name must match; a
+    project_path is matched against the compose working directory or, failing
+    that, the directory name Compose derives project names from. When the
+    default path matches nothing, every project is returned with project None.
+    """
+    containers = _cached_containers(True, {"label": COMPOSE_PROJECT_LABEL})
+    if containers is None:
+        containers = await run_blocking(_docker().api.containers, all=True, filters={"label": COMPOSE_PROJECT_LABEL})
+    
+    if args.get("project"):
+        project = args["project"]
+        return project, [c for c in containers if c["Labels"].get(COMPOSE_PROJECT_LABEL) == project]
+    
+    project_path = args.get("project_path", ".")
+    path = os.path.abspath(project_path)
+    by_dir = [c for c in containers if c["Labels"].get(COMPOSE_WORKING_DIR_LABEL) == path]
+    if by_dir:
+        return by_dir[0]["Labels"][COMPOSE_PROJECT_LABEL], by_dir
+    name = re.sub(r"[^a-z0-9_-]", "", os.path.basename(path).lower())
+    by_name = [c for c in containers if c["Labels"].get(COMPOSE_PROJECT_LABEL) == name]
+    if by_name or project_path not in (".", ""):
+        return name, by_name
+    return None, containers
+
+async def _compose_services(args: Dict[str, Any]) -> ToolResult:
+    """List Docker Compose services"""
+    project, containers = await _compose_containers(args)
+    if not containers and project:
+        return [types.TextContent(
+            type="text",
+            text=f"❌ No containers found for compose project '{project}'."
         )]
+    
+    rows = [
+        {
+            "project": container["Labels"][COMPOSE_PROJECT_LABEL],
+            "service": container["Labels"].get(COMPOSE_SERVICE_LABEL, "unknown"),
+            "container": container["Names"][0].lstrip("/"),
+            "state": container.get("State"),
+            "status": container.get("Status", container.get("State")),
+            "image": container.get("Image"),
+            "ports": _format_ports(container.get("Ports") or []),
+            "working_dir": container["Labels"].get(COMPOSE_WORKING_DIR_LABEL),
+        }
+        for container in containers
+    ]
+    rows.sort(key=lambda row: (row["project"], row["service"], row["container"]))
+    return ToolOutput({"services": rows}, _render_compose_services, rows=rows)
 
-async def _compose_logs(args: Dict[str, Any]) -> List[types.TextContent]:
+def _render_compose_services(data: Dict[str, Any]) -> str:
+    if not data["services"]:
+        return "🐙 No Docker Compose projects found."
+    projects: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for row in data["services"]:
+        projects.setdefault(row["project"], {}).setdefault(row["service"], []).append(row)
+    
+    parts = [f"🐙 **Docker Compose Services**\n\n"]
+    for project_name, services in projects.items():
+        working_dir = next(iter(services.values()))[0]["working_dir"]
+        parts.append(f"**{project_name}**" + (f" (`{working_dir}`)" if working_dir else "") + "\n")
+        for service_name, members in services.items():
+            running = sum(1 for row in members if row["state"] == "running")
+            status_emoji = "🟢" if running == len(members) else "🟡" if running else "🔴"
+            parts.append(f"{status_emoji} **{service_name}** ({running}/{len(members)} running)\n")
+            parts.extend(
+                f"   - `{row['container']}`: {row['status']}, image `{row['image']}`, ports {row['ports']}\n"
+                for row in members
+            )
+        parts.append("\n")
+    return "".join(parts)
+
+async def _compose_logs(args: Dict[str, Any]) -> ToolResult:
     """Get Docker Compose service logs"""
     service = args.get("service", "")
     lines = args.get("lines", 100)
-    project_path = args.get("project_path", ".")
     
-    try:
-        cmd = ["docker-compose", "-f", f"{project_path}/docker-compose.yaml", "logs", "--tail", str(lines)]
-        if service:
-            cmd.append(service)
-        
-        result_cmd = subprocess.run(cmd, capture_output=True, text=True, cwd=project_path)
-        
-        if result_cmd.returncode != 0:
-            return [types.TextContent(
-                type="text",
-                text=f"❌ Failed to get compose logs: {result_cmd.stderr}"
-            )]
-        
-        service_text = f" for {service}" if service else ""
-        result = f"📋 **Docker Compose Logs{service_text}**\n\n"
-        result += f"```\n{result_cmd.stdout}\n```"
-        
-        return [types.TextContent(type="text", text=result)]
-        
-    except Exception as e:
+    project, containers = await _compose_containers(args)
+    if project is None:
         return [types.TextContent(
             type="text",
-            text=f"❌ Error getting compose logs: {str(e)}"
+            text="❌ No compose project found here. Pass project or project_path."
         )]
+    if service:
+        containers = [c for c in containers if c["Labels"].get(COMPOSE_SERVICE_LABEL) == service]
+    if not containers:
+        service_text = f" service '{service}'" if service else ""
+        return [types.TextContent(
+            type="text",
+            text=f"❌ No containers found for compose project '{project}'{service_text}."
+        )]
+    
+    prefixes = [c["Names"][0].lstrip("/") for c in containers]
+    failures = []
+    data: Dict[str, Any] = {"project": project, "service": service or None, "failures": failures}
+    if args.get("summarize"):
+        # Each container's whole tail streams into its own summariser, not
+        # just the part that fits the byte budget of the raw view
+        results = await asyncio.gather(
+            *(_read_logs(_summarize_logs, c["Id"], tail=lines) for c in containers),
+            return_exceptions=True,
+        )
+        summary = LogSummarizer()
+        for prefix, summarized in zip(prefixes, results):
+            if isinstance(summarized, BaseException):
+                failures.append(f"{prefix}: {summarized}")
+                continue
+            summary.merge(summarized)
+        data["summary"] = summary.to_dict()
+        return ToolOutput(data, _render_compose_log_summary, compact=_compact_log_summary)
+    
+    # Fetch every container's tail concurrently, then merge by timestamp;
+    # Docker's fixed-width RFC 3339 timestamps sort lexically
+    results = await asyncio.gather(
+        *(_read_logs(_collect_logs, c["Id"], LOG_MAX_BYTES, tail=lines) for c in containers),
+        return_exceptions=True,
+    )
+    streams = []
+    for prefix, collected in zip(prefixes, results):
+        if isinstance(collected, BaseException):
+            failures.append(f"{prefix}: {collected}")
+            continue
+        streams.append([(line, prefix) for line in collected["lines"]])
+    
+    # Keep the newest lines within the same budget as a single container
+    merged = [f"{prefix} | {line}" for line, prefix in heapq.merge(*streams, key=lambda entry: entry[0])]
+    kept: deque = deque()
+    kept_bytes = 0
+    for line in reversed(merged):
+        kept_bytes += len(line.encode("utf-8", errors="replace")) + 1
+        if kept_bytes > LOG_MAX_BYTES and kept:
+            break
+        kept.appendleft(line)
+    data.update({"max_bytes": LOG_MAX_BYTES, "dropped": len(merged) - len(kept), "lines": list(kept)})
+    return ToolOutput(data, _render_compose_logs, compact=lambda data: "\n".join(data["lines"]))
+
+def _render_compose_logs(data: Dict[str, Any]) -> str:
+    service_text = f" for {data['service']}" if data["service"] else ""
+    parts = [f"📋 **Docker Compose Logs{service_text}** ({data['project']})\n\n"]
+    if data["dropped"]:
+        parts.append(f"⚠️ Output limited to {data['max_bytes']} bytes, {data['dropped']} earlier lines omitted\n\n")
+    logs = "\n".join(data["lines"])
+    parts.append(f"```\n{logs}\n```")
+    parts.extend(f"\n⚠️ Could not read logs of {failure}" for failure in data["failures"])
+    return "".join(parts)
 
-async def _network_list(args: Dict[str, Any]) -> List[types.TextContent]:
+def _render_compose_log_summary(data: Dict[str, Any]) -> str:
+    service_text = f" for {data['service']}" if data["service"] else ""
+    parts = [f"🧮 **Docker Compose Log Summary{service_text}** ({data['project']})\n\n", _render_log_summary(data["summary"])]
+    parts.extend(f"\n⚠️ Could not read logs of {failure}" for failure in data["failures"])
+    return "".join(parts)
+
+async def _network_list(args: Dict[str, Any]) -> ToolResult:
     """List Docker networks"""
     filters = args.get("filters", {})
     
     try:
-        networks = docker_client.networks.list(filters=filters)
-        
-        if not networks:
-            return [types.TextContent(
-                type="text",
-                text="🌐 No networks found matching the criteria."
-            )]
-        
-        result = "🌐 **Docker Networks**\n\n"
-        for network in networks:
-            result += f"**{network.name}**\n"
-            result += f"   - ID: `{network.short_id}`\n"
-            result += f"   - Driver: `{network.attrs['Driver']}`\n"
-            result += f"   - Scope: `{network.attrs['Scope']}`\n"
-            
-            # List connected containers
-            containers = network.attrs.get('Containers', {})
-            if containers:
-                result += f"   - Containers: {len(containers)} connected\n"
-            result += "\n"
+        if state_cache.available() and not filters and not args.get("fresh"):
+            networks = sorted(state_cache.networks(), key=lambda network: network["Name"])
+        else:
+            networks = await run_blocking(_docker().api.networks, filters=filters)
         
-        return [types.TextContent(type="text", text=result)]
+        rows = [
+            {
+                "name": network["Name"],
+                "id": network["Id"][:12],
+                "driver": network["Driver"],
+                "scope": network["Scope"],
+                "containers": len(network.get("Containers") or {}),
+                "internal": network.get("Internal", False),
+                "subnets": [config["Subnet"] for config in (network.get("IPAM") or {}).get("Config") or [] if config.get("Subnet")],
+                "created": network.get("Created"),
+                "labels": network.get("Labels") or {},
+            }
+            for network in networks
+        ]
+        return _listing_page("networks", rows, args, _render_networks,
+                             NETWORK_FIELDS, NETWORK_DEFAULT_FIELDS, "name")
         
     except Exception as e:
         return [types.TextContent(
@@ -540,17 +3767,947 @@ async def _network_list(args: Dict[str, Any]) -> List[types.TextContent]:
             text=f"❌ Error listing networks: {str(e)}"
         )]
 
+NETWORK_FIELDS = ["name", "id", "driver", "scope", "containers", "internal", "subnets", "created", "labels"]
+NETWORK_DEFAULT_FIELDS = ["name", "id", "driver", "scope", "containers"]
+
+NETWORK_LABELS = {
+    "id": ("ID", _code),
+    "driver": ("Driver", _code),
+    "scope": ("Scope", _code),
+    "internal": ("Internal", _code),
+    "subnets": ("Subnets", _code),
+    "created": ("Created", _code),
+    "labels": ("Labels", _code),
+}
+
+def _render_networks(data: Dict[str, Any]) -> str:
+    if not data["networks"]:
+        return "🌐 No networks found matching the criteria.\n"
+    parts = ["🌐 **Docker Networks**\n\n"]
+    for network in data["networks"]:
+        parts.append(f"**{network['name']}**\n")
+        parts.extend(_render_field_lines(network, NETWORK_LABELS))
+        # List connected containers
+        if network.get("containers"):
+            parts.append(f"   - Containers: {network['containers']} connected\n")
+        parts.append("\n")
+    return "".join(parts)
+
+# Network topology
+# The graph links running containers to the networks they are attached to,
+# with each endpoint's IP and every published host port. It is built from
+# two listings: running containers (whose payload already carries every
+# endpoint and port) and networks. On the default host it is rebuilt only
+# when the state cache generation moves, i.e. after events such as container
+# starts or network connects; other hosts use a short TTL.
+TOPOLOGY_TTL = float(os.environ.get("MCP_TOPOLOGY_TTL", "30"))
+TOPOLOGY_QUERIES = ("graph", "reach", "shared", "ports")
+
+# Attachments that do not join a container to a shared segment
+ISOLATED_NETWORKS = {"none"}
+
+class NetworkGraph:
+    """Container-network adjacency of one Docker host"""
+    
+    def __init__(self, containers: List[Dict[str, Any]], networks: List[Dict[str, Any]]):
+        self.networks: Dict[str, Dict[str, Any]] = {}
+        for network in networks:
+            self.networks[network["Name"]] = {
+                "name": network["Name"],
+                "id": network["Id"][:12],
+                "driver": network.get("Driver"),
+                "internal": network.get("Internal", False),
+                "subnets": [config["Subnet"] for config in (network.get("IPAM") or {}).get("Config") or [] if config.get("Subnet")],
+            }
+        self.containers: Dict[str, Dict[str, Any]] = {}
+        self.members: Dict[str, Dict[str, str]] = {name: {} for name in self.networks}
+        self._ids: Dict[str, str] = {}
+        for container in containers:
+            name = container["Names"][0].lstrip("/") if container.get("Names") else container["Id"][:12]
+            endpoints = ((container.get("NetworkSettings") or {}).get("Networks")) or {}
+            self.containers[name] = {
+                "name": name,
+                "id": container["Id"][:12],
+                "networks": {network: endpoint.get("IPAddress") or None for network, endpoint in endpoints.items()},
+                "ports": [
+                    {
+                        "host_ip": port.get("IP", "0.0.0.0"),
+                        "host_port": port["PublicPort"],
+                        "container_port": port.get("PrivatePort"),
+                        "protocol": port.get("Type", "tcp"),
+                    }
+                    for port in container.get("Ports") or [] if port.get("PublicPort")
+                ],
+            }
+            self._ids[container["Id"]] = name
+            for network, endpoint in endpoints.items():
+                self.members.setdefault(network, {})[name] = endpoint.get("IPAddress") or None
+    
+    def resolve(self, ref: str) -> Optional[str]:
+        if ref in self.containers:
+            return ref
+        container_id = _resolve_reference(ref, ((container_id, [name]) for container_id, name in self._ids.items()))
+        return self._ids.get(container_id) if container_id else None
+    
+    def shared(self, source: str, target: str) -> List[str]:
+        source_networks = set(self.containers[source]["networks"]) - ISOLATED_NETWORKS
+        return sorted(source_networks & set(self.containers[target]["networks"]))
+    
+    def reach(self, source: str, target: str) -> Dict[str, Any]:
+        """How source can open connections to target"""
+        target_info = self.containers[target]
+        shared = self.shared(source, target)
+        if source == target or "host" in shared:
+            return {"reachable": True, "via": "localhost", "networks": shared, "addresses": ["127.0.0.1"]}
+        if shared:
+            addresses = [f"{target_info['networks'][network]} ({network})" for network in shared
+                         if target_info["networks"].get(network)]
+            return {"reachable": True, "via": "network", "networks": shared, "addresses": addresses}
+        # Published ports are reachable through the host from any container
+        # with a route out: host networking or a non-internal network
+        egress = any(
+            network == "host" or not self.networks.get(network, {}).get("internal", False)
+            for network in set(self.containers[source]["networks"]) - ISOLATED_NETWORKS
+        )
+        if egress and target_info["ports"]:
+            addresses = [f"{port['host_ip']}:{port['host_port']}->{port['container_port']}/{port['protocol']}"
+                         for port in target_info["ports"]]
+            return {"reachable": True, "via": "published ports", "networks": [], "addresses": addresses}
+        return {"reachable": False, "via": None, "networks": [], "addresses": []}
+    
+    def neighbours(self, source: str) -> List[str]:
+        names = set()
+        for network in set(self.containers[source]["networks"]) - ISOLATED_NETWORKS:
+            names.update(self.members.get(network, {}))
+        names.discard(source)
+        return sorted(names)
+    
+    def ports(self, host_port: Optional[int] = None) -> List[Dict[str, Any]]:
+        rows = [
+            dict(port, container=container["name"])
+            for container in self.containers.values()
+            for port in container["ports"]
+            if host_port is None or port["host_port"] == host_port
+        ]
+        return sorted(rows, key=lambda row: (row["host_port"], row["protocol"], row["container"]))
+    
+    def subgraph(self, network: Optional[str] = None, container: Optional[str] = None) -> Dict[str, Any]:
+        """Plain-data view of the graph, optionally around one network or container"""
+        if container is not None:
+            network_names = set(self.containers[container]["networks"])
+            container_names = {container, *self.neighbours(container)}
+        elif network is not None:
+            network_names = {network}
+            container_names = set(self.members.get(network, {}))
+        else:
+            network_names = set(self.members)
+            container_names = set(self.containers)
+        return {
+            "networks": [
+                dict(self.networks.get(name, {"name": name}),
+                     members={member: ip for member, ip in sorted(self.members.get(name, {}).items()) if member in container_names})
+                for name in sorted(network_names)
+            ],
+            "containers": [self.containers[name] for name in sorted(container_names)],
+        }
+
+_topology_cache: Dict[str, tuple] = {}
+
+async def _network_graph(fresh: bool) -> NetworkGraph:
+    """Topology of the current host, rebuilt only when it may have changed"""
+    host = _host_name()
+    generation = state_cache.generation if state_cache.available() else None
+    cached = _topology_cache.get(host)
+    if cached is not None and not fresh:
+        built, built_generation, graph = cached
+        if generation is not None and built_generation == generation:
+            return graph
+        if generation is None and built_generation is None and time.monotonic() - built < TOPOLOGY_TTL:
+            return graph
+    if generation is not None:
+        containers = [container for container in state_cache.containers() if container.get("State") == "running"]
+        networks = state_cache.networks()
+    else:
+        containers, networks = await asyncio.gather(
+            run_blocking(_docker().api.containers),
+            run_blocking(_docker().api.networks),
+        )
+    graph = NetworkGraph(containers, networks)
+    _topology_cache[host] = (time.monotonic(), generation, graph)
+    return graph
+
+async def _network_topology(args: Dict[str, Any]) -> ToolResult:
+    """Answer topology questions from the container-network graph"""
+    query = args.get("query", "graph")
+    if query not in TOPOLOGY_QUERIES:
+        return [types.TextContent(type="text", text=f"❌ Unknown query '{query}'. Use one of: {', '.join(TOPOLOGY_QUERIES)}")]
+    graph = await _network_graph(bool(args.get("fresh")))
+    
+    refs = {}
+    for key in ("source", "target", "container"):
+        if args.get(key):
+            refs[key] = graph.resolve(args[key])
+            if refs[key] is None:
+                return [types.TextContent(type="text", text=f"❌ Running container '{args[key]}' not found, or its ID prefix is ambiguous.")]
+    
+    if query in ("reach", "shared"):
+        if "source" not in refs or "target" not in refs:
+            return [types.TextContent(type="text", text=f"❌ The {query} query needs source and target containers.")]
+        source, target = refs["source"], refs["target"]
+        data = {"query": query, "source": source, "target": target}
+        if query == "shared":
+            data["networks"] = graph.shared(source, target)
+        else:
+            data.update(graph.reach(source, target))
+        return ToolOutput(data, _render_topology_answer)
+    
+    if query == "ports":
+        rows = graph.ports(args.get("port"))
+        return ToolOutput({"query": query, "port": args.get("port"), "ports": rows}, _render_published_ports,
+                          rows=rows, columns=["host_ip", "host_port", "container_port", "protocol", "container"])
+    
+    network = args.get("network")
+    if network is not None and network not in graph.members:
+        return [types.TextContent(type="text", text=f"❌ Network '{network}' not found.")]
+    data = {"query": query, **graph.subgraph(network, refs.get("container"))}
+    if "container" in refs:
+        data["reachable"] = {name: graph.reach(refs["container"], name)["via"]
+                             for name in graph.containers if name != refs["container"]}
+    return ToolOutput(data, _render_topology, compact=_compact_topology, views={"mermaid": _mermaid_topology})
+
+def _render_topology_answer(data: Dict[str, Any]) -> str:
+    if data["query"] == "shared":
+        if not data["networks"]:
+            return f"🚫 `{data['source']}` and `{data['target']}` share no network.\n"
+        return f"🔗 `{data['source']}` and `{data['target']}` share: {', '.join(f'`{name}`' for name in data['networks'])}\n"
+    if not data["reachable"]:
+        return f"🚫 `{data['source']}` cannot reach `{data['target']}`: no shared network and no published port.\n"
+    parts = [f"✅ `{data['source']}` can reach `{data['target']}` via {data['via']}\n"]
+    parts.extend(f"- {address}\n" for address in data["addresses"])
+    return "".join(parts)
+
+def _render_published_ports(data: Dict[str, Any]) -> str:
+    if not data["ports"]:
+        suffix = f" on host port {data['port']}" if data["port"] else ""
+        return f"🔌 No published ports{suffix}.\n"
+    parts = ["🔌 **Published Ports**\n\n"]
+    for port in data["ports"]:
+        parts.append(f"- `{port['host_ip']}:{port['host_port']}` -> `{port['container']}:{port['container_port']}/{port['protocol']}`\n")
+    return "".join(parts)
+
+def _render_topology(data: Dict[str, Any]) -> str:
+    parts = ["🕸️ **Network Topology**\n\n"]
+    for network in data["networks"]:
+        flags = ", internal" if network.get("internal") else ""
+        parts.append(f"🌐 **{network['name']}** ({network.get('driver', 'unknown')}{flags})\n")
+        if not network["members"]:
+            parts.append("   - no running containers\n")
+        for member, ip in network["members"].items():
+            parts.append(f"   - `{member}` {ip or ''}\n")
+        parts.append("\n")
+    published = [(container["name"], port) for container in data["containers"] for port in container["ports"]]
+    if published:
+        parts.append("🔌 **Published ports:** ")
+        parts.append(", ".join(f"`{port['host_port']}`->`{name}:{port['container_port']}`" for name, port in published))
+        parts.append("\n")
+    if "reachable" in data:
+        reachable = {name: via for name, via in data["reachable"].items() if via}
+        parts.append(f"\n📡 **Reachable from the selected container:** {len(reachable)}\n")
+        parts.extend(f"- `{name}` via {via}\n" for name, via in sorted(reachable.items()))
+    return "".join(parts)
+
+def _compact_topology(data: Dict[str, Any]) -> str:
+    rows = [
+        {"network": network["name"], "container": member, "ip": ip}
+        for network in data["networks"] for member, ip in network["members"].items()
+    ]
+    return _compact_table(rows, ["network", "container", "ip"])
+
+def _mermaid_topology(data: Dict[str, Any]) -> str:
+    """Bipartite container-network graph as a Mermaid flowchart"""
+    lines = ["graph LR"]
+    network_ids = {network["name"]: f"n{index}" for index, network in enumerate(data["networks"])}
+    container_ids = {container["name"]: f"c{index}" for index, container in enumerate(data["containers"])}
+    for network in data["networks"]:
+        lines.append(f'    {network_ids[network["name"]]}{{{{"🌐 {network["name"]}"}}}}')
+    for container in data["containers"]:
+        lines.append(f'    {container_ids[container["name"]]}["{container["name"]}"]')
+    for network in data["networks"]:
+        for member, ip in network["members"].items():
+            label = f"|{ip}|" if ip else ""
+            lines.append(f"    {container_ids[member]} ---{label} {network_ids[network['name']]}")
+    published = [(container["name"], port) for container in data["containers"] for port in container["ports"]]
+    if published:
+        lines.append('    host(("host"))')
+        for name, port in published:
+            lines.append(f"    host -->|{port['host_port']}:{port['container_port']}/{port['protocol']}| {container_ids[name]}")
+    return "\n".join(lines)
+
+# Container anomaly watch
+# One thread per Docker host follows the daemon's container events, filtered
+# down to lifecycle, OOM and health events, so a quiet host costs nothing
+# beyond one idle stream. kill and stop are followed so that an exit a user
+# asked for is not mistaken for a crash. Each container keeps lifetime
+# counters and its last MCP_ANOMALY_EVENTS events, and at most
+# MCP_ANOMALY_MAX_CONTAINERS containers are tracked (least recently active
+# dropped first), so memory is bounded. On start the watcher replays the
+# daemon's recent events for the window, and after a dropped stream it
+# resumes from the last event it saw. docker_anomalies then reports from
+# memory without polling. The default host is watched from startup (disable
+# with MCP_ANOMALY_WATCH=0); other hosts start watching on their first
+# docker_anomalies call.
+ANOMALY_WATCH_ENABLED = os.environ.get("MCP_ANOMALY_WATCH", "1").lower() not in ("0", "false", "no")
+ANOMALY_WINDOW = float(os.environ.get("MCP_ANOMALY_WINDOW", "900"))
+ANOMALY_EVENTS = int(os.environ.get("MCP_ANOMALY_EVENTS", "50"))
+ANOMALY_MAX_CONTAINERS = int(os.environ.get("MCP_ANOMALY_MAX_CONTAINERS", "1000"))
+ANOMALY_RESTART_THRESHOLD = int(os.environ.get("MCP_ANOMALY_RESTARTS", "3"))
+ANOMALY_READY_TIMEOUT = 10.0
+ANOMALY_ACTIONS = ("die", "oom", "health_status", "restart", "start", "kill", "stop")
+
+ANOMALY_LABELS = {
+    "restart_loop": "🔁 restart loop",
+    "oom": "💥 OOM killed",
+    "unhealthy": "🩺 unhealthy",
+    "crashed": "❌ crashed",
+}
+
+class ContainerEvents:
+    """Counters and recent events of one container"""
+    
+    def __init__(self, container_id: str):
+        self.id = container_id
+        self.name = container_id[:12]
+        self.image = None
+        self.health = None
+        self.exit_code = None
+        self.counts: Dict[str, int] = {}
+        # (timestamp, event, exit code) for die, otherwise None
+        self.events: deque = deque(maxlen=ANOMALY_EVENTS)
+    
+    def record(self, moment: float, event: str, exit_code: Optional[int]) -> None:
+        self.counts[event] = self.counts.get(event, 0) + 1
+        self.events.append((moment, event, exit_code))
+        if event == "die":
+            self.exit_code = exit_code
+        elif event in ("healthy", "unhealthy", "starting"):
+            self.health = event
+    
+    def summary(self, since: float, recent: int) -> Dict[str, Any]:
+        """Classify the events since a point in time"""
+        window = [entry for entry in self.events if entry[0] >= since]
+        counts: Dict[str, int] = {}
+        restarts = 0
+        # Restarts made by the restart policy rather than `docker restart`
+        policy_restarts = 0
+        died = False
+        # Whether the last start was already counted as a restart
+        paired = False
+        # A user stop or kill is under way until the next start
+        stopping = False
+        crashes = 0
+        for _, event, exit_code in window:
+            counts[event] = counts.get(event, 0) + 1
+            if event in ("kill", "stop"):
+                stopping = True
+            elif event == "die":
+                # `docker stop` and `docker kill` send kill before the die,
+                # so that exit is neither a crash nor a policy restart
+                paired = False
+                if not stopping:
+                    died = True
+                    crashes += bool(exit_code)
+            elif event == "start":
+                # A restart policy shows up as die followed by start
+                paired = died
+                if died:
+                    restarts += 1
+                    policy_restarts += 1
+                    died = False
+                stopping = False
+            elif event == "restart":
+                # `docker restart` sends kill, die, stop, start, restart: one
+                # restart, and not the policy's even if the kill was missed
+                if paired:
+                    policy_restarts -= 1
+                else:
+                    restarts += 1
+                paired = False
+        kinds = []
+        if policy_restarts >= ANOMALY_RESTART_THRESHOLD:
+            kinds.append("restart_loop")
+        if counts.get("oom"):
+            kinds.append("oom")
+        if self.health == "unhealthy" or counts.get("unhealthy"):
+            kinds.append("unhealthy")
+        if crashes and "restart_loop" not in kinds:
+            kinds.append("crashed")
+        return {
+            "container": self.name,
+            "id": self.id[:12],
+            "image": self.image,
+            "kinds": kinds,
+            "restarts": restarts,
+            "deaths": counts.get("die", 0),
+            "ooms": counts.get("oom", 0),
+            "unhealthy": counts.get("unhealthy", 0),
+            "last_exit_code": self.exit_code,
+            "health": self.health,
+            "last_event": _timestamp(window[-1][0]) if window else None,
+            "total": dict(self.counts),
+            "events": [
+                {"time": _timestamp(moment), "event": event, "exit_code": exit_code}
+                for moment, event, exit_code in window[-recent:]
+            ] if recent else [],
+        }
+
+def _timestamp(moment: float) -> str:
+    return datetime.fromtimestamp(moment, timezone.utc).isoformat()
+
+class AnomalyWatcher:
+    """Follows one host's container events into bounded per-container history"""
+    
+    def __init__(self, host: str, retry_interval: float = STATE_CACHE_RETRY):
+        self.host = host
+        self.retry_interval = retry_interval
+        self.started = False
+        self.watching_since = time.time() - ANOMALY_WINDOW
+        self.ready = threading.Event()
+        self._containers: "OrderedDict[str, ContainerEvents]" = OrderedDict()
+        # Newest event time seen and the events at that exact time, to skip
+        # the overlap when replaying after a reconnect
+        self._last_nano = 0
+        self._last_keys: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._events = None
+    
+    def start(self) -> None:
+        if self.started:
+            return
+        self.started = True
+        self._stop.clear()
+        threading.Thread(target=self._run, name=f"anomaly-watch-{self.host}", daemon=True).start()
+    
+    def stop(self) -> None:
+        self.started = False
+        self._stop.set()
+        if self._events is not None:
+            self._events.close()
+    
+    def _run(self) -> None:
+        filters = {"type": ["container"], "event": list(ANOMALY_ACTIONS)}
+        while not self._stop.is_set():
+            try:
+                client = client_manager.client(self.host)
+                now = int(time.time())
+                since = int(self._last_nano // 1_000_000_000) if self._last_nano else int(self.watching_since)
+                # Catch up on the bounded history first, then follow live
+                # from the same second; replayed duplicates are skipped
+                for event in client.api.events(since=since, until=now, filters=filters, decode=True):
+                    self._apply(event)
+                self.ready.set()
+                self._events = client.api.events(since=now, filters=filters, decode=True)
+                for event in self._events:
+                    self._apply(event)
+                    if self._stop.is_set():
+                        break
+            except Exception as e:
+                logger.warning(f"Anomaly watch on '{self.host}' lost the event stream: {e}")
+            self._stop.wait(self.retry_interval)
+    
+    def _apply(self, event: Dict[str, Any]) -> None:
+        action, _, detail = (event.get("Action") or event.get("status") or "").partition(":")
+        if event.get("Type", "container") != "container" or action not in ANOMALY_ACTIONS:
+            return
+        actor = event.get("Actor") or {}
+        attributes = actor.get("Attributes") or {}
+        container_id = actor.get("ID") or event.get("id")
+        if not container_id:
+            return
+        nano = event.get("timeNano") or int(event.get("time", 0)) * 1_000_000_000
+        key = (container_id, event.get("Action"))
+        if nano < self._last_nano or (nano == self._last_nano and key in self._last_keys):
+            return
+        if nano > self._last_nano:
+            self._last_nano = nano
+            self._last_keys = set()
+        self._last_keys.add(key)
+        exit_code = None
+        if action == "die":
+            try:
+                exit_code = int(attributes.get("exitCode", 0))
+            except ValueError:
+                pass
+        with self._lock:
+            history = self._containers.get(container_id)
+            if history is None:
+                history = self._containers[container_id] = ContainerEvents(container_id)
+                while len(self._containers) > ANOMALY_MAX_CONTAINERS:
+                    self._containers.popitem(last=False)
+            else:
+                self._containers.move_to_end(container_id)
+            history.name = attributes.get("name") or history.name
+            history.image = attributes.get("image") or history.image
+            history.record(nano / 1_000_000_000, detail.strip() if action == "health_status" else action, exit_code)
+    
+    def report(self, window: float, container_ref: Optional[str] = None, recent: int = 5) -> Dict[str, Any]:
+        since = time.time() - window
+        with self._lock:
+            histories = list(self._containers.values())
+            summaries = [
+                history.summary(since, recent) for history in histories
+                if not container_ref or history.name == container_ref or history.id.startswith(container_ref)
+            ]
+        active = [summary for summary in summaries if summary["last_event"]]
+        anomalies = [summary for summary in active if summary["kinds"]]
+        anomalies.sort(key=lambda summary: (len(summary["kinds"]), summary["ooms"], summary["restarts"],
+                                            summary["last_event"]), reverse=True)
+        return {
+            "host": self.host,
+            "window": window,
+            "watching_since": _timestamp(self.watching_since),
+            "tracked": len(histories),
+            "active": len(active),
+            "anomalies": anomalies,
+        }
+
+_anomaly_watchers: Dict[str, AnomalyWatcher] = {}
+
+def _anomaly_watcher(host: str) -> AnomalyWatcher:
+    """Get the host's watcher, starting it on first use"""
+    watcher = _anomaly_watchers.get(host)
+    if watcher is None:
+        watcher = _anomaly_watchers.setdefault(host, AnomalyWatcher(host))
+    watcher.start()
+    return watcher
+
+async def _anomalies(args: Dict[str, Any]) -> ToolResult:
+    """Report restart loops, OOM kills, failing health checks and crashes"""
+    window = float(args.get("window", ANOMALY_WINDOW))
+    recent = max(0, min(int(args.get("events", 5)), ANOMALY_EVENTS))
+    watcher = _anomaly_watcher(_host_name())
+    # A new watcher first replays the recent past, which is quick; wait on
+    # the event loop rather than parking a worker thread
+    deadline = time.monotonic() + ANOMALY_READY_TIMEOUT
+    while not watcher.ready.is_set() and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    if not watcher.ready.is_set():
+        return [types.TextContent(
+            type="text", 
+            text=f"❌ Could not read Docker events on host '{watcher.host}' yet, try again shortly."
+        )]
+    data = watcher.report(window, args.get("container"), recent)
+    return ToolOutput(data, _render_anomalies, rows=data["anomalies"],
+                      columns=["container", "kinds", "restarts", "deaths", "ooms", "unhealthy",
+                               "last_exit_code", "health", "last_event"])
+
+def _describe_window(seconds: float) -> str:
+    if seconds % 3600 == 0:
+        return f"{seconds / 3600:.0f}h"
+    if seconds % 60 == 0:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds:.0f}s"
+
+def _render_anomalies(data: Dict[str, Any]) -> str:
+    window = _describe_window(data["window"])
+    if not data["anomalies"]:
+        return (
+            f"✅ **No container anomalies** in the last {window} on {data['host']}\n\n"
+            f"No restart loops, OOM kills, failing health checks or crashes among "
+            f"{data['active']} containers with recent events.\n"
+        )
+    parts = [f"🚨 **Container Anomalies** (last {window} on {data['host']})\n\n"]
+    for anomaly in data["anomalies"]:
+        labels = ", ".join(ANOMALY_LABELS[kind] for kind in anomaly["kinds"])
+        image = f" (`{anomaly['image']}`)" if anomaly["image"] else ""
+        parts.append(f"**{anomaly['container']}**{image}: {labels}\n")
+        if anomaly["deaths"] or anomaly["restarts"]:
+            exit_code = f" (last exit code {anomaly['last_exit_code']})" if anomaly["last_exit_code"] is not None else ""
+            parts.append(f"   - Restarts: {anomaly['restarts']}, exits: {anomaly['deaths']}{exit_code}\n")
+        if anomaly["ooms"]:
+            parts.append(f"   - OOM kills: {anomaly['ooms']}\n")
+        if anomaly["health"]:
+            parts.append(f"   - Health: `{anomaly['health']}` ({anomaly['unhealthy']} unhealthy transitions)\n")
+        if anomaly["events"]:
+            recent = ", ".join(
+                f"`{event['time'][11:19]} {event['event']}"
+                + (f" ({event['exit_code']})" if event["exit_code"] is not None else "") + "`"
+                for event in anomaly["events"]
+            )
+            parts.append(f"   - Recent: {recent}\n")
+        parts.append("\n")
+    parts.append(f"Watching {data['tracked']} containers since {data['watching_since']}.\n")
+    return "".join(parts)
+
+async def _mcp_metrics(args: Dict[str, Any]) -> ToolResult:
+    """Summarise tool and Docker API metrics, slowest first"""
+    top = int(args.get("top", 10))
+    calls: Dict[str, Dict[str, float]] = {}
+    for (tool, status), count in metrics.series("docker_mcp_tool_calls_total").items():
+        calls.setdefault(tool, {})[status] = count
+    in_flight = {labels[0]: count for labels, count in metrics.series("docker_mcp_tool_in_flight").items()}
+    cache_hits: Dict[str, float] = {}
+    for (tool, result), count in metrics.series("docker_mcp_cache_requests_total").items():
+        if result != "miss":
+            cache_hits[tool] = cache_hits.get(tool, 0) + count
+    sizes = metrics.series("docker_mcp_tool_response_bytes")
+    
+    tools = []
+    for (tool,), histogram in metrics.series("docker_mcp_tool_duration_seconds").items():
+        outcomes = calls.get(tool, {})
+        size = sizes.get((tool,))
+        tools.append({
+            "tool": tool,
+            "calls": int(sum(outcomes.values())),
+            "errors": int(sum(count for status, count in outcomes.items() if status != "ok")),
+            "in_flight": int(in_flight.get(tool, 0)),
+            "cache_hits": int(cache_hits.get(tool, 0)),
+            **_latency_summary(histogram),
+            "avg_bytes": round(size.sum / size.count) if size and size.count else None,
+        })
+    tools.sort(key=lambda row: row["total_s"], reverse=True)
+    
+    requests_by_endpoint: Dict[tuple, Dict[str, float]] = {}
+    for (host, method, endpoint, status), count in metrics.series("docker_mcp_api_requests_total").items():
+        requests_by_endpoint.setdefault((host, method, endpoint), {})[status] = count
+    api = []
+    for (host, method, endpoint), histogram in metrics.series("docker_mcp_api_duration_seconds").items():
+        outcomes = requests_by_endpoint.get((host, method, endpoint), {})
+        api.append({
+            "host": host,
+            "endpoint": f"{method} {endpoint}",
+            "calls": histogram.count,
+            "errors": int(sum(count for status, count in outcomes.items() if status not in ("1xx", "2xx", "3xx"))),
+            **_latency_summary(histogram),
+        })
+    api = heapq.nlargest(top, api, key=lambda row: row["total_s"])
+    
+    data = {"tools": tools, "api": api, "endpoint": f":{METRICS_PORT}/metrics" if METRICS_PORT > 0 else None}
+    return ToolOutput(data, _render_mcp_metrics, compact=_compact_mcp_metrics)
+
+def _latency_summary(histogram: Histogram) -> Dict[str, Any]:
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 1) if value is not None else None
+    return {
+        "p50_ms": ms(histogram.quantile(0.5)),
+        "p95_ms": ms(histogram.quantile(0.95)),
+        "p99_ms": ms(histogram.quantile(0.99)),
+        "mean_ms": ms(histogram.sum / histogram.count) if histogram.count else None,
+        "total_s": round(histogram.sum, 3),
+    }
+
+def _render_mcp_metrics(data: Dict[str, Any]) -> str:
+    parts = ["📊 **Docker MCP Metrics**\n\n"]
+    if data["endpoint"]:
+        parts.append(f"Prometheus endpoint: `{data['endpoint']}`\n\n")
+    if not data["tools"]:
+        parts.append("No tool calls recorded yet.\n")
+    else:
+        parts.append("**Tools** (by total time)\n")
+        for row in data["tools"]:
+            errors = f", {row['errors']} errors" if row["errors"] else ""
+            busy = f", {row['in_flight']} running" if row["in_flight"] else ""
+            cached = f" (+{row['cache_hits']} from cache)" if row["cache_hits"] else ""
+            size = f", ~{_format_size(row['avg_bytes'])} per response" if row["avg_bytes"] is not None else ""
+            parts.append(
+                f"- `{row['tool']}`: {row['calls']} calls{cached}{errors}{busy}, "
+                f"p50 {row['p50_ms']}ms / p95 {row['p95_ms']}ms / p99 {row['p99_ms']}ms{size}\n"
+            )
+    if data["api"]:
+        parts.append("\n**Docker API** (by total time)\n")
+        for row in data["api"]:
+            errors = f", {row['errors']} errors" if row["errors"] else ""
+            parts.append(
+                f"- `{row['endpoint']}` on {row['host']}: {row['calls']} calls{errors}, "
+                f"p50 {row['p50_ms']}ms / p99 {row['p99_ms']}ms, {row['total_s']}s total\n"
+            )
+    return "".join(parts)
+
+def _compact_mcp_metrics(data: Dict[str, Any]) -> str:
+    return "\n".join([
+        _compact_table(data["tools"], ["tool", "calls", "cache_hits", "errors", "in_flight", "p50_ms", "p95_ms", "p99_ms", "total_s", "avg_bytes"]),
+        _compact_table(data["api"], ["host", "endpoint", "calls", "errors", "p50_ms", "p99_ms", "total_s"]),
+    ])
+
+async def _hosts(args: Dict[str, Any]) -> ToolResult:
+    """Health-check every configured Docker host"""
+    await asyncio.gather(*(run_blocking(client_manager.check, host) for host in client_manager.hosts))
+    rows = client_manager.status()
+    return ToolOutput({"hosts": rows}, _render_hosts, rows=rows,
+                      columns=["host", "url", "healthy", "latency_ms", "error"])
+
+def _render_hosts(data: Dict[str, Any]) -> str:
+    parts = ["🖥️ **Docker Hosts**\n\n"]
+    for host in data["hosts"]:
+        status_emoji = "🟢" if host["healthy"] else "🔴"
+        parts.append(f"{status_emoji} **{host['host']}** (`{host['url']}`)\n")
+        if host["healthy"]:
+            parts.append(f"   - Ping: {host['latency_ms']}ms\n")
+        else:
+            parts.append(f"   - Error: {host['error']}\n")
+            if host["retry_in"]:
+                parts.append(f"   - Next connection attempt in {host['retry_in']}s\n")
+        parts.append("\n")
+    return "".join(parts)
+
+# Background jobs
+# Tools in JOB_TOOLS accept background=true: the call is answered at once
+# with a job ID while the same dispatch (limits, timeout) runs as a task.
+# Finished results stay in memory for docker_job_result until evicted,
+# oldest first, once the store exceeds MCP_JOB_STORE_BYTES or
+# MCP_JOB_HISTORY jobs. Cancelling stops the task; work already handed to
+# the daemon, such as a pull shared with other callers, may still finish.
+JOB_TOOLS = {
+    "docker_container_logs",
+    "docker_logs_search",
+    "docker_stats_all",
+    "docker_pull_image",
+    "docker_compose_logs",
+    "docker_disk_usage",
+}
+JOB_MAX_RUNNING = int(os.environ.get("MCP_JOB_MAX_RUNNING", "16"))
+JOB_HISTORY = int(os.environ.get("MCP_JOB_HISTORY", "100"))
+JOB_STORE_BYTES = int(os.environ.get("MCP_JOB_STORE_BYTES", str(16 * 1024 * 1024)))
+
+BACKGROUND_PROPERTY = {
+    "type": "boolean",
+    "description": "Run as a background job and return its ID immediately; collect with docker_job_result",
+    "default": False
+}
+
+_current_job: contextvars.ContextVar = contextvars.ContextVar("current_job", default=None)
+
+# Tools that do not talk to a Docker daemon and take no host argument
+HOSTLESS_TOOLS = {"docker_hosts", "docker_mcp_metrics", "docker_job_status", "docker_job_result", "docker_job_cancel"}
+
+HOST_PROPERTY = {
+    "type": "string",
+    "description": f"Docker host to query (default: {DEFAULT_HOST}), or '{ALL_HOSTS}' to query every host; cursors apply per host",
+    "default": DEFAULT_HOST
+}
+
+def _result_size(result: ToolResult) -> int:
+    """Approximate memory held by a stored result"""
+    if isinstance(result, ToolOutput):
+        return len(json.dumps(result.data, default=str))
+    return sum(len(content.text) for content in result)
+
+class Job:
+    """A tool call running, or finished, in the background"""
+    
+    def __init__(self, tool: str, arguments: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.tool = tool
+        self.arguments = {key: value for key, value in arguments.items() if key not in ("background", "format")}
+        self.state = "running"
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.progress: Optional[Dict[str, Any]] = None
+        self.result: Optional[ToolResult] = None
+        self.size = 0
+        self.task: Optional[asyncio.Task] = None
+    
+    def set_progress(self, progress: float, total: Optional[float], message: str) -> None:
+        self.progress = {"progress": progress, "total": total, "message": message}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        finished = self.finished or time.time()
+        return {
+            "job_id": self.id,
+            "tool": self.tool,
+            "arguments": self.arguments,
+            "state": self.state,
+            "created": datetime.fromtimestamp(self.created, timezone.utc).isoformat(),
+            "elapsed": round(finished - self.created, 2),
+            "progress": self.progress,
+            "result_bytes": self.size if self.finished else None,
+        }
+
+class JobManager:
+    """Runs background jobs and keeps a size-bounded store of their results"""
+    
+    def __init__(self):
+        self.running: Dict[str, Job] = {}
+        self.finished: "OrderedDict[str, Job]" = OrderedDict()
+        self.stored_bytes = 0
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.running.get(job_id) or self.finished.get(job_id)
+    
+    def jobs(self) -> List[Job]:
+        return sorted([*self.running.values(), *self.finished.values()], key=lambda job: job.created, reverse=True)
+    
+    def submit(self, tool: str, arguments: Dict[str, Any], work: Awaitable[ToolResult]) -> ToolResult:
+        if len(self.running) >= JOB_MAX_RUNNING:
+            work.close()
+            return [types.TextContent(
+                type="text",
+                text=f"❌ {len(self.running)} jobs already running. Wait for one to finish or cancel one."
+            )]
+        job = Job(tool, arguments)
+        # The task gets its own context so progress is recorded on the job
+        # rather than sent to a request that has already been answered
+        context = contextvars.copy_context()
+        context.run(_current_job.set, job)
+        job.task = asyncio.get_running_loop().create_task(self._run(job, work), context=context)
+        self.running[job.id] = job
+        logger.info(f"Started job {job.id} for {tool}")
+        return ToolOutput(job.to_dict(), _render_job_started)
+    
+    async def _run(self, job: Job, work: Awaitable[ToolResult]) -> None:
+        try:
+            job.result = await work
+            job.state = "failed" if isinstance(job.result, list) else "succeeded"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            job.result = [types.TextContent(type="text", text=f"🛑 Job {job.id} was cancelled")]
+        except Exception as e:
+            job.state = "failed"
+            job.result = [types.TextContent(type="text", text=f"❌ Job {job.id} failed: {str(e)}")]
+        job.finished = time.time()
+        job.size = _result_size(job.result)
+        self.running.pop(job.id, None)
+        self.finished[job.id] = job
+        self.stored_bytes += job.size
+        self._evict()
+        logger.info(f"Job {job.id} {job.state} after {job.finished - job.created:.1f}s")
+    
+    def _evict(self) -> None:
+        while self.finished and (len(self.finished) > JOB_HISTORY or self.stored_bytes > JOB_STORE_BYTES):
+            _, job = self.finished.popitem(last=False)
+            self.stored_bytes -= job.size
+            logger.info(f"Evicted result of job {job.id} ({job.size} bytes)")
+    
+    def cancel(self, job_id: str) -> bool:
+        job = self.running.get(job_id)
+        if job is None or job.task is None:
+            return False
+        return job.task.cancel()
+
+job_manager = JobManager()
+
+def _job_not_found(job_id: str) -> List[types.TextContent]:
+    return [types.TextContent(
+        type="text",
+        text=f"❌ Job '{job_id}' not found. Finished results are evicted oldest first."
+    )]
+
+async def _job_status(args: Dict[str, Any]) -> ToolResult:
+    """Report one background job, or all of them"""
+    job_id = args.get("job_id")
+    if not job_id:
+        rows = [job.to_dict() for job in job_manager.jobs()]
+        data = {"jobs": rows, "stored_bytes": job_manager.stored_bytes, "store_limit": JOB_STORE_BYTES}
+        return ToolOutput(data, _render_jobs, rows=rows,
+                          columns=["job_id", "tool", "state", "elapsed", "result_bytes"])
+    job = job_manager.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return ToolOutput(job.to_dict(), _render_job)
+
+async def _job_result(args: Dict[str, Any]) -> ToolResult:
+    """Return the result of a finished background job"""
+    job = job_manager.get(args["job_id"])
+    if job is None:
+        return _job_not_found(args["job_id"])
+    if job.result is None:
+        return ToolOutput(job.to_dict(), _render_job)
+    return job.result
+
+async def _job_cancel(args: Dict[str, Any]) -> ToolResult:
+    """Cancel a running background job"""
+    job = job_manager.get(args["job_id"])
+    if job is None:
+        return _job_not_found(args["job_id"])
+    if not job_manager.cancel(job.id):
+        return [types.TextContent(type="text", text=f"⚠️ Job {job.id} already {job.state}")]
+    # Let the task observe the cancellation so the reported state is final
+    await asyncio.wait([job.task], timeout=5)
+    return ToolOutput(job.to_dict(), _render_job)
+
+JOB_STATE_EMOJI = {"running": "⏳", "succeeded": "✅", "failed": "❌", "cancelled": "🛑"}
+
+def _render_job_started(data: Dict[str, Any]) -> str:
+    return (
+        f"⏳ **Started job `{data['job_id']}`** ({data['tool']})\n\n"
+        f"Poll with docker_job_status and collect with docker_job_result.\n"
+    )
+
+def _render_job(data: Dict[str, Any]) -> str:
+    parts = [
+        f"{JOB_STATE_EMOJI[data['state']]} **Job `{data['job_id']}`** ({data['tool']})\n\n",
+        f"- State: `{data['state']}`\n",
+        f"- Started: `{data['created']}`\n",
+        f"- Elapsed: {data['elapsed']}s\n",
+    ]
+    if data["progress"]:
+        progress = data["progress"]
+        total = f" of {progress['total']:.0f}" if progress["total"] else ""
+        parts.append(f"- Progress: {progress['progress']:.0f}{total} ({progress['message']})\n")
+    if data["result_bytes"] is not None:
+        parts.append(f"- Result: {data['result_bytes']} bytes, collect with docker_job_result\n")
+    return "".join(parts)
+
+def _render_jobs(data: Dict[str, Any]) -> str:
+    if not data["jobs"]:
+        return "📭 No background jobs."
+    parts = [f"🗂️ **Background Jobs** ({data['stored_bytes']} of {data['store_limit']} result bytes stored)\n\n"]
+    for job in data["jobs"]:
+        parts.append(f"{JOB_STATE_EMOJI[job['state']]} `{job['job_id']}` {job['tool']}: {job['state']}, {job['elapsed']}s\n")
+    return "".join(parts)
+
+TOOL_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[ToolResult]]] = {
+    "docker_list_containers": _list_containers,
+    "docker_container_info": _container_info,
+    "docker_container_logs": _container_logs,
+    "docker_logs_search": _logs_search,
+    "docker_container_stats": _container_stats,
+    "docker_stats_all": _stats_all,
+    "docker_list_images": _list_images,
+    "docker_pull_image": _pull_image,
+    "docker_system_info": _system_info,
+    "docker_disk_usage": _disk_usage,
+    "docker_compose_services": _compose_services,
+    "docker_compose_logs": _compose_logs,
+    "docker_network_list": _network_list,
+    "docker_network_topology": _network_topology,
+    "docker_anomalies": _anomalies,
+    "docker_hosts": _hosts,
+    "docker_mcp_metrics": _mcp_metrics,
+    "docker_job_status": _job_status,
+    "docker_job_result": _job_result,
+    "docker_job_cancel": _job_cancel,
+}
+
+# Schemas are built once at import; every list request returns the same tools
+TOOLS = _tool_definitions()
+TOOL_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    tool.name: {key: schema["default"] for key, schema in tool.inputSchema["properties"].items() if "default" in schema}
+    for tool in TOOLS
+}
+
+@server.list_tools()
+async def handle_list_tools() -> List[Tool]:
+    """List all available Docker tools"""
+    return TOOLS
+
 async def main():
     """Main server entry point"""
-    # Transport setup will be handled by mcpo
-    async with server as ctx:
-        await ctx.request_context.session.send_log_message(
-            level="info",
-            data="🐳 Docker MCP Server started successfully"
-        )
-        
-        # Keep server running
-        await asyncio.Event().wait()
+    # Nothing here talks to a daemon: clients connect on first use, and the
+    # caches and collector fill from their own threads
+    client_manager.start()
+    start_metrics_server()
+    if STATE_CACHE_ENABLED:
+        state_cache.start()
+    if STATS_COLLECTOR_ENABLED:
+        stats_collector.start()
+    if ANOMALY_WATCH_ENABLED:
+        _anomaly_watcher(DEFAULT_HOST)
+    
+    # mcpo talks to the server over stdin/stdout
+    async with stdio_server() as (read_stream, write_stream):
+        logger.info("🐳 Docker MCP Server started successfully")
+        await server.run(read_stream, write_stream, server.create_initialization_options())
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -26,4 +26,4 @@ exec mcpo \
     --port $MCP_PORT \
     --cors \
     --verbose \
-    -- python3 docker_mcp_tools.py
+    -- python3 -m docker_mcp_tools
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The server is a single module next to this directory. Tests never talk to
+# a daemon, so point it at a closed port and keep its background services off
+os.environ["DOCKER_HOST"] = "tcp://127.0.0.1:9"
+os.environ["MCP_METRICS_PORT"] = "0"
+os.environ["MCP_STATE_CACHE"] = "0"
+os.environ["MCP_ANOMALY_WATCH"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,95 @@
+import docker_mcp_tools as tools
+
+
+def _events(*events, start=1000.0):
+    """ContainerEvents fed (event, exit code) pairs one second apart"""
+    container = tools.ContainerEvents("a" * 64)
+    for offset, (event, exit_code) in enumerate(events):
+        container.record(start + offset, event, exit_code)
+    return container
+
+
+def test_manual_restart_counts_once():
+    # `docker restart` emits die, start and restart for one restart
+    container = _events(("die", 0), ("start", None), ("restart", None),
+                        ("die", 0), ("start", None), ("restart", None))
+    summary = container.summary(0, 0)
+
+    assert summary["restarts"] == 2
+    assert summary["kinds"] == []
+
+
+def test_restart_without_a_start_still_counts():
+    summary = _events(("restart", None)).summary(0, 0)
+
+    assert summary["restarts"] == 1
+
+
+def test_restart_policy_loop_is_flagged():
+    container = _events(*[pair for _ in range(3) for pair in (("die", 1), ("start", None))])
+    summary = container.summary(0, 0)
+
+    assert summary["restarts"] == 3
+    assert summary["deaths"] == 3
+    assert summary["last_exit_code"] == 1
+    assert summary["kinds"] == ["restart_loop"]
+
+
+def test_crash_oom_and_health_are_classified():
+    container = _events(("oom", None), ("die", 137))
+    container.record(1010.0, "unhealthy", None)
+    summary = container.summary(0, 0)
+
+    assert summary["kinds"] == ["oom", "unhealthy", "crashed"]
+    assert summary["restarts"] == 0
+    assert summary["health"] == "unhealthy"
+
+
+def test_summary_only_counts_the_window():
+    container = _events(("die", 1), ("start", None), ("die", 1), ("start", None), ("die", 1), ("start", None))
+    summary = container.summary(1002.0, 2)
+
+    assert summary["restarts"] == 2
+    assert summary["kinds"] == ["crashed"]
+    assert summary["total"] == {"die": 3, "start": 3}
+    assert [event["event"] for event in summary["events"]] == ["die", "start"]
+
+
+def test_user_stop_is_not_a_crash():
+    # `docker stop` sends kill, die and stop; SIGTERM exits with 143
+    summary = _events(("kill", None), ("die", 143), ("stop", None)).summary(0, 0)
+
+    assert summary["kinds"] == []
+    assert summary["restarts"] == 0
+    assert summary["deaths"] == 1
+
+
+def test_user_kill_is_not_a_crash():
+    summary = _events(("kill", None), ("die", 137)).summary(0, 0)
+
+    assert summary["kinds"] == []
+
+
+def test_stop_start_cycles_are_not_a_restart_loop():
+    cycle = (("kill", None), ("die", 143), ("stop", None), ("start", None))
+    summary = _events(*cycle * 3).summary(0, 0)
+
+    assert summary["restarts"] == 0
+    assert summary["kinds"] == []
+
+
+def test_docker_restart_counts_once_and_is_not_a_loop():
+    cycle = (("kill", None), ("die", 143), ("stop", None), ("start", None), ("restart", None))
+    summary = _events(*cycle * 3).summary(0, 0)
+
+    assert summary["restarts"] == 3
+    assert summary["kinds"] == []
+
+
+def test_crash_after_a_user_start_is_still_a_crash():
+    container = _events(("kill", None), ("die", 143), ("stop", None), ("start", None),
+                        ("die", 1), ("start", None))
+    summary = container.summary(0, 0)
+
+    assert summary["restarts"] == 1
+    assert summary["kinds"] == ["crashed"]
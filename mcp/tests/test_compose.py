@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+import docker_mcp_tools as tools
+
+
+def _container(name, project, working_dir):
+    return {
+        "Names": [f"/{name}"],
+        "Labels": {
+            tools.COMPOSE_PROJECT_LABEL: project,
+            tools.COMPOSE_SERVICE_LABEL: name.split("-")[1],
+            tools.COMPOSE_WORKING_DIR_LABEL: working_dir,
+        },
+    }
+
+
+@pytest.fixture
+def containers(monkeypatch, tmp_path):
+    shop = tmp_path / "My Shop"
+    blog = tmp_path / "blog"
+    listed = [
+        _container("shop-web-1", "shop", str(shop)),
+        _container("shop-db-1", "shop", str(shop)),
+        # Started from another checkout of the same directory name
+        _container("myshop-web-1", "myshop", "/elsewhere/My Shop"),
+        _container("blog-web-1", "blog", str(blog)),
+    ]
+    monkeypatch.setattr(tools, "_cached_containers", lambda all, filters: listed)
+    return shop, blog
+
+
+def _names(containers):
+    return [container["Names"][0].lstrip("/") for container in containers]
+
+
+def test_explicit_project_must_match(containers):
+    project, found = asyncio.run(tools._compose_containers({"project": "blog"}))
+
+    assert project == "blog"
+    assert _names(found) == ["blog-web-1"]
+    assert asyncio.run(tools._compose_containers({"project": "nope"})) == ("nope", [])
+
+
+def test_project_path_matches_the_working_dir_first(containers):
+    shop, _ = containers
+    project, found = asyncio.run(tools._compose_containers({"project_path": str(shop)}))
+
+    assert project == "shop"
+    assert _names(found) == ["shop-web-1", "shop-db-1"]
+
+
+def test_project_path_falls_back_to_the_derived_project_name(containers, tmp_path):
+    other = tmp_path / "checkout" / "My Shop"
+    project, found = asyncio.run(tools._compose_containers({"project_path": str(other)}))
+
+    assert project == "myshop"
+    assert _names(found) == ["myshop-web-1"]
+    assert asyncio.run(tools._compose_containers({"project_path": str(tmp_path / "none")})) == ("none", [])
+
+
+def test_default_path_without_a_match_returns_every_project(containers, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    project, found = asyncio.run(tools._compose_containers({}))
+
+    assert project is None
+    assert len(found) == 4
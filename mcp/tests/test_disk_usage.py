@@ -0,0 +1,53 @@
+import docker_mcp_tools as tools
+
+
+def _df(images):
+    return {
+        "LayersSize": 150,
+        "Images": images,
+        "Containers": [
+            {"Id": "c" * 64, "Names": ["/web"], "SizeRw": 10, "State": "running"},
+            {"Id": "d" * 64, "Names": ["/job"], "SizeRw": 5, "State": "exited"},
+        ],
+        "Volumes": [
+            {"Name": "data", "UsageData": {"Size": 40, "RefCount": 1}},
+            # Size is -1 when the daemon did not measure the volume
+            {"Name": "scratch", "UsageData": {"Size": -1, "RefCount": 0}},
+        ],
+        "BuildCache": [
+            {"ID": "r1", "Type": "regular", "Size": 20, "InUse": False, "Shared": False},
+            {"ID": "r2", "Type": "regular", "Size": 7, "InUse": False, "Shared": True},
+        ],
+    }
+
+
+def _image(name, size, shared, containers):
+    return {"Id": f"sha256:{name * 64}"[:71], "RepoTags": [f"{name}:latest"], "Size": size,
+            "SharedSize": shared, "Containers": containers}
+
+
+def test_categories_split_unique_and_shared_image_bytes():
+    categories, layers, items = tools._analyze_df(_df([_image("a", 100, 30, 1), _image("b", 80, 30, 0)]))
+
+    assert layers == {"total": 150, "unique": 120, "shared": 30}
+    # Only b's own bytes can go; the shared layers are held by a
+    assert categories["images"] == {"count": 2, "active": 1, "size": 150, "reclaimable": 50}
+    assert categories["containers"] == {"count": 2, "active": 1, "size": 15, "reclaimable": 5}
+    assert categories["volumes"] == {"count": 2, "active": 1, "size": 40, "reclaimable": 0}
+    assert categories["build_cache"] == {"count": 1, "active": 0, "size": 20, "reclaimable": 20}
+    assert {item["name"]: item["unique"] for item in items if item["category"] == "images"} == {
+        "a:latest": 70, "b:latest": 50,
+    }
+
+
+def test_shared_layers_are_reclaimable_when_no_image_in_use_shares():
+    categories, _, _ = tools._analyze_df(_df([_image("a", 70, 0, 1), _image("b", 80, 30, 0)]))
+
+    assert categories["images"]["reclaimable"] == 80
+
+
+def test_unknown_shared_size_counts_the_whole_image():
+    _, layers, items = tools._analyze_df(_df([_image("a", 100, -1, 0)]))
+
+    assert items[0]["unique"] == 100
+    assert layers["unique"] == 100
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+import docker_mcp_tools as tools
+
+
+@pytest.fixture(autouse=True)
+def fresh_semaphores(monkeypatch):
+    # Semaphores bind to the loop that first uses them; each test runs its own
+    monkeypatch.setattr(tools, "_tool_semaphores", {})
+
+
+def test_timeout_is_reported_as_text(monkeypatch):
+    monkeypatch.setitem(tools.TOOL_TIMEOUTS, "slow_tool", 0.05)
+
+    async def handler(arguments):
+        await asyncio.sleep(5)
+
+    result = asyncio.run(tools._dispatch("slow_tool", handler, {}))
+
+    assert result[0].text.startswith("⏱️ slow_tool timed out")
+
+
+def test_concurrency_is_limited_per_tool(monkeypatch):
+    monkeypatch.setitem(tools.TOOL_CONCURRENCY, "limited_tool", 2)
+    running = 0
+    peak = 0
+
+    async def handler(arguments):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return tools.ToolOutput({}, lambda data: "")
+
+    async def calls():
+        return await asyncio.gather(*(tools._dispatch("limited_tool", handler, {}) for _ in range(6)))
+
+    results = asyncio.run(calls())
+
+    assert peak == 2
+    assert all(isinstance(result, tools.ToolOutput) for result in results)
+
+
+def test_handler_errors_are_reported_as_text():
+    async def handler(arguments):
+        raise RuntimeError("boom")
+
+    result = asyncio.run(tools._dispatch("failing_tool", handler, {}))
+
+    assert "boom" in result[0].text
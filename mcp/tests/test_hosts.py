@@ -0,0 +1,87 @@
+import pytest
+
+import docker_mcp_tools as tools
+
+
+def test_parse_hosts_always_includes_the_local_daemon():
+    assert tools._parse_hosts("") == {"local": None}
+    assert tools._parse_hosts(" build = tcp://10.0.0.5:2376 , edge=ssh://me@edge,") == {
+        "local": None,
+        "build": "tcp://10.0.0.5:2376",
+        "edge": "ssh://me@edge",
+    }
+
+
+@pytest.mark.parametrize("spec", ["build", "=tcp://10.0.0.5:2376", "build=", "all=tcp://10.0.0.5:2376"])
+def test_parse_hosts_rejects_bad_entries(spec):
+    with pytest.raises(ValueError):
+        tools._parse_hosts(spec)
+
+
+class FlakyConnect:
+    """Fails a number of times, then hands out a client"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, host):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection refused")
+        return object()
+
+
+def _expire(manager, host):
+    manager._failures[host]["retry_at"] = 0
+
+
+def test_unreachable_host_backs_off_exponentially(monkeypatch):
+    manager = tools.ClientManager({"local": None, "build": "tcp://10.0.0.5:2376"})
+    connect = FlakyConnect(failures=3)
+    monkeypatch.setattr(manager, "_connect", connect)
+
+    with pytest.raises(tools.DockerHostError, match="unavailable: connection refused"):
+        manager.client("build")
+    # Within the backoff window the host is not dialled again
+    with pytest.raises(tools.DockerHostError, match="retrying in"):
+        manager.client("build")
+    assert connect.calls == 1
+
+    delays = []
+    for _ in range(2):
+        _expire(manager, "build")
+        with pytest.raises(tools.DockerHostError):
+            manager.client("build")
+        failure = manager._failures["build"]
+        delays.append(failure["retry_at"] - tools.time.monotonic())
+    assert manager._failures["build"]["attempts"] == 3
+    assert delays[0] == pytest.approx(2 * tools.HOST_BACKOFF_BASE, abs=0.5)
+    assert delays[1] == pytest.approx(4 * tools.HOST_BACKOFF_BASE, abs=0.5)
+
+    _expire(manager, "build")
+    client = manager.client("build")
+    assert manager.client("build") is client
+    assert manager.connected("build")
+    assert "build" not in manager._failures
+    assert connect.calls == 4
+
+
+def test_backoff_is_capped(monkeypatch):
+    monkeypatch.setattr(tools, "HOST_BACKOFF_MAX", 5.0)
+    manager = tools.ClientManager({"local": None})
+    monkeypatch.setattr(manager, "_connect", FlakyConnect(failures=10))
+    manager._failures["local"] = {"attempts": 8, "retry_at": 0, "error": "connection refused"}
+
+    with pytest.raises(tools.DockerHostError):
+        manager.client()
+
+    assert 4.0 < manager._failures["local"]["retry_at"] - tools.time.monotonic() <= 5.0
+
+
+def test_unknown_host_is_an_error():
+    manager = tools.ClientManager({"local": None})
+
+    with pytest.raises(tools.DockerHostError, match="Unknown Docker host 'nope'"):
+        manager.client("nope")
+    assert not manager.connected("nope")
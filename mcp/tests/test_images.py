@@ -0,0 +1,72 @@
+import docker_mcp_tools as tools
+
+BASE = "sha256:" + "b" * 64
+APP = "sha256:" + "c" * 64
+OTHER = "sha256:" + "d" * 64
+
+
+def test_image_reference_defaults_the_tag():
+    assert tools._image_reference("nginx", None) == ("nginx", "latest", "nginx:latest")
+    assert tools._image_reference("nginx", "1.25") == ("nginx", "1.25", "nginx:1.25")
+    assert tools._image_reference("nginx:alpine", "1.25") == ("nginx", "alpine", "nginx:alpine")
+
+
+def test_image_reference_keeps_registry_ports():
+    assert tools._image_reference("localhost:5000/app", None) == (
+        "localhost:5000/app", "latest", "localhost:5000/app:latest",
+    )
+    assert tools._image_reference("localhost:5000/team/app:v2", None) == (
+        "localhost:5000/team/app", "v2", "localhost:5000/team/app:v2",
+    )
+
+
+def test_image_reference_pins_digests_with_an_at_sign():
+    digest = "sha256:" + "a" * 64
+    assert tools._image_reference(f"app@{digest}", None) == ("app", digest, f"app@{digest}")
+
+
+def _history(*sizes):
+    # The daemon lists history newest first
+    return [{"Size": size} for size in reversed(sizes)]
+
+
+def test_layer_sizes_skip_the_empty_layer_and_metadata_steps():
+    layers = [BASE, tools.EMPTY_LAYER, APP]
+    # FROM, ENV, WORKDIR (empty layer), COPY, CMD
+    sizes = tools._layer_sizes(layers, _history(100, 0, 0, 25, 0))
+
+    assert sizes == {BASE: 100, APP: 25}
+
+
+def test_layer_sizes_fold_squashed_history():
+    assert tools._layer_sizes([BASE], _history(10, 20, 30)) == {BASE: 60}
+
+
+def test_index_sizes_do_not_depend_on_load_order():
+    def report(order):
+        index = tools.LayerIndex()
+        images = {
+            "one": ([BASE, APP], {BASE: 100, APP: 10}),
+            # History pairing can disagree about a shared layer's size
+            "two": ([BASE, OTHER], {BASE: 90, OTHER: 20}),
+        }
+        for image_id in order:
+            index._add(image_id, *images[image_id])
+        return index.report({}), index.usage("one"), index.usage("two")
+
+    assert report(["one", "two"]) == report(["two", "one"])
+    summary, one, two = report(["two", "one"])
+    assert summary["actual_size"] == 130
+    assert summary["shared_size"] == 100
+    assert one == {"unique_size": 10, "shared_size": 100, "layers": 2, "shared_layers": 1}
+    assert two["unique_size"] == 20
+
+
+def test_removing_an_image_forgets_its_layers():
+    index = tools.LayerIndex()
+    index._add("one", [BASE, APP], {BASE: 100, APP: 10})
+    index._add("two", [BASE, OTHER], {BASE: 100, OTHER: 20})
+    index._remove("two")
+
+    assert index.usage("one") == {"unique_size": 110, "shared_size": 0, "layers": 2, "shared_layers": 0}
+    assert OTHER not in index.owners
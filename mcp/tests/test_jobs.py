@@ -0,0 +1,78 @@
+import asyncio
+
+import docker_mcp_tools as tools
+
+
+def _output(size):
+    return tools.ToolOutput({"data": "x" * size}, lambda data: "")
+
+
+async def _finished(manager, *results):
+    """Submit one job per result and wait for all of them"""
+    async def work(result):
+        return result
+
+    jobs = [manager.submit("docker_disk_usage", {"background": True}, work(result)).data["job_id"]
+            for result in results]
+    await asyncio.gather(*(manager.get(job_id).task for job_id in jobs))
+    return jobs
+
+
+def test_results_are_evicted_oldest_first_past_the_history_limit(monkeypatch):
+    monkeypatch.setattr(tools, "JOB_HISTORY", 2)
+    manager = tools.JobManager()
+    first, second, third = asyncio.run(_finished(manager, _output(1), _output(1), _output(1)))
+
+    assert manager.get(first) is None
+    assert list(manager.finished) == [second, third]
+    assert manager.stored_bytes == 2 * tools._result_size(_output(1))
+
+
+def test_results_are_evicted_past_the_byte_budget(monkeypatch):
+    size = tools._result_size(_output(100))
+    monkeypatch.setattr(tools, "JOB_STORE_BYTES", size * 2)
+    manager = tools.JobManager()
+    first, second, third = asyncio.run(_finished(manager, _output(100), _output(100), _output(100)))
+
+    assert list(manager.finished) == [second, third]
+    assert manager.stored_bytes == size * 2
+    assert manager.get(second).state == "succeeded"
+
+
+def test_cancel_stops_a_running_job():
+    manager = tools.JobManager()
+
+    async def scenario():
+        started = manager.submit("docker_container_logs", {"container_id": "c1"}, asyncio.sleep(30))
+        job = manager.get(started.data["job_id"])
+        await asyncio.sleep(0)
+        assert manager.cancel(job.id)
+        await job.task
+        # A finished job cannot be cancelled again
+        assert not manager.cancel(job.id)
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job.state == "cancelled"
+    assert "cancelled" in job.result[0].text
+    assert not manager.running
+    assert manager.get(job.id) is job
+
+
+def test_submit_refuses_work_past_the_running_limit(monkeypatch):
+    monkeypatch.setattr(tools, "JOB_MAX_RUNNING", 1)
+    manager = tools.JobManager()
+
+    async def scenario():
+        manager.submit("docker_container_logs", {}, asyncio.sleep(30))
+        refused = manager.submit("docker_container_logs", {}, asyncio.sleep(30))
+        await asyncio.sleep(0)
+        for job in list(manager.running.values()):
+            manager.cancel(job.id)
+            await asyncio.wait([job.task])
+        return refused
+
+    refused = asyncio.run(scenario())
+
+    assert refused[0].text.startswith("❌ 1 jobs already running")
@@ -0,0 +1,68 @@
+import json
+
+import docker_mcp_tools as tools
+
+FIELDS = ["name", "size", "state"]
+DEFAULT_FIELDS = ["name", "size"]
+
+
+def _rows(count):
+    # Sizes repeat, so pages must stay stable across equal sort keys
+    return [{"name": f"c{i:03d}", "size": i % 4, "state": "running" if i % 2 else "exited"} for i in range(count)]
+
+
+def _page(rows, **args):
+    result = tools._listing_page("items", list(rows), args, lambda data: "", FIELDS, DEFAULT_FIELDS, "name")
+    if isinstance(result, list):
+        return result[0].text
+    return json.loads(result.render("json"))
+
+
+def test_cursors_walk_every_row_once():
+    rows = _rows(23)
+    seen = []
+    page = _page(rows, limit=5, sort_by="-size")
+    while True:
+        seen.extend(row["name"] for row in page["items"])
+        if not page["next_cursor"]:
+            break
+        page = _page(rows, limit=5, cursor=page["next_cursor"])
+
+    assert sorted(seen) == sorted(row["name"] for row in rows)
+    assert len(seen) == len(set(seen))
+    assert page["total"] == 23
+
+
+def test_cursor_keeps_the_sort_of_the_first_page():
+    rows = _rows(10)
+    first = _page(rows, limit=4, sort_by="-size")
+    second = _page(rows, limit=4, cursor=first["next_cursor"], sort_by="name")
+
+    assert second["sort_by"] == "-size"
+    assert second["offset"] == 4
+    assert [row["size"] for row in first["items"] + second["items"]] == [3, 3, 2, 2, 1, 1, 1, 0]
+
+
+def test_page_projects_fields_with_identity_first():
+    page = _page(_rows(3), fields=["state"])
+
+    assert list(page["items"][0]) == ["name", "state"]
+    assert page["next_cursor"] is None
+
+
+def test_invalid_arguments_are_reported():
+    assert _page(_rows(3), cursor="not-a-cursor").startswith("❌ Invalid cursor")
+    assert _page(_rows(3), sort_by="colour").startswith("❌ Cannot sort by 'colour'")
+    assert _page(_rows(3), fields=["colour"]).startswith("❌ Unknown field(s) colour")
+
+
+def test_oversized_page_is_cut_and_continues_from_the_cut(monkeypatch):
+    monkeypatch.setattr(tools, "OUTPUT_MAX_BYTES", 400)
+    rows = [{"name": f"c{i:02d}", "size": "x" * 60, "state": "running"} for i in range(20)]
+    page = _page(rows, limit=20)
+    shown = len(page["items"])
+
+    assert 0 < shown < 20
+    assert tools._decode_cursor(page["next_cursor"])["offset"] == shown
+    following = _page(rows, limit=20, cursor=page["next_cursor"])
+    assert following["items"][0]["name"] == f"c{shown:02d}"
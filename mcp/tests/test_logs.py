@@ -0,0 +1,193 @@
+import asyncio
+import threading
+
+import pytest
+
+import docker_mcp_tools as tools
+
+
+class FakeLogStream:
+    """Stands in for the daemon's log stream: byte chunks plus close()"""
+
+    def __init__(self, chunks, block=False):
+        self.chunks = list(chunks)
+        self.block = block
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        yield from self.chunks
+        if self.block:
+            # A followed stream only ends when it is closed
+            self.closed.wait(5)
+
+    def close(self):
+        self.closed.set()
+
+
+def _lines(*messages, start=0):
+    return [f"2024-01-01T00:00:{start + i:02d}.000000000Z {message}" for i, message in enumerate(messages)]
+
+
+def _stream_of(lines):
+    return FakeLogStream(["".join(line + "\n" for line in lines).encode()])
+
+
+@pytest.fixture
+def streams(monkeypatch):
+    """Serve queued FakeLogStreams and record the arguments they were opened with"""
+    queued = []
+    opened = []
+
+    def open_log_stream(container_id, **kwargs):
+        opened.append(kwargs)
+        return queued.pop(0)
+
+    monkeypatch.setattr(tools, "_open_log_stream", open_log_stream)
+    return queued, opened
+
+
+def test_read_logs_closes_the_stream_when_abandoned(streams):
+    queued, _ = streams
+    stream = FakeLogStream([], block=True)
+    queued.append(stream)
+    matcher = tools._compile_matcher("x", False, False)
+
+    async def search():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(tools._read_logs(tools._search_logs, "c1", matcher, 0, 10), 0.1)
+
+    asyncio.run(search())
+    assert stream.closed.wait(1)
+
+
+def test_collect_logs_keeps_the_newest_lines_within_max_bytes(streams):
+    queued, _ = streams
+    lines = _lines(*(f"line {i}" for i in range(10)))
+    queued.append(_stream_of(lines))
+    size = len(lines[0]) + 1
+    collected = tools._collect_logs("c1", size * 3)
+
+    assert collected["lines"] == lines[-3:]
+    assert collected["total"] == 10
+    assert collected["dropped"] == 7
+
+
+def test_follow_forwards_only_lines_after_the_tail(streams):
+    queued, opened = streams
+    tail = _lines("old 1", "old 2")
+    # The follow stream resumes at the tail's last timestamp, so it repeats it
+    queued.append(_stream_of(tail))
+    queued.append(_stream_of(tail[-1:] + _lines("new 1", "new 2", start=5)))
+    forwarded = []
+    collected = tools._collect_logs("c1", 65536, follow_seconds=5, on_lines=forwarded.extend, tail=2)
+
+    assert [line.split(" ", 1)[1] for line in forwarded] == ["new 1", "new 2"]
+    assert [line.split(" ", 1)[1] for line in collected["lines"]] == ["old 1", "old 2", "new 1", "new 2"]
+    assert opened[1]["follow"] is True
+    assert opened[1]["since"] == pytest.approx(tools._rfc3339_time(tail[-1].split(" ", 1)[0]))
+
+
+def test_follow_without_a_tail_asks_only_for_new_lines(streams):
+    queued, opened = streams
+    queued.append(_stream_of([]))
+    queued.append(_stream_of(_lines("new")))
+    forwarded = []
+    tools._collect_logs("c1", 65536, follow_seconds=5, on_lines=forwarded.extend, tail=10)
+
+    assert len(forwarded) == 1
+    assert opened[1]["tail"] == 0
+    assert "since" not in opened[1]
+
+
+def test_search_keeps_context_and_separates_groups(streams):
+    queued, _ = streams
+    queued.append(_stream_of(_lines("a", "b", "ERROR x", "c", "d", "e", "f", "ERROR y", "g")))
+    result = tools._search_logs("c1", tools._compile_matcher("ERROR", False, False), 1, 10)
+
+    assert result["matches"] == 2
+    assert result["scanned"] == 9
+    # Matches are marked "> ", context lines indented
+    assert [line[2:].split(" ", 1)[1] if line != "--" else line for line in result["output"]] == [
+        "b", "ERROR x", "c", "--", "f", "ERROR y", "g",
+    ]
+    assert result["output"][1].startswith("> ")
+    assert result["first"] == "2024-01-01T00:00:02.000000000Z"
+    assert result["last"] == "2024-01-01T00:00:07.000000000Z"
+
+
+def test_search_counts_matches_beyond_max_matches(streams):
+    queued, _ = streams
+    queued.append(_stream_of(_lines(*(f"ERROR {i}" for i in range(5)))))
+    result = tools._search_logs("c1", tools._compile_matcher("error", False, True), 0, 2)
+
+    assert result["matches"] == 5
+    assert [line for line in result["output"] if line.startswith("> ")] == [
+        "> 2024-01-01T00:00:00.000000000Z ERROR 0",
+        "> 2024-01-01T00:00:01.000000000Z ERROR 1",
+    ]
+    assert result["last"] == "2024-01-01T00:00:04.000000000Z"
+
+
+def test_search_decodes_utf8_split_across_chunks(streams):
+    queued, _ = streams
+    data = "2024-01-01T00:00:00.000000000Z café crashed\n".encode()
+    split = data.index("é".encode()) + 1
+    stream = FakeLogStream([data[:split], data[split:]])
+    queued.append(stream)
+    result = tools._search_logs("c1", tools._compile_matcher("café", False, False), 0, 10)
+
+    assert result["matches"] == 1
+    assert stream.closed.is_set()
+
+
+def test_summarizer_groups_templates_and_errors():
+    summarizer = tools._summarize_log_lines(_lines(
+        "GET /health 200 3ms id=1",
+        "GET /health 200 12ms id=2",
+        "ERROR request 7 failed code=500",
+        "GET /health 200 1ms id=3",
+        "ERROR request 9 failed code=502",
+    ))
+    summary = summarizer.to_dict()
+
+    assert summary["lines"] == 5
+    assert summary["template_count"] == 2
+    assert summary["templates"][0]["count"] == 3
+    assert summary["templates"][0]["sample"].endswith("id=1")
+    assert len(summary["errors"]) == 1
+    assert summary["errors"][0]["count"] == 2
+    assert summary["errors"][0]["samples"] == ["ERROR request 7 failed code=500", "ERROR request 9 failed code=502"]
+
+
+def test_summarizer_counts_lines_beyond_the_template_limit():
+    summarizer = tools.LogSummarizer(max_templates=2, max_errors=1)
+    for line in _lines("alpha", "beta", "gamma", "alpha", "ERROR one", "FATAL two"):
+        summarizer.add(line)
+    summary = summarizer.to_dict()
+
+    assert summary["lines"] == 6
+    assert summary["template_count"] == 2
+    assert summary["untemplated_lines"] == 3
+    assert len(summary["errors"]) == 1
+    assert summary["untemplated_errors"] == 1
+
+
+def test_summarizer_merge_matches_a_single_pass():
+    first = _lines("GET /a 200", "ERROR boom 1", "GET /b 200")
+    second = _lines("GET /c 404", "ERROR boom 2", start=10)
+    merged = tools._summarize_log_lines(first)
+    merged.merge(tools._summarize_log_lines(second))
+
+    assert merged.to_dict() == tools._summarize_log_lines(first + second).to_dict()
+
+
+def test_summarizer_merge_respects_caps():
+    merged = tools.LogSummarizer(max_templates=1, max_errors=1)
+    merged.merge(tools._summarize_log_lines(_lines("alpha", "ERROR one")))
+    merged.merge(tools._summarize_log_lines(_lines("beta", "FATAL two")))
+    summary = merged.to_dict()
+
+    assert summary["lines"] == 4
+    assert summary["template_count"] == 1
+    assert summary["untemplated_lines"] == 3
+    assert summary["untemplated_errors"] == 1
@@ -0,0 +1,40 @@
+import pytest
+
+import docker_mcp_tools as tools
+
+
+@pytest.mark.parametrize("path, endpoint", [
+    ("/v1.43/containers/json?all=1", "/containers/json"),
+    ("/v1.43/containers/3f4e1a2b/json", "/containers/{id}/json"),
+    ("/v1.43/containers/web/logs?tail=100&timestamps=1", "/containers/{id}/logs"),
+    ("/v1.43/containers/create?name=web", "/containers/create"),
+    ("/v1.43/images/json", "/images/json"),
+    ("/v1.43/images/nginx/json", "/images/{name}/json"),
+    ("/v1.43/images/localhost:5000/team/app:v2/history", "/images/{name}/history"),
+    ("/v1.43/images/sha256:abcd", "/images/{name}"),
+    ("/_ping", "/_ping"),
+])
+def test_api_endpoint_templates_ids_and_image_names(path, endpoint):
+    assert tools._api_endpoint(path) == endpoint
+
+
+def test_quantile_interpolates_within_the_bucket():
+    histogram = tools.Histogram((0.1, 0.5, 1.0))
+    for value in (0.05, 0.2, 0.3, 0.5):
+        histogram.observe(value)
+
+    # A value on a bound belongs to that bound's bucket
+    assert histogram.counts == [1, 3, 0, 0]
+    assert histogram.quantile(0.25) == pytest.approx(0.1)
+    assert histogram.quantile(0.5) == pytest.approx(0.1 + 0.4 / 3)
+    assert histogram.quantile(1.0) == pytest.approx(0.5)
+
+
+def test_quantile_of_an_empty_or_overflowing_histogram():
+    histogram = tools.Histogram((0.1, 0.5, 1.0))
+    assert histogram.quantile(0.5) is None
+
+    histogram.observe(30.0)
+    # Nothing is known above the last bound, so it is the best estimate
+    assert histogram.quantile(0.99) == 1.0
+    assert histogram.sum == 30.0
@@ -0,0 +1,54 @@
+import json
+
+import docker_mcp_tools as tools
+
+
+def _markdown(data):
+    return f"**{data['name']}**"
+
+
+def test_json_is_compact_and_markdown_uses_the_renderer():
+    output = tools.ToolOutput({"name": "web", "ports": [80, 443]}, _markdown)
+
+    assert output.render("json") == '{"name":"web","ports":[80,443]}'
+    assert json.loads(output.render("json")) == output.data
+    assert output.render("markdown") == "**web**"
+
+
+def test_compact_rows_render_as_a_tab_separated_table():
+    rows = [
+        {"name": "web", "cpu": 12.5, "ports": ["80", "443"], "note": "a\tb"},
+        {"name": "db", "cpu": 3.0, "ports": [], "note": None},
+    ]
+    output = tools.ToolOutput({"rows": rows}, _markdown, rows=rows, columns=["name", "cpu", "ports", "note"])
+
+    assert output.render("compact").splitlines() == [
+        "name\tcpu\tports\tnote",
+        "web\t12.5\t80,443\ta b",
+        "db\t3\t\t-",
+    ]
+    assert tools.ToolOutput({}, _markdown, rows=[]).render("compact") == "(none)"
+
+
+def test_compact_without_rows_flattens_to_key_value_lines():
+    data = {"name": "web", "state": {"running": True, "exit_code": None}, "mounts": [{"source": "/data"}]}
+    output = tools.ToolOutput(data, _markdown)
+
+    assert output.render("compact").splitlines() == [
+        "name=web",
+        "state.running=True",
+        "state.exit_code=-",
+        "mounts[0].source=/data",
+    ]
+
+
+def test_compact_renderer_and_tool_views_are_used_when_given():
+    output = tools.ToolOutput(
+        {"name": "web"}, _markdown, rows=[{"name": "web"}],
+        compact=lambda data: f"name {data['name']}",
+        views={"mermaid": lambda data: f"graph LR\n  {data['name']}"},
+    )
+
+    assert output.render("compact") == "name web"
+    assert output.render("mermaid") == "graph LR\n  web"
+    assert output.render("json") == '{"name":"web"}'
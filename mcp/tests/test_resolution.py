@@ -0,0 +1,50 @@
+import docker_mcp_tools as tools
+
+WEB = "a1b2" + "0" * 60
+DB = "a1c3" + "0" * 60
+# A container named like the start of another's ID
+TRICKY = "f00d" + "0" * 60
+
+CONTAINERS = [(WEB, ["web"]), (DB, ["db"]), (TRICKY, ["a1b2"])]
+
+
+def test_full_id_then_exact_name_then_unique_prefix():
+    assert tools._resolve_reference(DB, CONTAINERS) == DB
+    assert tools._resolve_reference("web", CONTAINERS) == WEB
+    assert tools._resolve_reference("a1c", CONTAINERS) == DB
+
+
+def test_exact_name_wins_over_an_id_prefix():
+    assert tools._resolve_reference("a1b2", CONTAINERS) == TRICKY
+
+
+def test_ambiguous_or_unknown_prefix_is_a_miss():
+    assert tools._resolve_reference("a1", CONTAINERS) is None
+    assert tools._resolve_reference("zz", CONTAINERS) is None
+
+
+def test_state_cache_resolves_like_the_daemon():
+    cache = tools.StateCache()
+    cache._containers = {
+        container_id: {"Id": container_id, "Names": [f"/{name}" for name in names]}
+        for container_id, names in CONTAINERS
+    }
+
+    assert cache.resolve_container(WEB) == WEB
+    assert cache.resolve_container("db") == DB
+    assert cache.resolve_container("a1b2") == TRICKY
+    assert cache.resolve_container("a1") is None
+
+
+
+def test_network_graph_resolves_names_and_id_prefixes():
+    graph = tools.NetworkGraph(
+        [{"Id": container_id, "Names": [f"/{names[0]}"]} for container_id, names in CONTAINERS],
+        [],
+    )
+
+    assert graph.resolve("web") == "web"
+    assert graph.resolve(DB) == "db"
+    assert graph.resolve("a1c") == "db"
+    assert graph.resolve("a1b2") == "a1b2"
+    assert graph.resolve("a1") is None
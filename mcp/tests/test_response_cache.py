@@ -0,0 +1,137 @@
+import asyncio
+
+import docker_mcp_tools as tools
+
+TOOL = "docker_list_images"
+
+
+class Counter:
+    """A tool run that counts its calls and can be held open"""
+
+    def __init__(self, result=None):
+        self.calls = 0
+        self.release = None
+        self.result = result
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.result is not None:
+            return self.result
+        return tools.ToolOutput({"call": self.calls}, lambda data: "")
+
+
+def _fetch(cache, run, host="local", **arguments):
+    return cache.fetch(TOOL, host, arguments, run)
+
+
+def test_results_are_reused_until_their_ttl_expires():
+    cache = tools.ResponseCache()
+    run = Counter()
+
+    async def scenario():
+        first = await _fetch(cache, run, format="json")
+        # Rendering arguments do not change the key
+        assert await _fetch(cache, run, format="compact") is first
+        # Age the entry past the tool's TTL
+        key, (stored, generation, result) = next(iter(cache.entries.items()))
+        cache.entries[key] = (stored - tools.RESPONSE_CACHE_TTLS[TOOL], generation, result)
+        return first, await _fetch(cache, run)
+
+    first, second = asyncio.run(scenario())
+
+    assert run.calls == 2
+    assert second.data == {"call": 2}
+
+
+def test_fresh_skips_the_lookup_but_refreshes_the_entry():
+    cache = tools.ResponseCache()
+    run = Counter()
+
+    async def scenario():
+        await _fetch(cache, run)
+        refreshed = await _fetch(cache, run, fresh=True)
+        return refreshed, await _fetch(cache, run)
+
+    refreshed, cached = asyncio.run(scenario())
+
+    assert run.calls == 2
+    assert cached is refreshed
+
+
+def test_concurrent_misses_share_one_call():
+    cache = tools.ResponseCache()
+    run = Counter()
+
+    async def scenario():
+        run.release = asyncio.Event()
+        calls = [asyncio.ensure_future(_fetch(cache, run)) for _ in range(5)]
+        await asyncio.sleep(0)
+        run.release.set()
+        return await asyncio.gather(*calls)
+
+    results = asyncio.run(scenario())
+
+    assert run.calls == 1
+    assert all(result is results[0] for result in results)
+    assert not cache.inflight
+
+
+def test_errors_are_not_cached():
+    cache = tools.ResponseCache()
+    run = Counter(result=[tools.types.TextContent(type="text", text="❌ daemon unavailable")])
+
+    async def scenario():
+        await _fetch(cache, run)
+        await _fetch(cache, run)
+
+    asyncio.run(scenario())
+
+    assert run.calls == 2
+    assert not cache.entries
+
+
+def test_state_changes_expire_entries(monkeypatch):
+    monkeypatch.setattr(tools.state_cache, "ready", True)
+    monkeypatch.setattr(tools.state_cache, "generation", 1)
+    cache = tools.ResponseCache()
+    run = Counter()
+
+    async def scenario():
+        await _fetch(cache, run)
+        await _fetch(cache, run)
+        tools.state_cache.generation += 1
+        await _fetch(cache, run)
+
+    asyncio.run(scenario())
+
+    assert run.calls == 2
+
+
+def test_invalidate_drops_the_host_and_fan_out_entries_of_the_given_tools():
+    cache = tools.ResponseCache()
+
+    async def scenario():
+        for host in ("local", "build", "all"):
+            await _fetch(cache, Counter(), host=host)
+        await cache.fetch("docker_list_containers", "local", {}, Counter())
+
+    asyncio.run(scenario())
+    cache.invalidate("local", (TOOL,))
+
+    assert sorted((host, name) for host, name, _ in cache.entries) == [
+        ("build", TOOL), ("local", "docker_list_containers"),
+    ]
+
+
+def test_the_oldest_entry_is_evicted_past_the_size_limit():
+    cache = tools.ResponseCache(size=2)
+
+    async def scenario():
+        for name in ("app1", "app2", "app3"):
+            await _fetch(cache, Counter(), name=name)
+
+    asyncio.run(scenario())
+
+    assert list(cache.entries) == [tools._cache_key(TOOL, "local", {"name": name}) for name in ("app2", "app3")]
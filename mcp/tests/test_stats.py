@@ -0,0 +1,84 @@
+import pytest
+
+import docker_mcp_tools as tools
+
+ZERO_TIME = "0001-01-01T00:00:00Z"
+
+
+def _payload(read, cpu, system, rx=0, blk_read=0, preread=ZERO_TIME, precpu=0, presystem=0):
+    return {
+        "read": read,
+        "preread": preread,
+        "cpu_stats": {"cpu_usage": {"total_usage": cpu}, "system_cpu_usage": system},
+        "precpu_stats": {"cpu_usage": {"total_usage": precpu}, "system_cpu_usage": presystem},
+        "memory_stats": {"usage": 256, "limit": 1024},
+        "networks": {"eth0": {"rx_bytes": rx, "tx_bytes": rx // 2}, "eth1": {"rx_bytes": rx, "tx_bytes": 0}},
+        "blkio_stats": {"io_service_bytes_recursive": [
+            {"op": "Read", "value": blk_read},
+            {"op": "Write", "value": 10},
+        ]},
+    }
+
+
+def test_elapsed_between_two_reads_keeps_nanoseconds():
+    earlier = _payload("2024-01-01T00:00:00.250000000Z", 0, 0)
+    later = _payload("2024-01-01T00:00:01.750000000Z", 0, 0)
+
+    assert tools._stats_elapsed(later, earlier) == pytest.approx(1.5)
+    assert tools._stats_elapsed(earlier, later) is None
+
+
+def test_elapsed_of_one_payload_uses_its_preread():
+    sample = _payload("2024-01-01T00:00:02Z", 0, 0, preread="2024-01-01T00:00:01Z")
+
+    assert tools._stats_elapsed(sample) == pytest.approx(1.0)
+    # A one-shot sample has no preread: Go's zero time
+    assert tools._stats_elapsed(_payload("2024-01-01T00:00:02Z", 0, 0)) is None
+
+
+def test_single_payload_measures_cpu_against_precpu():
+    sample = _payload("2024-01-01T00:00:02Z", cpu=300, system=2000, rx=1000, precpu=100, presystem=1000)
+    stats = tools._compute_stats(sample)
+
+    assert stats["cpu_percent"] == pytest.approx(20.0)
+    assert stats["memory_percent"] == pytest.approx(25.0)
+    assert stats["net_rx"] == 2000
+    assert "net_rx_rate" not in stats
+
+
+def test_rates_use_the_time_between_reads():
+    earlier = _payload("2024-01-01T00:00:00Z", cpu=100, system=1000, rx=1000, blk_read=0)
+    later = _payload("2024-01-01T00:00:02Z", cpu=600, system=2000, rx=3000, blk_read=4096)
+    stats = tools._compute_stats(later, earlier)
+
+    assert stats["cpu_percent"] == pytest.approx(50.0)
+    # Two interfaces grew by 2000 bytes each over 2 seconds
+    assert stats["net_rx_rate"] == pytest.approx(2000.0)
+    assert stats["blk_read_rate"] == pytest.approx(2048.0)
+    assert stats["blk_write_rate"] == 0
+
+
+def test_explicit_interval_wins_and_counter_resets_do_not_go_negative():
+    earlier = _payload("2024-01-01T00:00:00Z", cpu=0, system=0, rx=5000)
+    later = _payload("2024-01-01T00:00:02Z", cpu=0, system=0, rx=1000, blk_read=400)
+    stats = tools._compute_stats(later, earlier, interval=4.0)
+
+    assert stats["net_rx_rate"] == 0
+    assert stats["blk_read_rate"] == pytest.approx(100.0)
+    assert stats["cpu_percent"] == 0.0
+
+
+def test_collector_finds_buffers_by_id_name_or_unique_prefix():
+    web = "a1b2" + "0" * 60
+    db = "a1c3" + "0" * 60
+    # A container named like the start of another's ID
+    tricky = "f00d" + "0" * 60
+    collector = tools.StatsCollector(capacity=4)
+    for container_id, name in ((web, "web"), (db, "db"), (tricky, "a1b2")):
+        collector._buffers[container_id] = tools.StatsRingBuffer(container_id, name, 4)
+
+    assert collector.find(web).container_id == web
+    assert collector.find("db").container_id == db
+    assert collector.find("a1b2").container_id == tricky
+    assert collector.find("a1c").container_id == db
+    assert collector.find("a1") is None